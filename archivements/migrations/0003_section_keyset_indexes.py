@@ -0,0 +1,25 @@
+# Generated by Django 4.2.13 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archivements', '0002_rename_archivement_name_archivements_archivementname'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivements',
+            index=models.Index(fields=['posted_by', 'id'], name='archiv_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivements',
+            index=models.Index(fields=['posted_by', 'archivementName', 'id'], name='archiv_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivements',
+            index=models.Index(fields=['posted_by', 'year', 'id'], name='archiv_owner_year_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+from hacker_news.db import trigram_indexes
+from hacker_news.normalize import normalize
+
+
+def backfill_normalized(apps, schema_editor):
+    Archivements = apps.get_model('archivements', 'Archivements')
+    batch = []
+    for instance in Archivements.objects.all().iterator(chunk_size=1000):
+        instance.name_normalized = normalize(instance.archivementName)
+        batch.append(instance)
+    Archivements.objects.bulk_update(batch, ['name_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('archivements', '0003_section_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivements',
+            name='name_normalized',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_normalized, migrations.RunPython.noop),
+        trigram_indexes('archivements_archivements', {'archiv_normalized_trgm_idx': 'name_normalized'}),
+    ]
@@ -1,10 +1,24 @@
 # Create your models here.
 from django.db import models
 from django.conf import settings
+
+from hacker_news.normalize import NormalizedFieldsMixin
 from django.utils.timezone import now
 
 # Create your models here.
-class Archivements(models.Model):
+class Archivements(NormalizedFieldsMixin, models.Model):
     archivementName = models.TextField(default='')
     year            = models.PositiveIntegerField(default=2024)
-    posted_by       = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
\ No newline at end of file
+    posted_by       = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
+
+    name_normalized = models.TextField(default='', editable=False)
+
+    normalized_fields = {'name_normalized': 'archivementName'}
+
+    # Paginacion por cursor (posted_by, columna, id)
+    class Meta:
+        indexes = [
+            models.Index(fields=['posted_by', 'id'], name='archiv_owner_id_idx'),
+            models.Index(fields=['posted_by', 'archivementName', 'id'], name='archiv_owner_name_idx'),
+            models.Index(fields=['posted_by', 'year', 'id'], name='archiv_owner_year_idx'),
+        ]
@@ -2,14 +2,35 @@ import graphene
 from graphene_django import DjangoObjectType
 from .models import Archivements
 from users.schema import UserType
+from users.loaders import load_related_user
+from hacker_news.normalize import normalize
+from hacker_news.optimizer import optimize
+from cv.snapshots import updates_cv_snapshot
+from hacker_news.pagination import (
+    CountableConnection, connection_arguments, section_connection, section_ordering,
+)
 from django.db.models import Q
 
 class ArchivementsType(DjangoObjectType):
     class Meta:
         model = Archivements
+        exclude = ('name_normalized',)
+
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
+class ArchivementsConnection(CountableConnection):
+    class Meta:
+        node = ArchivementsType
+
+class ArchivementsOrderBy(graphene.Enum):
+    ID = 'id'
+    NAME = 'archivementName'
+    YEAR_DESC = '-year'
 
 class Query(graphene.ObjectType):
     archivements = graphene.List(ArchivementsType, search=graphene.String())
+    archivements_connection = graphene.Field(ArchivementsConnection, search=graphene.String(), **connection_arguments(ArchivementsOrderBy))
     archivementsById = graphene.Field(ArchivementsType, idArchivement=graphene.Int())
 
     def resolve_archivements(self, info, search=None, **kwargs):
@@ -20,10 +41,10 @@ class Query(graphene.ObjectType):
 
         if search == "*":
             filter = Q(posted_by=user)
-            return Archivements.objects.filter(filter)[:10]
+            return optimize(Archivements.objects.filter(filter), info).order_by(*section_ordering())[:10]
         else:
-            filter = Q(posted_by=user) & Q(archivementName__icontains=search)
-            return Archivements.objects.filter(filter)
+            filter = Q(posted_by=user) & Q(name_normalized__contains=normalize(search))
+            return optimize(Archivements.objects.filter(filter), info).order_by(*section_ordering())
         
     def resolve_archivementsById(self, info, idArchivement, **kwargs):
         user = info.context.user
@@ -34,8 +55,20 @@ class Query(graphene.ObjectType):
         filter = (
             Q(posted_by=user) & Q(id = idArchivement)
         )
-        return Archivements.objects.filter(filter).first()
-    
+        return optimize(Archivements.objects.filter(filter), info).first()
+
+    def resolve_archivements_connection(self, info, search=None, first=None, after=None, order_by=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        filter = Q(posted_by=user)
+        if search and search != "*":
+            filter &= Q(name_normalized__contains=normalize(search))
+        return section_connection(
+            ArchivementsConnection, Archivements.objects.filter(filter), info, section_ordering(order_by), first, after
+        )
+
 class CreateArchivement(graphene.Mutation):
     idArchivement = graphene.Int()
     archivementName = graphene.String()
@@ -47,6 +80,7 @@ class CreateArchivement(graphene.Mutation):
         archivementName = graphene.String()
         year = graphene.Int()
 
+    @updates_cv_snapshot
     def mutate(self, info, idArchivement, archivementName, year):
         if year <= 0:
             raise Exception('The year must be positive')
@@ -73,7 +107,7 @@ class CreateArchivement(graphene.Mutation):
             idArchivement=archivement.id,
             archivementName=archivement.archivementName,
             year = archivement.year,
-            posted_by=archivement.posted_by
+            posted_by=user
         )
     
 class DeleteArchivement(graphene.Mutation):
@@ -82,6 +116,7 @@ class DeleteArchivement(graphene.Mutation):
     class Arguments:
         idArchivement = graphene.Int()
 
+    @updates_cv_snapshot
     def mutate(self, info,idArchivement):
         user = info.context.user or None
 
@@ -0,0 +1,151 @@
+"""The whole CV of a user as one JSON document, built by the database.
+
+A single statement nests ``json_build_object``/``json_agg`` (PostgreSQL) or
+``json_object``/``json_group_array`` (SQLite) over every section, so no model
+instance is created and the result goes back to the client as it comes. The
+sections keep the ``fullCv`` order and ``GRAPHQL_MAX_PAGE_SIZE`` cap; dates
+are ISO 8601 in UTC, to the second.
+"""
+import json
+
+from django.db import connection, models
+
+from archivements.models import Archivements
+from education.models import Education
+from header.models import Header
+from interest.models import Interest
+from language.models import Language
+from skills.models import Skill
+from workexperience.models import Archivement, WorkExperience
+from hacker_news.pagination import MAX_PAGE_SIZE
+
+HEADER_FIELDS = {
+    'name': 'name',
+    'actualPosition': 'actual_position',
+    'description': 'description',
+    'profilePicture': 'profile_picture',
+    'email': 'email',
+    'cellphone': 'cellphone',
+    'location': 'location',
+    'github': 'github',
+}
+
+# clave del documento -> (modelo, clave JSON -> campo)
+SECTIONS = {
+    'workExperiences': (WorkExperience, {
+        'id': 'id', 'position': 'position', 'company': 'company',
+        'startDate': 'start_date', 'endDate': 'end_date', 'location': 'location',
+    }),
+    'degrees': (Education, {
+        'id': 'id', 'degree': 'degree', 'university': 'university',
+        'startDate': 'start_date', 'endDate': 'end_date',
+    }),
+    'skills': (Skill, {'id': 'id', 'skill': 'skill', 'percent': 'percent'}),
+    'languages': (Language, {'id': 'id', 'language': 'language'}),
+    'interests': (Interest, {'id': 'id', 'name': 'name'}),
+    'archivements': (Archivements, {'id': 'id', 'archivementName': 'archivementName', 'year': 'year'}),
+}
+
+WORK_ARCHIVEMENT_FIELDS = {'id': 'id', 'description': 'description'}
+
+
+class PostgresDialect:
+
+    def object(self, pairs):
+        return 'json_build_object(%s)' % ', '.join(f"'{key}', {value}" for key, value in pairs)
+
+    def array(self, subquery):
+        # subquery expone (id, doc)
+        return f"COALESCE((SELECT json_agg(s.doc ORDER BY s.id) FROM ({subquery}) s), '[]'::json)"
+
+    def embed(self, subquery):
+        return f'({subquery})'
+
+    def datetime(self, column):
+        return f"""to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"+00:00"')"""
+
+    def document(self, expression):
+        return f'SELECT {expression}::text'
+
+
+class SQLiteDialect:
+
+    def object(self, pairs):
+        return 'json_object(%s)' % ', '.join(f"'{key}', {value}" for key, value in pairs)
+
+    def array(self, subquery):
+        # json() conserva el tipo JSON del valor que sale de la subconsulta (si no, seria texto)
+        return f'(SELECT json_group_array(json(s.doc)) FROM ({subquery}) s)'
+
+    def embed(self, subquery):
+        return f'json(({subquery}))'
+
+    def datetime(self, column):
+        # %% porque el SQL pasa por el formateo de parametros del cursor
+        return f"strftime('%%Y-%%m-%%dT%%H:%%M:%%S+00:00', {column})"
+
+    def document(self, expression):
+        return f'SELECT {expression}'
+
+
+DIALECTS = {
+    'postgresql': PostgresDialect,
+    'sqlite': SQLiteDialect,
+}
+
+
+def supported():
+    return connection.vendor in DIALECTS
+
+
+def _columns(dialect, model, fields, alias):
+    pairs = []
+    for key, name in fields.items():
+        field = model._meta.get_field(name)
+        column = f'{alias}.{connection.ops.quote_name(field.column)}'
+        if isinstance(field, models.DateTimeField):
+            column = dialect.datetime(column)
+        pairs.append((key, column))
+    return pairs
+
+
+def _rows(dialect, model, fields, alias, where, extra=(), limit=None):
+    table = connection.ops.quote_name(model._meta.db_table)
+    document = dialect.object(_columns(dialect, model, fields, alias) + list(extra))
+    sql = f'SELECT {alias}.id AS id, {document} AS doc FROM {table} {alias} WHERE {where} ORDER BY {alias}.id'
+    if limit is not None:
+        sql += f' LIMIT {int(limit)}'
+    return sql
+
+
+def build_sql(user_id):
+    dialect = DIALECTS[connection.vendor]()
+    params = []
+
+    header_table = connection.ops.quote_name(Header._meta.db_table)
+    header = dialect.embed(
+        f'SELECT {dialect.object(_columns(dialect, Header, HEADER_FIELDS, "h"))} '
+        f'FROM {header_table} h WHERE h.posted_by_id = %s ORDER BY h.id LIMIT 1'
+    )
+    params.append(user_id)
+    pairs = [('header', header)]
+
+    for key, (model, fields) in SECTIONS.items():
+        extra = ()
+        if model is WorkExperience:
+            # Los logros de cada experiencia, anidados y sin limite propio
+            archivements = _rows(dialect, Archivement, WORK_ARCHIVEMENT_FIELDS, 'wa', 'wa.work_experience_id = t.id')
+            extra = [('archivements', dialect.array(archivements))]
+        rows = _rows(dialect, model, fields, 't', 't.posted_by_id = %s', extra, limit=MAX_PAGE_SIZE)
+        pairs.append((key, dialect.array(rows)))
+        params.append(user_id)
+
+    return dialect.document(dialect.object(pairs)), params
+
+
+def cv_document(user_id):
+    """The CV of a user as a dict, from a single SQL statement."""
+    sql, params = build_sql(user_id)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return json.loads(cursor.fetchone()[0])
@@ -0,0 +1,104 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+
+from archivements.models import Archivements
+from cv.aggregate import cv_document, supported
+from cv.snapshots import snapshot_document
+from education.models import Education
+from hacker_news.schema import schema
+from header.models import Header
+from interest.models import Interest
+from language.models import Language
+from skills.models import Skill
+from workexperience.models import Archivement, WorkExperience
+
+FULL_CV_QUERY = '''
+query {
+  fullCv {
+    header { name actualPosition description profilePicture email cellphone location github }
+    workExperiences { id position company startDate endDate location archivements { id description } }
+    degrees { id degree university startDate endDate }
+    skills { id skill percent }
+    languages { id language }
+    interests { id name }
+    archivements { id archivementName year }
+  }
+}
+'''
+
+FULL_CV_DOCUMENT_QUERY = 'query { fullCvDocument }'
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare fullCv (ORM + graphene) with fullCvDocument (the stored snapshot) on a '
+        'synthetic CV, and time building the snapshot (cv_document, one JSON statement) '
+        'apart from reading it. Everything is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, nargs='+', default=[5, 20, 100])
+        parser.add_argument('--runs', type=int, default=50)
+
+    def handle(self, *args, entries, runs, **options):
+        if not supported():
+            self.stderr.write(f'fullCvDocument is not available on {connection.vendor}.')
+            return
+
+        self.stdout.write(f'{"engine":<16}{"entries":>8}{"queries":>9}{"p50 ms":>10}{"p95 ms":>10}')
+        for count in entries:
+            with transaction.atomic():
+                user = self._populate(count)
+                request = RequestFactory().post('/graphql/')
+                request.user = user
+                # fullCvDocument lee el snapshot ya materializado; cv_document es lo que cuesta construirlo
+                engines = (
+                    ('fullCv', lambda: self._execute(FULL_CV_QUERY, request)),
+                    ('fullCvDocument', lambda: self._execute(FULL_CV_DOCUMENT_QUERY, request)),
+                    ('cv_document', lambda: cv_document(user.pk)),
+                    ('snapshot', lambda: snapshot_document(user)),
+                )
+                for engine, run in engines:
+                    queries, p50, p95 = self._time(run, runs)
+                    self.stdout.write(f'{engine:<16}{count:>8}{queries:>9}{p50:>10.2f}{p95:>10.2f}')
+                transaction.set_rollback(True)
+
+    def _populate(self, count):
+        user = mixer.blend(get_user_model())
+        # Solo puede existir un Header
+        if not Header.objects.exists():
+            mixer.blend(Header, posted_by=user)
+        for work in mixer.cycle(count).blend(WorkExperience, posted_by=user):
+            mixer.cycle(3).blend(Archivement, work_experience=work)
+        for model in (Education, Skill, Language, Interest, Archivements):
+            mixer.cycle(count).blend(model, posted_by=user)
+        return user
+
+    def _execute(self, query, request):
+        result = schema.execute(query, context_value=request)
+        if result.errors:
+            raise result.errors[0]
+
+    def _time(self, run, runs):
+        # La primera ejecucion materializa el snapshot y no se mide
+        run()
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        # El registro de consultas se llena con las ejecuciones medidas y deja de contar
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as context:
+            run()
+
+        timings.sort()
+        return len(context.captured_queries), statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
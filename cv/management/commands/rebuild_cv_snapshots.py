@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from cv.aggregate import cv_document, supported
+from cv.models import CvSnapshot
+from graphql_cache.versions import invalidate
+
+
+def save_batch(user_ids):
+    snapshots = [CvSnapshot(user_id=user_id, document=cv_document(user_id)) for user_id in user_ids]
+    with transaction.atomic():
+        CvSnapshot.objects.bulk_create(
+            snapshots, update_conflicts=True, unique_fields=['user'], update_fields=['document', 'updated_at'],
+        )
+        invalidate(CvSnapshot)
+    return len(snapshots)
+
+
+def rebuild_batch(user_ids):
+    try:
+        return save_batch(user_ids)
+    finally:
+        # Cada hilo abre su propia conexion
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the materialized CV document of every user, in parallel batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--workers', type=int, help='Threads writing batches (default: 1 on SQLite, 4 elsewhere).')
+
+    def handle(self, *args, batch_size, workers, **options):
+        if not supported():
+            raise CommandError(f'CV snapshots are not available on {connection.vendor}.')
+        if workers is None:
+            # SQLite solo admite un escritor a la vez: los hilos solo esperarian el bloqueo
+            workers = 1 if connection.vendor == 'sqlite' else 4
+
+        user_ids = list(get_user_model().objects.order_by('pk').values_list('pk', flat=True))
+        batches = [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+
+        if workers == 1:
+            total = sum(save_batch(batch) for batch in batches)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                total = sum(executor.map(rebuild_batch, batches))
+
+        self.stdout.write(f'Rebuilt {total} CV snapshots.')
+
@@ -0,0 +1,8 @@
+from django.db import models
+from django.conf import settings
+
+# El CV completo de cada usuario ya armado (ver cv.snapshots); se lee por clave primaria
+class CvSnapshot(models.Model):
+    user       = models.OneToOneField(settings.AUTH_USER_MODEL, primary_key=True, related_name='cv_snapshot', on_delete=models.CASCADE)
+    document   = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
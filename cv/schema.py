@@ -0,0 +1,75 @@
+import graphene
+from graphene.types.generic import GenericScalar
+from .aggregate import supported
+from .snapshots import snapshot_document
+from archivements.models import Archivements
+from archivements.schema import ArchivementsType
+from education.models import Education
+from education.schema import EducationType
+from header.models import Header
+from header.schema import HeaderType
+from interest.models import Interest
+from interest.schema import InterestType
+from language.models import Language
+from language.schema import LanguageType
+from skills.models import Skill
+from skills.schema import SkillType
+from workexperience.models import WorkExperience
+from workexperience.schema import WorkExperienceType
+from hacker_news.optimizer import optimize
+from hacker_news.pagination import MAX_PAGE_SIZE, section_ordering
+
+
+# Un query por seccion (mas los prefetch del optimizador), acotado a MAX_PAGE_SIZE filas
+def section(model, user, info):
+    return optimize(model.objects.filter(posted_by=user), info).order_by(*section_ordering())[:MAX_PAGE_SIZE]
+
+# Se resuelve sobre el usuario autenticado: solo se consultan las secciones pedidas
+class FullCvType(graphene.ObjectType):
+    header = graphene.Field(HeaderType)
+    work_experiences = graphene.List(WorkExperienceType)
+    degrees = graphene.List(EducationType)
+    skills = graphene.List(SkillType)
+    languages = graphene.List(LanguageType)
+    interests = graphene.List(InterestType)
+    archivements = graphene.List(ArchivementsType)
+
+    def resolve_header(user, info):
+        return optimize(Header.objects.filter(posted_by=user), info).first()
+
+    def resolve_work_experiences(user, info):
+        return section(WorkExperience, user, info)
+
+    def resolve_degrees(user, info):
+        return section(Education, user, info)
+
+    def resolve_skills(user, info):
+        return section(Skill, user, info)
+
+    def resolve_languages(user, info):
+        return section(Language, user, info)
+
+    def resolve_interests(user, info):
+        return section(Interest, user, info)
+
+    def resolve_archivements(user, info):
+        return section(Archivements, user, info)
+
+class Query(graphene.ObjectType):
+    full_cv = graphene.Field(FullCvType)
+    # El mismo CV ya armado: se lee del snapshot por clave primaria (ver cv.snapshots)
+    full_cv_document = graphene.Field(GenericScalar)
+
+    def resolve_full_cv(self, info):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+        return user
+
+    def resolve_full_cv_document(self, info):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+        if not supported():
+            raise Exception('fullCvDocument is not available on this database.')
+        return snapshot_document(user)
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .aggregate import SECTIONS
+from .snapshots import user_changed
+from hacker_news.owners import previous_owner
+from header.models import Header
+from workexperience.models import Archivement, WorkExperience
+
+# Modelos con posted_by que forman parte del CV
+CV_MODELS = [Header] + [model for model, _ in SECTIONS.values()]
+
+
+def cv_entry_saving(sender, instance, raw=False, **kwargs):
+    # Una entrada puede cambiar de dueño: el CV anterior tambien cambia
+    if not raw and instance.pk is not None:
+        previous = previous_owner(instance)
+        if previous != instance.posted_by_id:
+            user_changed(previous)
+
+
+def cv_entry_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        user_changed(instance.posted_by_id)
+
+
+# Los logros anidados no tienen posted_by: el CV es el de su experiencia
+def work_archivement_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        user_changed(
+            WorkExperience.objects.filter(pk=instance.work_experience_id).values_list('posted_by_id', flat=True).first()
+        )
+
+
+def connect():
+    for model in CV_MODELS:
+        pre_save.connect(cv_entry_saving, sender=model, dispatch_uid=f'cv_saving_{model.__name__}')
+        post_save.connect(cv_entry_changed, sender=model, dispatch_uid=f'cv_saved_{model.__name__}')
+        post_delete.connect(cv_entry_changed, sender=model, dispatch_uid=f'cv_deleted_{model.__name__}')
+    post_save.connect(work_archivement_changed, sender=Archivement, dispatch_uid='cv_saved_Archivement')
+    post_delete.connect(work_archivement_changed, sender=Archivement, dispatch_uid='cv_deleted_Archivement')
@@ -0,0 +1,64 @@
+"""Materialized CV documents, one row per user.
+
+Mutations decorated with ``updates_cv_snapshot`` run in a transaction that
+also rewrites the snapshot of every user whose CV they touched, so the
+snapshot commits together with the change. Writes made anywhere else (admin,
+shell, scripts) drop the affected snapshots, which are rebuilt on next read.
+"""
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from .aggregate import cv_document, supported
+from .models import CvSnapshot
+
+# usuarios con cambios dentro de la mutacion en curso; None fuera de una mutacion
+_changed_users = contextvars.ContextVar('cv_changed_users', default=None)
+
+
+def build_snapshot(user_id):
+    document = cv_document(user_id)
+    CvSnapshot.objects.update_or_create(user_id=user_id, defaults={'document': document})
+    return document
+
+
+def snapshot_document(user):
+    """The CV of ``user``: one primary-key lookup, or built and stored on a miss."""
+    document = CvSnapshot.objects.filter(user_id=user.pk).values_list('document', flat=True).first()
+    if document is None:
+        document = build_snapshot(user.pk)
+    return document
+
+
+def user_changed(user_id):
+    if user_id is None or not supported():
+        return
+    changed = _changed_users.get()
+    if changed is not None:
+        changed.add(user_id)
+    else:
+        CvSnapshot.objects.filter(user_id=user_id).delete()
+
+
+@contextmanager
+def tracking_changes():
+    changed = set()
+    token = _changed_users.set(changed)
+    try:
+        yield changed
+    finally:
+        _changed_users.reset(token)
+
+
+def updates_cv_snapshot(mutate):
+    @functools.wraps(mutate)
+    def wrapper(*args, **kwargs):
+        with transaction.atomic():
+            with tracking_changes() as changed:
+                result = mutate(*args, **kwargs)
+            for user_id in sorted(changed):
+                build_snapshot(user_id)
+        return result
+    return wrapper
@@ -0,0 +1,266 @@
+from django.test import TestCase, TransactionTestCase
+from unittest import skipIf, skipUnless
+from graphene_django.utils.testing import GraphQLTestCase
+from mixer.backend.django import mixer
+import json
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+
+from hacker_news.auth import user_cache
+from hacker_news.schema import schema
+from hacker_news.testing import capture_sql, count_queries
+from cv.models import CvSnapshot
+from archivements.models import Archivements
+from education.models import Education
+from header.models import Header
+from interest.models import Interest
+from language.models import Language
+from skills.models import Skill
+from workexperience.models import WorkExperience, Archivement
+
+# Create your tests here.
+
+FULL_CV_QUERY = '''
+query {
+  fullCv {
+    header { name email postedBy { username } }
+    workExperiences {
+      id
+      position
+      postedBy { username }
+      archivements { id description }
+    }
+    degrees { id degree postedBy { username } }
+    skills { id skill percent }
+    languages { id language }
+    interests { id name }
+    archivements { id archivementName postedBy { username } }
+  }
+}
+'''
+
+FULL_CV_DOCUMENT_QUERY = '''
+query {
+  fullCvDocument
+}
+'''
+
+CREATE_SKILL_MUTATION = '''
+mutation CreateSkill($idSkill: Int, $skill: String!, $percent: Int!) {
+  createSkill(idSkill: $idSkill, skill: $skill, percent: $percent) {
+    idSkill
+  }
+}
+'''
+
+DELETE_SKILL_MUTATION = '''
+mutation DeleteSkill($idSkill: Int!) {
+  deleteSkill(idSkill: $idSkill) {
+    idSkill
+  }
+}
+'''
+
+CREATE_USER_MUTATION = '''
+ mutation createUserMutation($email: String!, $password: String!, $username: String!) {
+     createUser(email: $email, password: $password, username: $username) {
+         user {
+            username
+            password
+         }
+     }
+ }
+'''
+
+LOGIN_USER_MUTATION = '''
+ mutation TokenAuthMutation($username: String!, $password: String!) {
+     tokenAuth(username: $username, password: $password) {
+        token
+     }
+ }
+'''
+
+class FullCvTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        self.query(
+            CREATE_USER_MUTATION,
+            variables={'email': 'adsoft@live.com.mx', 'username': 'adsoft', 'password': 'adsoft'}
+        )
+        response_token = self.query(
+            LOGIN_USER_MUTATION,
+            variables={'username': 'adsoft', 'password': 'adsoft'}
+        )
+        token = json.loads(response_token.content)['data']['tokenAuth']['token']
+        self.headers = {"AUTHORIZATION": f"JWT {token}"}
+
+        self.user = get_user_model().objects.get(username="adsoft")
+        mixer.blend(Header, name="Adsoft", posted_by=self.user)
+
+    def add_entries(self, count):
+        for work in mixer.cycle(count).blend(WorkExperience, posted_by=self.user):
+            mixer.cycle(count).blend(Archivement, work_experience=work)
+        for model in (Education, Skill, Language, Interest, Archivements):
+            mixer.cycle(count).blend(model, posted_by=self.user)
+
+    def full_cv(self):
+        queries, content = count_queries(self, FULL_CV_QUERY, headers=self.headers)
+        return content['data']['fullCv'], queries
+
+    def test_full_cv_constant_queries(self):
+        self.add_entries(1)
+        cv, queries_one = self.full_cv()
+        assert len(cv['workExperiences']) == 1
+
+        self.add_entries(4)
+        cv, queries_many = self.full_cv()
+
+        assert len(cv['workExperiences']) == 5
+        assert sum(len(work['archivements']) for work in cv['workExperiences']) == 1 + 4 * 4
+        assert all(len(cv[section]) == 5 for section in ('degrees', 'skills', 'languages', 'interests', 'archivements'))
+        # usuario del token + versiones del cache de respuestas + header + una por seccion + prefetch de los logros
+        assert queries_one == queries_many == 10
+
+    def test_full_cv_only_own_entries(self):
+        self.add_entries(2)
+        other = mixer.blend(get_user_model())
+        mixer.cycle(3).blend(Skill, posted_by=other)
+
+        cv, _ = self.full_cv()
+
+        assert cv['header']['name'] == "Adsoft"
+        assert {skill['id'] for skill in cv['skills']} == {
+            str(pk) for pk in Skill.objects.filter(posted_by=self.user).values_list('id', flat=True)
+        }
+        assert {work['postedBy']['username'] for work in cv['workExperiences']} == {'adsoft'}
+
+    def test_full_cv_not_logged_in(self):
+        response = self.query(FULL_CV_QUERY)
+        content = json.loads(response.content)
+
+        assert content['errors'][0]['message'] == 'Not logged in!'
+
+    def full_cv_document(self):
+        # Cada consulta medida busca al usuario del token
+        user_cache.clear()
+        sql, content = capture_sql(self, FULL_CV_DOCUMENT_QUERY, headers=self.headers)
+        return content['data']['fullCvDocument'], sql
+
+    def test_full_cv_document_matches_full_cv(self):
+        self.add_entries(3)
+        cv, _ = self.full_cv()
+
+        document, _ = self.full_cv_document()
+
+        assert document['header']['name'] == "Adsoft"
+        assert [(str(work['id']), work['position'], [str(a['id']) for a in work['archivements']]) for work in document['workExperiences']] == [
+            (work['id'], work['position'], [a['id'] for a in work['archivements']]) for work in cv['workExperiences']
+        ]
+        assert [(str(skill['id']), skill['skill'], skill['percent']) for skill in document['skills']] == [
+            (skill['id'], skill['skill'], skill['percent']) for skill in cv['skills']
+        ]
+        for section in ('degrees', 'languages', 'interests', 'archivements'):
+            assert [str(entry['id']) for entry in document[section]] == [entry['id'] for entry in cv[section]]
+
+        education = Education.objects.filter(posted_by=self.user).order_by('id').first()
+        assert document['degrees'][0]['startDate'] == education.start_date.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+    def test_full_cv_document_empty(self):
+        Header.objects.all().delete()
+
+        document, _ = self.full_cv_document()
+
+        assert document == {
+            'header': None, 'workExperiences': [], 'degrees': [], 'skills': [],
+            'languages': [], 'interests': [], 'archivements': [],
+        }
+
+    def test_full_cv_document_reads_snapshot(self):
+        self.add_entries(2)
+        CvSnapshot.objects.all().delete()
+
+        document, queries = self.full_cv_document()
+        assert CvSnapshot.objects.get(user=self.user).document == document
+
+        document_again, queries = self.full_cv_document()
+        # usuario del token + versiones del cache de respuestas + lectura del snapshot por clave primaria
+        assert document_again == document
+        assert len(queries) == 3
+        assert 'cv_cvsnapshot' in queries[2]
+
+    def test_mutations_update_snapshot(self):
+        self.full_cv_document()
+
+        response = self.query(CREATE_SKILL_MUTATION, variables={'idSkill': 0, 'skill': 'Django', 'percent': 90}, headers=self.headers)
+        self.assertResponseNoErrors(response)
+        skill_id = json.loads(response.content)['data']['createSkill']['idSkill']
+
+        assert CvSnapshot.objects.get(user=self.user).document['skills'] == [{'id': skill_id, 'skill': 'Django', 'percent': 90}]
+
+        response = self.query(DELETE_SKILL_MUTATION, variables={'idSkill': skill_id}, headers=self.headers)
+        self.assertResponseNoErrors(response)
+        assert CvSnapshot.objects.get(user=self.user).document['skills'] == []
+
+    def test_direct_writes_drop_snapshot(self):
+        self.full_cv_document()
+
+        skill = mixer.blend(Skill, skill="Go", posted_by=self.user)
+        assert not CvSnapshot.objects.filter(user=self.user).exists()
+
+        document, _ = self.full_cv_document()
+        assert [entry['skill'] for entry in document['skills']] == ["Go"]
+
+        # Al cambiar de dueño cambian los dos CV
+        other = mixer.blend(get_user_model())
+        CvSnapshot.objects.create(user=other, document={})
+        skill.posted_by = other
+        skill.save()
+        assert not CvSnapshot.objects.filter(user__in=[self.user, other]).exists()
+
+
+class RebuildCvSnapshotsTestCase(TestCase):
+
+    def test_rebuild_cv_snapshots(self):
+        users = mixer.cycle(3).blend(get_user_model())
+        for user in users:
+            mixer.cycle(2).blend(Skill, posted_by=user)
+        CvSnapshot.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_cv_snapshots', batch_size=2, workers=1, stdout=out)
+
+        assert 'Rebuilt 3 CV snapshots.' in out.getvalue()
+        assert [len(CvSnapshot.objects.get(user=user).document['skills']) for user in users] == [2, 2, 2]
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite default')
+    def test_rebuild_cv_snapshots_one_worker_on_sqlite(self):
+        user = mixer.blend(get_user_model())
+        CvSnapshot.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_cv_snapshots', stdout=out)
+
+        # Un hilo aparte no veria al usuario de la transaccion de la prueba
+        assert CvSnapshot.objects.filter(user=user).exists()
+
+
+class RebuildCvSnapshotsThreadedTestCase(TransactionTestCase):
+
+    # La base de pruebas de SQLite es en memoria: los escritores concurrentes fallan en vez de esperar
+    @skipIf(connection.vendor == 'sqlite', 'concurrent writers')
+    def test_rebuild_cv_snapshots_in_threads(self):
+        users = mixer.cycle(5).blend(get_user_model())
+        for user in users:
+            mixer.cycle(2).blend(Skill, posted_by=user)
+        CvSnapshot.objects.all().delete()
+
+        out = StringIO()
+        # Cada hilo abre su conexion: sin la transaccion de TestCase ven las filas creadas aqui
+        call_command('rebuild_cv_snapshots', batch_size=2, workers=3, stdout=out)
+
+        assert 'Rebuilt 5 CV snapshots.' in out.getvalue()
+        assert [len(CvSnapshot.objects.get(user=user).document['skills']) for user in users] == [2] * 5
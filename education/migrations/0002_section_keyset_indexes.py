@@ -0,0 +1,25 @@
+# Generated by Django 4.2.13 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['posted_by', 'id'], name='education_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['posted_by', 'degree', 'id'], name='education_owner_degree_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['posted_by', 'start_date', 'id'], name='education_owner_start_date_idx'),
+        ),
+    ]
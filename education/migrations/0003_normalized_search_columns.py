@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+from hacker_news.db import trigram_indexes
+from hacker_news.normalize import normalize
+
+
+def backfill_normalized(apps, schema_editor):
+    Education = apps.get_model('education', 'Education')
+    batch = []
+    for instance in Education.objects.all().iterator(chunk_size=1000):
+        instance.degree_normalized = normalize(instance.degree)
+        batch.append(instance)
+    Education.objects.bulk_update(batch, ['degree_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('education', '0002_section_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='education',
+            name='degree_normalized',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_normalized, migrations.RunPython.noop),
+        trigram_indexes('education_education', {'education_normalized_trgm_idx': 'degree_normalized'}),
+    ]
@@ -1,13 +1,26 @@
 # Create your models here.
 from django.db import models
 from django.conf import settings
+
+from hacker_news.normalize import NormalizedFieldsMixin
 from django.utils.timezone import now
 
 # Create your models here.
-class Education(models.Model):
+class Education(NormalizedFieldsMixin, models.Model):
     degree     = models.TextField(default='')
     university = models.TextField(default='')
     start_date = models.DateTimeField(default=now, blank=True)
     end_date   = models.DateTimeField(default=now, blank=True)
     posted_by  = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
 
+    degree_normalized = models.TextField(default='', editable=False)
+
+    normalized_fields = {'degree_normalized': 'degree'}
+
+    # Paginacion por cursor (posted_by, columna, id)
+    class Meta:
+        indexes = [
+            models.Index(fields=['posted_by', 'id'], name='education_owner_id_idx'),
+            models.Index(fields=['posted_by', 'degree', 'id'], name='education_owner_degree_idx'),
+            models.Index(fields=['posted_by', 'start_date', 'id'], name='education_owner_start_date_idx'),
+        ]
@@ -2,14 +2,35 @@ import graphene
 from graphene_django import DjangoObjectType
 from .models import Education
 from users.schema import UserType
+from users.loaders import load_related_user
+from hacker_news.normalize import normalize
+from hacker_news.optimizer import optimize
+from cv.snapshots import updates_cv_snapshot
+from hacker_news.pagination import (
+    CountableConnection, connection_arguments, section_connection, section_ordering,
+)
 from django.db.models import Q
 
 class EducationType(DjangoObjectType):
     class Meta:
         model = Education
+        exclude = ('degree_normalized',)
+
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
+class EducationConnection(CountableConnection):
+    class Meta:
+        node = EducationType
+
+class EducationOrderBy(graphene.Enum):
+    ID = 'id'
+    DEGREE = 'degree'
+    START_DATE_DESC = '-start_date'
 
 class Query(graphene.ObjectType):
     degrees = graphene.List(EducationType, search=graphene.String(required=False))
+    degrees_connection = graphene.Field(EducationConnection, search=graphene.String(), **connection_arguments(EducationOrderBy))
     degreeById = graphene.Field(EducationType, idEducation=graphene.Int())
 
     def resolve_degrees(self, info, search=None, **kwargs):
@@ -22,11 +43,11 @@ class Query(graphene.ObjectType):
             filter = Q(posted_by=user)
         elif search == "*":
             filter = Q(posted_by=user)
-            return Education.objects.filter(filter)[:10]
+            return optimize(Education.objects.filter(filter), info).order_by(*section_ordering())[:10]
         else:
-            filter = Q(posted_by=user) & Q(degree__icontains=search)
+            filter = Q(posted_by=user) & Q(degree_normalized__contains=normalize(search))
 
-        return Education.objects.filter(filter)
+        return optimize(Education.objects.filter(filter), info).order_by(*section_ordering())
 
     def resolve_degreeById(self, info, idEducation, **kwargs):
         user = info.context.user 
@@ -37,7 +58,19 @@ class Query(graphene.ObjectType):
         filter = (
                 Q(posted_by=user) & Q(id = idEducation)
         )
-        return Education.objects.filter(filter).first()
+        return optimize(Education.objects.filter(filter), info).first()
+
+    def resolve_degrees_connection(self, info, search=None, first=None, after=None, order_by=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        filter = Q(posted_by=user)
+        if search and search != "*":
+            filter &= Q(degree_normalized__contains=normalize(search))
+        return section_connection(
+            EducationConnection, Education.objects.filter(filter), info, section_ordering(order_by), first, after
+        )
 
 class CreateEducation(graphene.Mutation):
     idEducation = graphene.Int()
@@ -54,6 +87,7 @@ class CreateEducation(graphene.Mutation):
         start_date = graphene.Date()
         end_date = graphene.Date()
 
+    @updates_cv_snapshot
     def mutate(self, info, idEducation, degree, university, start_date, end_date):
         user = info.context.user 
         if user.is_anonymous:
@@ -82,7 +116,7 @@ class CreateEducation(graphene.Mutation):
             university=education.university,
             start_date=education.start_date,
             end_date=education.end_date,
-            posted_by=education.posted_by
+            posted_by=user
         )
 
 class DeleteEducation(graphene.Mutation):
@@ -91,6 +125,7 @@ class DeleteEducation(graphene.Mutation):
     class Arguments:
         idEducation= graphene.Int()
     
+    @updates_cv_snapshot
     def mutate(self, info, idEducation):
         user = info.context.user or None
         
@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 from datetime import date
 
 from hacker_news.schema import schema
+from hacker_news.testing import connection_pages, node_ids
 from education.models import Education
 
 # Create your tests here.
@@ -439,23 +440,39 @@ class EducationTestCase(GraphQLTestCase):
         error_message = content['errors'][0]['message']
         assert error_message == "Not logged in!"
 
-    
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    def test_degrees_connection_by_start_date(self):
+        for year in (2015, 2019, 2012):
+            mixer.blend(Education, posted_by=self.user, start_date=f"{year}-01-01T00:00:00Z")
 
+        query = '''
+            query ($after: String) {
+                degreesConnection(first: 2, after: $after, orderBy: START_DATE_DESC) {
+                    edges { node { id } }
+                    pageInfo { hasNextPage endCursor }
+                }
+            }
+        '''
+        ids = node_ids(connection_pages(self, query, 'degreesConnection', headers=self.headers))
 
+        expected = Education.objects.filter(posted_by=self.user).order_by('-start_date', '-id')
+        assert ids == [str(education.id) for education in expected]
 
+    def test_education_query_search_ignores_accents(self):
+        response = self.query(
+            CREATE_EDUCATION_MUTATION,
+            variables={
+                "idEducation": 0,
+                "degree": "Ingeniería en Computación",
+                "university": "UNAM",
+                "startDate": "2015-01-01",
+                "endDate": "2019-01-01"
+            },
+            headers=self.headers
+        )
+        self.assertResponseNoErrors(response)
+        education_id = json.loads(response.content)['data']['createEducation']['idEducation']
 
+        for search in ("ingenieria en computacion", "COMPUTACIÓN"):
+            response = self.query(EDUCATION_QUERY, variables={"search": search}, headers=self.headers)
+            self.assertResponseNoErrors(response)
+            assert [degree['id'] for degree in json.loads(response.content)['data']['degrees']] == [str(education_id)]
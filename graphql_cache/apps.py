@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class GraphqlCacheConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'graphql_cache'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
@@ -0,0 +1,309 @@
+"""Execution plans compiled from validated query operations.
+
+For every field of every row, graphql-core's executor works out again which
+fields are selected, which resolver and arguments they take and how to
+complete the value they return. For a given operation all of that is fixed,
+so ``compile_operation`` does it once and returns a plan of nested closures,
+in the spirit of graphql-jit. Resolvers, middleware and error handling are
+the same as with ``graphql.execute``, so the result is too.
+
+Plans live with their document in ``graphql_cache.documents``. Operations
+with what the compiler doesn't cover (mutations, subscriptions, directives,
+introspection, abstract types, async resolvers) use the standard executor.
+
+The compiler reuses private helpers of ``graphql.execution``, so plans only
+run on the graphql-core release it was written against
+(``GRAPHQL_CORE_VERSION``, pinned in requirements.txt); with any other the
+standard executor runs everything.
+"""
+from graphql import (
+    ExecutionResult,
+    FragmentDefinitionNode,
+    GraphQLError,
+    GraphQLResolveInfo,
+    OperationType,
+    get_operation_ast,
+    is_abstract_type,
+    is_leaf_type,
+    is_list_type,
+    is_non_null_type,
+    located_error,
+    print_ast,
+    version_info,
+)
+from graphql.execution.collect_fields import collect_fields, collect_sub_fields
+from graphql.execution.execute import default_field_resolver, get_field_def, invalid_return_type_error
+from graphql.execution.middleware import MiddlewareManager
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.pyutils import Path, Undefined, inspect, is_awaitable, is_iterable
+from graphql.type import SchemaMetaFieldDef, TypeMetaFieldDef
+
+GRAPHQL_CORE_VERSION = (3, 2, 3)
+
+
+class Unsupported(Exception):
+    """The operation (or a value it produced) needs the standard executor."""
+
+
+def _has_directives(node):
+    if getattr(node, 'directives', None):
+        return True
+    selection_set = getattr(node, 'selection_set', None)
+    return selection_set is not None and any(_has_directives(selection) for selection in selection_set.selections)
+
+
+class _Execution:
+    """State of one run of a plan."""
+
+    __slots__ = ('plan', 'root_value', 'context', 'variable_values', 'middleware', 'errors', 'arguments')
+
+    def __init__(self, plan, root_value, context, variable_values, middleware):
+        self.plan = plan
+        self.root_value = root_value
+        self.context = context
+        self.variable_values = variable_values
+        self.middleware = middleware
+        self.errors = []
+        # campo -> argumentos: con variables se calculan una vez por ejecucion, no por fila
+        self.arguments = {}
+
+    def resolver(self, resolve_fn):
+        if self.middleware is None:
+            return resolve_fn
+        return self.middleware.get_field_resolver(resolve_fn)
+
+    def info(self, field, path):
+        plan = self.plan
+        return GraphQLResolveInfo(
+            field.name, field.nodes, field.definition.type, field.parent_type, path, plan.schema,
+            plan.fragments, self.root_value, plan.operation, self.variable_values, self.context, is_awaitable,
+        )
+
+
+class _Field:
+    """A selected field: resolver, arguments and how to complete its value."""
+
+    def __init__(self, parent_type, key, nodes, definition, complete):
+        self.parent_type = parent_type
+        self.key = key
+        self.nodes = nodes
+        self.name = nodes[0].name.value
+        self.definition = definition
+        self.resolve_fn = definition.resolve or default_field_resolver
+        self.complete = complete
+        self.non_null = is_non_null_type(definition.type)
+        node = nodes[0]
+        # Sin variables los argumentos son siempre los mismos
+        self.dynamic = any('$' in print_ast(argument) for argument in node.arguments or ())
+        self.static_arguments = None if self.dynamic else get_argument_values(definition, node, {})
+
+    def arguments(self, execution):
+        if not self.dynamic:
+            return self.static_arguments
+        arguments = execution.arguments.get(self)
+        if arguments is None:
+            arguments = execution.arguments[self] = get_argument_values(
+                self.definition, self.nodes[0], execution.variable_values,
+            )
+        return arguments
+
+    def run(self, source, parent_path, execution):
+        path = Path(parent_path, self.key, self.parent_type.name)
+        try:
+            info = execution.info(self, path)
+            result = execution.resolver(self.resolve_fn)(source, info, **self.arguments(execution))
+            if is_awaitable(result):
+                raise Unsupported(f'{self.parent_type.name}.{self.name} is async')
+            return self.complete(result, info, path, execution)
+        except Unsupported:
+            raise
+        except Exception as raw_error:
+            error = located_error(raw_error, self.nodes, path.as_list())
+            if self.non_null:
+                raise error
+            execution.errors.append(error)
+            return None
+
+
+class _Compiler:
+
+    def __init__(self, schema, fragments):
+        self.schema = schema
+        self.fragments = fragments
+
+    def selection(self, parent_type, fields):
+        runners = []
+        for key, nodes in fields.items():
+            definition = get_field_def(self.schema, parent_type, nodes[0])
+            if definition is None:
+                continue
+            if definition is SchemaMetaFieldDef or definition is TypeMetaFieldDef:
+                raise Unsupported('introspection')
+            complete = self.completer(definition.type, nodes)
+            runners.append((key, _Field(parent_type, key, nodes, definition, complete).run))
+
+        def execute_fields(source, path, execution):
+            return {key: run(source, path, execution) for key, run in runners}
+        return execute_fields
+
+    def completer(self, return_type, nodes):
+        if is_non_null_type(return_type):
+            return self._non_null(self.completer(return_type.of_type, nodes))
+        if is_list_type(return_type):
+            return self._list(return_type.of_type, self.completer(return_type.of_type, nodes), nodes)
+        if is_leaf_type(return_type):
+            return self._leaf(return_type)
+        if is_abstract_type(return_type):
+            raise Unsupported(f'abstract type {return_type.name}')
+        fields = collect_sub_fields(self.schema, self.fragments, {}, return_type, nodes)
+        return self._object(return_type, self.selection(return_type, fields), nodes)
+
+    @staticmethod
+    def _non_null(inner):
+        def complete_non_null(result, info, path, execution):
+            if isinstance(result, Exception):
+                raise result
+            completed = inner(result, info, path, execution)
+            if completed is None:
+                raise TypeError(f'Cannot return null for non-nullable field {info.parent_type.name}.{info.field_name}.')
+            return completed
+        return complete_non_null
+
+    @staticmethod
+    def _list(item_type, complete_item, nodes):
+        item_non_null = is_non_null_type(item_type)
+
+        def complete_list(result, info, path, execution):
+            if isinstance(result, Exception):
+                raise result
+            if result is None or result is Undefined:
+                return None
+            if not is_iterable(result):
+                raise GraphQLError(
+                    f"Expected Iterable, but did not find one for field '{info.parent_type.name}.{info.field_name}'."
+                )
+            completed = []
+            append = completed.append
+            for index, item in enumerate(result):
+                item_path = Path(path, index, None)
+                try:
+                    if is_awaitable(item):
+                        raise Unsupported(f'{info.parent_type.name}.{info.field_name} has async items')
+                    append(complete_item(item, info, item_path, execution))
+                except Unsupported:
+                    raise
+                except Exception as raw_error:
+                    error = located_error(raw_error, nodes, item_path.as_list())
+                    if item_non_null:
+                        raise error
+                    execution.errors.append(error)
+                    append(None)
+            return completed
+        return complete_list
+
+    @staticmethod
+    def _leaf(return_type):
+        serialize = return_type.serialize
+
+        def complete_leaf(result, info, path, execution):
+            if isinstance(result, Exception):
+                raise result
+            if result is None or result is Undefined:
+                return None
+            serialized = serialize(result)
+            if serialized is Undefined or serialized is None:
+                raise TypeError(
+                    f'Expected `{inspect(return_type)}.serialize({inspect(result)})`'
+                    f' to return non-nullable value, returned: {inspect(serialized)}'
+                )
+            return serialized
+        return complete_leaf
+
+    @staticmethod
+    def _object(return_type, execute_fields, nodes):
+        is_type_of = return_type.is_type_of
+
+        def complete_object(result, info, path, execution):
+            if isinstance(result, Exception):
+                raise result
+            if result is None or result is Undefined:
+                return None
+            if is_type_of is not None:
+                matches = is_type_of(result, info)
+                if is_awaitable(matches):
+                    raise Unsupported(f'{return_type.name}.is_type_of is async')
+                if not matches:
+                    raise invalid_return_type_error(return_type, result, nodes)
+            return execute_fields(result, path, execution)
+        return complete_object
+
+
+class Plan:
+
+    def __init__(self, schema, operation, fragments, execute_fields):
+        self.schema = schema
+        self.operation = operation
+        self.fragments = fragments
+        self.execute_fields = execute_fields
+
+    def execute(self, root_value=None, context_value=None, variable_values=None, middleware=None):
+        """Run the plan like ``graphql.execute``; raises ``Unsupported`` to ask for the standard executor."""
+        coerced = get_variable_values(self.schema, self.operation.variable_definitions or (), variable_values or {})
+        if isinstance(coerced, list):
+            return ExecutionResult(data=None, errors=coerced)
+
+        if isinstance(middleware, (list, tuple)):
+            middleware = MiddlewareManager(*middleware)
+        execution = _Execution(self, root_value, context_value, coerced, middleware or None)
+        try:
+            data = self.execute_fields(root_value, None, execution)
+        except GraphQLError as error:
+            execution.errors.append(error)
+            data = None
+        return ExecutionResult(data, execution.errors or None)
+
+
+def compile_operation(schema, document, operation_name=None):
+    """Compile the query operation ``operation_name`` of a validated ``document``."""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        raise Unsupported('only queries are compiled')
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    # @skip/@include dependen de las variables de cada ejecucion
+    if _has_directives(operation) or any(_has_directives(fragment) for fragment in fragments.values()):
+        raise Unsupported('directives')
+
+    root_type = schema.query_type
+    fields = collect_fields(schema, fragments, {}, root_type, operation.selection_set)
+    return Plan(schema, operation, fragments, _Compiler(schema, fragments).selection(root_type, fields))
+
+
+def cached_plan(schema, parsed, operation_name=None):
+    """The plan of an operation of a ``ParsedDocument``, compiled on first use; None if unsupported."""
+    plans = parsed.plans
+    if operation_name not in plans:
+        try:
+            plans[operation_name] = compile_operation(schema, parsed.document, operation_name)
+        except Unsupported:
+            plans[operation_name] = None
+    return plans[operation_name]
+
+
+def execute_plan(schema, parsed, operation_name=None, **execute_options):
+    """Run the compiled plan of the operation; None when it has to go through ``graphql.execute``."""
+    if tuple(version_info[:3]) != GRAPHQL_CORE_VERSION:
+        return None
+    plan = cached_plan(schema, parsed, operation_name)
+    if plan is None:
+        return None
+    try:
+        return plan.execute(**execute_options)
+    except Unsupported:
+        # No se vuelve a intentar con esta operacion
+        parsed.plans[operation_name] = None
+        return None
@@ -0,0 +1,85 @@
+"""Parsed and validated GraphQL documents, kept per process.
+
+Clients send a small set of operations over and over. Parsing them and
+running every validation rule again on each request is wasted work, so the
+view keeps the last ``GRAPHQL_DOCUMENT_CACHE_SIZE`` documents in an LRU keyed
+by the hash of the query text. Validation depends on the schema: the cache
+empties itself when it is used with a different schema object.
+"""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from graphql import parse, print_ast
+from graphql.validation import validate
+
+MAX_ENTRIES = getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 500)
+
+# digest: sha256 del documento normalizado (sin espacios ni comentarios)
+# plans: operacion -> plan compilado o None (ver graphql_cache.compiler)
+ParsedDocument = namedtuple('ParsedDocument', ['document', 'validation_errors', 'digest', 'plans'])
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def parse_and_validate(schema, query, rules=None, max_errors=None):
+    """Parse ``query`` and validate it against ``schema``; syntax errors raise GraphQLError."""
+    document = parse(query)
+    errors = validate(schema, document, rules, max_errors)
+    return ParsedDocument(document, errors, query_hash(print_ast(document)), {})
+
+
+class DocumentCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.schema = None
+        self.documents = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, schema, query, rules=None, max_errors=None):
+        """The ``ParsedDocument`` of ``query``, parsing and validating it only on a miss."""
+        key = (query_hash(query), tuple(rules) if rules is not None else None, max_errors)
+        with self.lock:
+            if schema is not self.schema:
+                self.schema = schema
+                self.documents.clear()
+            parsed = self.documents.get(key)
+            if parsed is not None:
+                self.documents.move_to_end(key)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+
+        # Fuera del lock: validar es lo caro y dos hilos pueden hacerlo a la vez sin problema
+        parsed = parse_and_validate(schema, query, rules, max_errors)
+        with self.lock:
+            if schema is self.schema:
+                self.documents[key] = parsed
+                while len(self.documents) > self.max_entries:
+                    self.documents.popitem(last=False)
+                    self.evictions += 1
+        return parsed
+
+    def clear(self):
+        with self.lock:
+            self.documents.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.documents),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+document_cache = DocumentCache()
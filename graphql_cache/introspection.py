@@ -0,0 +1,102 @@
+"""Introspection answered from memory.
+
+The result of an introspection operation only depends on the schema, the
+document and its variables, so each process computes it once per schema
+object. The schema is also offered as SDL and as introspection JSON, with an
+ETag that only changes when the schema does.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from graphql import OperationType, execute, get_introspection_query, get_operation_ast, graphql_sync, print_schema
+
+MAX_ENTRIES = 100
+
+INTROSPECTION_FIELDS = {'__schema', '__type', '__typename'}
+
+
+def is_introspection(document, operation_name=None):
+    """Whether the operation is a query that only asks for introspection fields."""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return False
+    selections = operation.selection_set.selections
+    # Fragmentos y directivas en la raiz: mejor ejecutarlo sin cache
+    return all(
+        getattr(selection, 'name', None) is not None
+        and selection.name.value in INTROSPECTION_FIELDS
+        and not selection.directives
+        for selection in selections
+    )
+
+
+class IntrospectionCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.schema = None
+        self.results = OrderedDict()
+        self._sdl = self._json = self._etag = None
+        self.hits = self.misses = 0
+
+    def _check_schema(self, schema):
+        # Con self.lock tomado
+        if schema is not self.schema:
+            self.schema = schema
+            self.results.clear()
+            self._sdl = self._json = self._etag = None
+
+    def execute(self, schema, parsed, operation_name=None, variables=None):
+        """The ``ExecutionResult`` of an introspection operation, executed once per schema."""
+        key = (parsed.digest, operation_name, json.dumps(variables, sort_keys=True, default=str))
+        with self.lock:
+            self._check_schema(schema)
+            result = self.results.get(key)
+            if result is not None:
+                self.results.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = execute(schema, parsed.document, operation_name=operation_name, variable_values=variables)
+        if not result.errors:
+            with self.lock:
+                if schema is self.schema:
+                    self.results[key] = result
+                    while len(self.results) > self.max_entries:
+                        self.results.popitem(last=False)
+        return result
+
+    def sdl(self, schema):
+        with self.lock:
+            self._check_schema(schema)
+            if self._sdl is None:
+                self._sdl = print_schema(schema)
+            return self._sdl
+
+    def introspection_json(self, schema):
+        """The standard introspection query result, as the JSON body of a GraphQL response."""
+        with self.lock:
+            self._check_schema(schema)
+            if self._json is None:
+                result = graphql_sync(schema, get_introspection_query(descriptions=True))
+                self._json = json.dumps({'data': result.data}, separators=(',', ':'))
+            return self._json
+
+    def etag(self, schema):
+        """Strong ETag of the SDL and JSON downloads: it only changes with the schema."""
+        sdl = self.sdl(schema)
+        with self.lock:
+            if self._etag is None and schema is self.schema:
+                self._etag = '"%s"' % hashlib.sha256(sdl.encode()).hexdigest()[:32]
+            return self._etag
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.results)}
+
+
+introspection_cache = IntrospectionCache()
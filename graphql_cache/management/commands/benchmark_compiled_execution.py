@@ -0,0 +1,108 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from graphene_django.settings import graphene_settings
+from graphene_django.views import instantiate_middleware
+from graphql import execute
+from mixer.backend.django import mixer
+
+from graphql_cache.compiler import compile_operation
+from graphql_cache.documents import parse_and_validate
+from hacker_news.schema import schema
+from header.models import Header
+from links.models import Link, Vote
+from skills.models import Skill
+from workexperience.models import Archivement, WorkExperience
+
+OPERATIONS = {
+    'links feed': '''
+        query {
+          links(orderBy: VOTES_DESC) { id url description voteCount viewerHasVoted postedBy { username } }
+        }
+    ''',
+    'links connection': '''
+        query {
+          linksConnection(first: 100) {
+            edges { cursor node { id url voteCount viewerHasVoted } }
+            pageInfo { hasNextPage endCursor }
+          }
+        }
+    ''',
+    'skill connection': '''
+        query {
+          skillConnection(first: 100) { totalCount edges { node { id skill percent } } }
+        }
+    ''',
+    'full cv': '''
+        query {
+          fullCv {
+            header { name actualPosition email }
+            workExperiences { id position company archivements { id description } }
+            skills { id skill percent }
+          }
+        }
+    ''',
+    'header': 'query { getHeader { name actualPosition description email } }',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time graphql.execute against the compiled plan of each client operation '
+        'on synthetic data. Everything is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100)
+        parser.add_argument('--runs', type=int, default=50)
+
+    def handle(self, *args, rows, runs, **options):
+        self.stdout.write(f'{"operation":<18}{"execute ms":>12}{"compiled ms":>13}{"speedup":>9}')
+        with transaction.atomic():
+            user = self._populate(rows)
+            middleware = list(instantiate_middleware(graphene_settings.MIDDLEWARE))
+
+            for name, query in OPERATIONS.items():
+                document = parse_and_validate(schema.graphql_schema, query).document
+                plan = compile_operation(schema.graphql_schema, document)
+                standard = self._time(
+                    lambda request: execute(schema.graphql_schema, document, context_value=request, middleware=middleware),
+                    user, runs,
+                )
+                compiled = self._time(
+                    lambda request: plan.execute(context_value=request, middleware=middleware), user, runs,
+                )
+                if standard[1] != compiled[1]:
+                    raise AssertionError(f'{name}: the compiled plan returned a different result')
+                self.stdout.write(f'{name:<18}{standard[0]:>12.2f}{compiled[0]:>13.2f}{standard[0] / compiled[0]:>8.2f}x')
+            transaction.set_rollback(True)
+
+    def _populate(self, rows):
+        user = mixer.blend(get_user_model())
+        # Solo puede existir un Header
+        if not Header.objects.exists():
+            mixer.blend(Header, posted_by=user)
+        links = mixer.cycle(rows).blend(Link, posted_by=user)
+        for link in links[::2]:
+            mixer.blend(Vote, user=user, link=link)
+        mixer.cycle(rows).blend(Skill, posted_by=user)
+        for work in mixer.cycle(rows // 5 or 1).blend(WorkExperience, posted_by=user):
+            mixer.cycle(3).blend(Archivement, work_experience=work)
+        return user
+
+    def _time(self, run, user, runs):
+        timings = []
+        for _ in range(runs):
+            # Una peticion nueva en cada vuelta: los loaders no se comparten
+            request = RequestFactory().post('/graphql/')
+            request.user = user
+            start = time.perf_counter()
+            result = run(request)
+            timings.append((time.perf_counter() - start) * 1000)
+            if result.errors:
+                raise result.errors[0]
+        return statistics.median(timings), result.data
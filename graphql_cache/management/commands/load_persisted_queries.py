@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError
+
+from graphql_cache.documents import parse_and_validate
+from graphql_cache.models import PersistedQuery
+from graphql_cache.persisted import sha256
+from hacker_news.schema import schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Store the client operations of an Apollo persisted query manifest '
+        '(or a {sha256: query} map), parsing and validating each one first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest')
+
+    def handle(self, *args, manifest, **options):
+        with open(manifest) as manifest_file:
+            content = json.load(manifest_file)
+        if 'operations' in content:
+            queries = {operation['id']: operation['body'] for operation in content['operations']}
+        else:
+            queries = content
+
+        invalid = []
+        for query_hash, query in queries.items():
+            if sha256(query) != query_hash:
+                invalid.append(f'{query_hash}: provided sha does not match query')
+                continue
+            try:
+                errors = parse_and_validate(
+                    schema.graphql_schema, query, max_errors=graphene_settings.MAX_VALIDATION_ERRORS,
+                ).validation_errors
+            except GraphQLError as error:
+                errors = [error]
+            invalid += [f'{query_hash}: {error.message}' for error in errors]
+        if invalid:
+            raise CommandError('Invalid operations, nothing stored:\n' + '\n'.join(invalid))
+
+        with transaction.atomic():
+            PersistedQuery.objects.bulk_create(
+                [PersistedQuery(sha256=query_hash, query=query) for query_hash, query in queries.items()],
+                update_conflicts=True, unique_fields=['sha256'], update_fields=['query'],
+            )
+        self.stdout.write(f'Stored {len(queries)} persisted queries.')
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64)),
+                ('owner', models.BigIntegerField(default=0)),
+                ('version', models.CharField(max_length=32)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='tableversion',
+            constraint=models.UniqueConstraint(fields=('owner', 'table'), name='table_version_unique'),
+        ),
+    ]
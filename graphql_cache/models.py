@@ -0,0 +1,20 @@
+from django.db import models
+
+# Version de los datos de una tabla para un usuario (owner=0: toda la tabla).
+# Cada escritura la cambia por un valor aleatorio; ver graphql_cache.versions.
+class TableVersion(models.Model):
+    table   = models.CharField(max_length=64)
+    owner   = models.BigIntegerField(default=0)
+    version = models.CharField(max_length=32)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'table'], name='table_version_unique'),
+        ]
+
+
+# Consultas persistidas (APQ): el cliente manda el sha256 en lugar del texto
+class PersistedQuery(models.Model):
+    sha256     = models.CharField(max_length=64, primary_key=True)
+    query      = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,131 @@
+"""Automatic persisted queries, following Apollo's APQ protocol.
+
+A request may carry ``extensions.persistedQuery.sha256Hash`` instead of the
+query text. An unknown hash answers ``PersistedQueryNotFound``; the client
+then retries with the text and the hash in a POST, and the query is stored
+once it parses and validates. A GET never registers a query. With ``GRAPHQL_PERSISTED_QUERIES_ONLY`` only stored
+queries run: ad-hoc texts are rejected and new hashes are not registered,
+so the store is filled by ``load_persisted_queries``. Otherwise anyone can
+register queries, so the table keeps at most
+``GRAPHQL_PERSISTED_QUERY_MAX_ROWS`` of them and drops the oldest.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import PersistedQuery
+
+PERSISTED_ONLY = getattr(settings, 'GRAPHQL_PERSISTED_QUERIES_ONLY', False)
+MAX_ENTRIES = getattr(settings, 'GRAPHQL_PERSISTED_QUERY_CACHE_SIZE', 1000)
+MAX_ROWS = getattr(settings, 'GRAPHQL_PERSISTED_QUERY_MAX_ROWS', 10000)
+
+
+class PersistedQueryError(Exception):
+    message = None
+    code = None
+    status = 200
+
+    def as_error(self):
+        return {'message': self.message, 'extensions': {'code': self.code}}
+
+
+class PersistedQueryNotFound(PersistedQueryError):
+    message = 'PersistedQueryNotFound'
+    code = 'PERSISTED_QUERY_NOT_FOUND'
+
+
+class PersistedQueryRequired(PersistedQueryError):
+    message = 'PersistedQueryRequired'
+    code = 'PERSISTED_QUERY_REQUIRED'
+
+
+class PersistedQueryHashMismatch(PersistedQueryError):
+    message = 'provided sha does not match query'
+    code = 'PERSISTED_QUERY_HASH_MISMATCH'
+
+
+class PersistedQueryNotSupported(PersistedQueryError):
+    message = 'PersistedQueryNotSupported'
+    code = 'PERSISTED_QUERY_NOT_SUPPORTED'
+
+
+class PersistedQueryInvalid(PersistedQueryError):
+    message = 'Invalid persistedQuery extension'
+    code = 'PERSISTED_QUERY_INVALID'
+    status = 400
+
+
+def sha256(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class PersistedQueryStore:
+    """The stored queries, with the ones in use kept in memory."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_rows=MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.queries = OrderedDict()
+
+    def get(self, query_hash):
+        with self.lock:
+            query = self.queries.get(query_hash)
+            if query is not None:
+                self.queries.move_to_end(query_hash)
+                return query
+        query = PersistedQuery.objects.filter(sha256=query_hash).values_list('query', flat=True).first()
+        if query is not None:
+            self._remember(query_hash, query)
+        return query
+
+    def add(self, query_hash, query):
+        _, created = PersistedQuery.objects.get_or_create(sha256=query_hash, defaults={'query': query})
+        if created:
+            self._evict()
+        self._remember(query_hash, query)
+
+    def _evict(self):
+        # Por encima del limite salen las mas antiguas; un cliente que las use las vuelve a registrar
+        rows = PersistedQuery.objects.order_by('-created_at', '-sha256').values_list('sha256', flat=True)
+        evicted = list(rows[self.max_rows:])
+        if not evicted:
+            return
+        PersistedQuery.objects.filter(sha256__in=evicted).delete()
+        with self.lock:
+            for query_hash in evicted:
+                self.queries.pop(query_hash, None)
+
+    def _remember(self, query_hash, query):
+        with self.lock:
+            self.queries[query_hash] = query
+            self.queries.move_to_end(query_hash)
+            while len(self.queries) > self.max_entries:
+                self.queries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.queries.clear()
+
+
+store = PersistedQueryStore()
+
+
+def persisted_query_extension(request, data):
+    """The ``persistedQuery`` extension of the request, or None; a malformed one raises ``PersistedQueryInvalid``."""
+    extensions = request.GET.get('extensions') or data.get('extensions')
+    if isinstance(extensions, str):
+        # En GET las extensiones llegan como JSON en la URL
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            return None
+    if not isinstance(extensions, dict):
+        return None
+    extension = extensions.get('persistedQuery')
+    if extension is not None and not isinstance(extension, dict):
+        raise PersistedQueryInvalid()
+    return extension
@@ -0,0 +1,131 @@
+"""Cached GraphQL responses, stored in a Django cache.
+
+Only successful ``query`` operations are cached, keyed by the normalized
+document, the variables, the operation name and the user. Each entry keeps
+the versions of the tables it read (see ``graphql_cache.versions``) and is
+dropped when any of them changed. Entries expire after
+``GRAPHQL_RESPONSE_CACHE_TTL`` seconds and each process keeps at most
+``GRAPHQL_RESPONSE_CACHE_MAX_ENTRIES``, evicting the least recently used.
+
+The versions also give each entry an ETag, so a GET whose ``If-None-Match``
+still matches is answered ``304 Not Modified`` without running resolvers.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import OperationType, get_operation_ast
+
+TTL = getattr(settings, 'GRAPHQL_RESPONSE_CACHE_TTL', 60)
+MAX_ENTRIES = getattr(settings, 'GRAPHQL_RESPONSE_CACHE_MAX_ENTRIES', 1000)
+CACHE_ALIAS = getattr(settings, 'GRAPHQL_RESPONSE_CACHE_ALIAS', 'default')
+
+KEY_PREFIX = 'graphql-response:'
+
+
+class ResponseCache:
+
+    def __init__(self, ttl=TTL, max_entries=MAX_ENTRIES, alias=CACHE_ALIAS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.alias = alias
+        self.lock = threading.Lock()
+        # claves guardadas por este proceso, de la menos a la mas usada
+        self.keys = OrderedDict()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key, versions):
+        """The cached entry for ``key`` if still valid under ``versions``.
+
+        An entry has the ``(result, status_code)`` ``response``, the ``versions``
+        it was computed from and its ``etag``.
+        """
+        entry = self.cache.get(key)
+        with self.lock:
+            if entry is None:
+                self.keys.pop(key, None)
+                self.misses += 1
+                return None
+            if any(versions.get(tag, '') != version for tag, version in entry['versions'].items()):
+                self.keys.pop(key, None)
+                self.misses += 1
+                self.invalidations += 1
+                stale = True
+            else:
+                evicted = self._touch(key)
+                self.hits += 1
+                stale = False
+        if stale:
+            self.cache.delete(key)
+            return None
+        if evicted:
+            self.cache.delete_many(evicted)
+        return entry
+
+    def set(self, key, response, tags, versions):
+        entry_versions = {tag: versions.get(tag, '') for tag in tags}
+        entry = {
+            'response': response,
+            'versions': entry_versions,
+            'etag': etag(key, entry_versions),
+        }
+        self.cache.set(key, entry, self.ttl)
+        with self.lock:
+            evicted = self._touch(key)
+        if evicted:
+            self.cache.delete_many(evicted)
+        return entry
+
+    def _touch(self, key):
+        # Con self.lock tomado; devuelve las claves que salen del LRU
+        self.keys[key] = True
+        self.keys.move_to_end(key)
+        evicted = []
+        while len(self.keys) > self.max_entries:
+            evicted.append(self.keys.popitem(last=False)[0])
+        self.evictions += len(evicted)
+        return evicted
+
+    def clear(self):
+        with self.lock:
+            keys = list(self.keys)
+            self.keys.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+        self.cache.delete_many(keys)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self.keys),
+            }
+
+
+response_cache = ResponseCache()
+
+
+def etag(key, versions):
+    """Strong ETag of a response: same query, user and data versions, same body."""
+    payload = json.dumps([key, sorted([table, owner, version] for (table, owner), version in versions.items())])
+    return '"%s"' % hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def cache_key(parsed, variables, operation_name, user_id):
+    """Key of a query operation (a ``ParsedDocument``), or None if it is not a cacheable query."""
+    operation = get_operation_ast(parsed.document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY or parsed.validation_errors:
+        return None
+
+    # El digest es del documento normalizado: espacios, comas y comentarios no cuentan
+    payload = json.dumps([parsed.digest, operation_name, variables, user_id], sort_keys=True, default=str)
+    return KEY_PREFIX + hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,34 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from hacker_news.owners import previous_owner
+
+from .versions import GLOBAL, invalidate, is_tracked, owner_of, tracked_tables
+
+
+def model_saving(sender, instance, raw=False, **kwargs):
+    # Una fila puede cambiar de dueño: las respuestas del anterior tambien caducan
+    if raw or instance.pk is None or not hasattr(instance, 'posted_by_id'):
+        return
+    if tracked_tables().get(sender._meta.db_table) is None:
+        return
+    previous = previous_owner(instance)
+    if previous is not None and previous != instance.posted_by_id:
+        invalidate(sender, previous)
+
+
+def model_changed(sender, instance, raw=False, **kwargs):
+    if not raw and is_tracked(sender):
+        invalidate(sender, owner_of(instance))
+
+
+def relation_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and is_tracked(sender):
+        invalidate(sender, GLOBAL)
+
+
+def connect():
+    # Sin sender: cualquier modelo, los no seguidos se descartan en el handler
+    pre_save.connect(model_saving, dispatch_uid='graphql_cache_saving')
+    post_save.connect(model_changed, dispatch_uid='graphql_cache_saved')
+    post_delete.connect(model_changed, dispatch_uid='graphql_cache_deleted')
+    m2m_changed.connect(relation_changed, dispatch_uid='graphql_cache_relation')
@@ -0,0 +1,616 @@
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql.validation import validate
+from unittest import mock
+import graphene
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from graphene_django.settings import graphene_settings
+from graphql import execute, get_introspection_query, parse
+from graphql_jwt.middleware import JSONWebTokenMiddleware
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from mixer.backend.django import mixer
+import json
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from hacker_news.schema import schema
+from graphql_cache.compiler import Plan, Unsupported, compile_operation
+from graphql_cache.documents import DocumentCache, document_cache, parse_and_validate
+from graphql_cache.introspection import introspection_cache, is_introspection
+from graphql_cache.models import PersistedQuery
+from graphql_cache.persisted import sha256, store
+from graphql_cache.response_cache import cache_key, response_cache
+from graphql_cache.versions import invalidate
+from hacker_news.testing import login
+from links.models import Link, Vote
+from skills.models import Skill
+
+# Create your tests here.
+
+GET_SKILLS = '''
+query {
+  skill {
+    id
+    skill
+  }
+}
+'''
+
+GET_SKILLS_REFORMATTED = '''
+query {  skill { id, skill }  }
+'''
+
+GET_SKILL_BY_ID = '''
+query GetSkillById($idSkill: Int!) {
+  skillById(idSkill: $idSkill) {
+    id
+    skill
+  }
+}
+'''
+
+GET_USERS_SKILLS = '''
+query {
+  users {
+    username
+    skillSet {
+      skill
+    }
+  }
+}
+'''
+
+CREATE_SKILL_MUTATION = '''
+mutation CreateSkill($idSkill: Int, $skill: String!, $percent: Int!) {
+  createSkill(idSkill: $idSkill, skill: $skill, percent: $percent) {
+    idSkill
+  }
+}
+'''
+
+class ResponseCacheTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+
+        self.headers = self.login('adsoft')
+        self.user = get_user_model().objects.get(username="adsoft")
+        self.skill = mixer.blend(Skill, skill="Python", posted_by=self.user)
+
+    def login(self, username):
+        return {"AUTHORIZATION": f"JWT {login(self, username)}"}
+
+    def skills(self, query=GET_SKILLS, headers=None):
+        response = self.query(query, headers=headers or self.headers)
+        self.assertResponseNoErrors(response)
+        names = [skill['skill'] for skill in json.loads(response.content)['data']['skill']]
+        return names, response['X-GraphQL-Cache']
+
+    def test_repeated_query_is_a_hit(self):
+        assert self.skills() == (['Python'], 'MISS')
+
+        with CaptureQueriesContext(connection) as context:
+            assert self.skills() == (['Python'], 'HIT')
+
+        # solo versiones: el usuario del token sale de user_cache y no corre ningun resolver
+        assert len(context.captured_queries) == 1
+        assert response_cache.stats()['hits'] == 1
+
+    def test_key_uses_normalized_query(self):
+        self.skills()
+
+        assert self.skills(GET_SKILLS_REFORMATTED) == (['Python'], 'HIT')
+        parsed = document_cache.get(schema.graphql_schema, GET_SKILLS)
+        assert cache_key(parsed, None, None, 1) != cache_key(parsed, None, None, 2)
+        assert cache_key(parsed, {'a': 1}, None, 1) != cache_key(parsed, {'a': 2}, None, 1)
+
+    def test_write_invalidates_owner_entries(self):
+        self.skills()
+
+        response = self.query(
+            CREATE_SKILL_MUTATION, variables={'idSkill': None, 'skill': 'Django', 'percent': 80}, headers=self.headers
+        )
+        self.assertResponseNoErrors(response)
+
+        names, status = self.skills()
+        assert sorted(names) == ['Django', 'Python']
+        assert status == 'MISS'
+        assert response_cache.stats()['invalidations'] == 1
+
+    def test_other_user_write_keeps_entry(self):
+        self.skills()
+        other = mixer.blend(get_user_model())
+
+        mixer.blend(Skill, skill="Go", posted_by=other)
+
+        assert self.skills() == (['Python'], 'HIT')
+
+    def test_other_user_write_invalidates_reads_of_every_user(self):
+        other = mixer.blend(get_user_model())
+        self.query(GET_USERS_SKILLS, headers=self.headers)
+
+        mixer.blend(Skill, skill="Go", posted_by=other)
+        response = self.query(GET_USERS_SKILLS, headers=self.headers)
+
+        assert response['X-GraphQL-Cache'] == 'MISS'
+        users = {user['username']: user['skillSet'] for user in json.loads(response.content)['data']['users']}
+        assert users[other.username] == [{'skill': 'Go'}]
+
+    def test_global_invalidation_reaches_owner_entries(self):
+        self.skills()
+
+        invalidate(Skill)
+
+        assert self.skills() == (['Python'], 'MISS')
+
+    def test_delete_invalidates(self):
+        self.skills()
+
+        self.skill.delete()
+
+        assert self.skills() == ([], 'MISS')
+
+    def test_users_do_not_share_entries(self):
+        self.skills()
+        headers = self.login('other')
+
+        assert self.skills(headers=headers) == ([], 'MISS')
+
+    def test_mutations_are_not_cached(self):
+        variables = {'idSkill': None, 'skill': 'Django', 'percent': 80}
+        first = self.query(CREATE_SKILL_MUTATION, variables=variables, headers=self.headers)
+        second = self.query(CREATE_SKILL_MUTATION, variables=variables, headers=self.headers)
+
+        assert first['X-GraphQL-Cache'] == second['X-GraphQL-Cache'] == 'BYPASS'
+        assert Skill.objects.filter(posted_by=self.user, skill='Django').count() == 2
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            response = self.query(GET_SKILL_BY_ID, variables={'idSkill': 1})
+            assert 'errors' in json.loads(response.content)
+            assert response['X-GraphQL-Cache'] == 'MISS'
+
+    def test_lru_eviction(self):
+        self.addCleanup(setattr, response_cache, 'max_entries', response_cache.max_entries)
+        response_cache.max_entries = 2
+        queries = [{'idSkill': self.skill.id}, {'idSkill': self.skill.id + 1}, {'idSkill': self.skill.id + 2}]
+
+        for variables in queries:
+            self.query(GET_SKILL_BY_ID, variables=variables, headers=self.headers)
+        # La primera fue la menos usada: ya no esta
+        response = self.query(GET_SKILL_BY_ID, variables=queries[0], headers=self.headers)
+
+        assert response['X-GraphQL-Cache'] == 'MISS'
+        stats = response_cache.stats()
+        assert stats['evictions'] == 2
+        assert stats['entries'] == 2
+
+
+class ETagTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+
+        self.token = login(self, 'adsoft')
+        self.headers = {"AUTHORIZATION": f"JWT {self.token}"}
+        self.user = get_user_model().objects.get(username="adsoft")
+        mixer.blend(Skill, skill="Python", posted_by=self.user)
+
+    def get(self, query=GET_SKILLS, etag=None):
+        headers = {'HTTP_AUTHORIZATION': f'JWT {self.token}', 'HTTP_ACCEPT': 'application/json'}
+        if etag is not None:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        return self.client.get('/graphql/', {'query': query}, **headers)
+
+    def test_get_has_etag(self):
+        response = self.get()
+
+        assert response.status_code == 200
+        assert response['ETag'].startswith('"')
+        assert 'private' in response['Cache-Control'] and 'no-cache' in response['Cache-Control']
+        assert 'Authorization' in response['Vary']
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get()['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.get(etag=etag)
+
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response['ETag'] == etag
+        # solo versiones: el usuario del token sale de user_cache y no corre ningun resolver
+        assert len(context.captured_queries) == 1
+
+    def test_write_changes_etag(self):
+        etag = self.get()['ETag']
+
+        response = self.query(
+            CREATE_SKILL_MUTATION, variables={'idSkill': None, 'skill': 'Django', 'percent': 80}, headers=self.headers
+        )
+        self.assertResponseNoErrors(response)
+        response = self.get(etag=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert len(json.loads(response.content)['data']['skill']) == 2
+
+    def test_other_user_write_changes_etag_of_shared_read(self):
+        other = mixer.blend(get_user_model())
+        etag = self.get(GET_USERS_SKILLS)['ETag']
+
+        mixer.blend(Skill, skill="Go", posted_by=other)
+        response = self.get(GET_USERS_SKILLS, etag=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_other_user_write_keeps_etag_of_own_read(self):
+        other = mixer.blend(get_user_model())
+        etag = self.get()['ETag']
+
+        mixer.blend(Skill, skill="Go", posted_by=other)
+
+        assert self.get(etag=etag).status_code == 304
+
+    def test_etag_survives_cache_eviction(self):
+        etag = self.get()['ETag']
+        response_cache.clear()
+
+        response = self.get(etag=etag)
+
+        assert response.status_code == 304
+        assert response['X-GraphQL-Cache'] == 'MISS'
+
+    def test_post_has_no_etag(self):
+        response = self.query(GET_SKILLS, headers=self.headers)
+
+        assert response.status_code == 200
+        assert not response.has_header('ETag')
+
+
+class DocumentCacheTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        document_cache.clear()
+        self.addCleanup(document_cache.clear)
+
+    def test_repeated_query_parsed_once(self):
+        with mock.patch('graphql_cache.documents.validate', wraps=validate) as validator:
+            for _ in range(3):
+                response = self.query(GET_SKILL_BY_ID, variables={'idSkill': 1})
+                assert 'errors' in json.loads(response.content)
+
+        assert validator.call_count == 1
+        stats = document_cache.stats()
+        assert (stats['hits'], stats['misses']) == (2, 1)
+        assert stats['hit_rate'] == 2 / 3
+
+    def test_validation_errors_are_cached(self):
+        for _ in range(2):
+            response = self.query('query { skill { unknownField } }')
+            content = json.loads(response.content)
+            assert 'unknownField' in content['errors'][0]['message']
+
+        assert document_cache.stats()['hits'] == 1
+
+    def test_syntax_errors_are_reported(self):
+        response = self.query('query { skill { ')
+
+        assert 'Syntax Error' in json.loads(response.content)['errors'][0]['message']
+        assert document_cache.stats()['entries'] == 0
+
+    def test_new_schema_empties_cache(self):
+        cache = DocumentCache()
+        cache.get(schema.graphql_schema, GET_SKILLS)
+        other_schema = graphene.Schema(query=schema.query)
+
+        cache.get(other_schema.graphql_schema, GET_SKILLS)
+
+        assert cache.stats() == {'hits': 0, 'misses': 2, 'evictions': 0, 'entries': 1, 'hit_rate': 0.0}
+
+    def test_lru_eviction(self):
+        cache = DocumentCache(max_entries=1)
+        cache.get(schema.graphql_schema, GET_SKILLS)
+        cache.get(schema.graphql_schema, GET_SKILL_BY_ID)
+
+        cache.get(schema.graphql_schema, GET_SKILLS)
+
+        assert cache.stats()['evictions'] == 2
+
+
+class PersistedQueryTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        store.clear()
+        self.addCleanup(store.clear)
+        self.hash = sha256(GET_SKILL_BY_ID)
+
+    def post(self, query=None, query_hash=None, variables=None):
+        body = {'variables': variables or {'idSkill': 1}}
+        if query is not None:
+            body['query'] = query
+        if query_hash is not None:
+            body['extensions'] = {'persistedQuery': {'version': 1, 'sha256Hash': query_hash}}
+        response = self.client.post(self.GRAPHQL_URL, json.dumps(body), content_type='application/json')
+        return json.loads(response.content)
+
+    def test_unknown_hash_not_found(self):
+        content = self.post(query_hash=self.hash)
+
+        assert content['errors'][0]['message'] == 'PersistedQueryNotFound'
+        assert content['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_NOT_FOUND'
+
+    def test_register_then_send_hash_only(self):
+        content = self.post(GET_SKILL_BY_ID, self.hash)
+        assert content['errors'][0]['message'] == 'Not logged in!'
+        assert PersistedQuery.objects.filter(sha256=self.hash).exists()
+
+        store.clear()
+        content = self.post(query_hash=self.hash)
+
+        assert content['errors'][0]['message'] == 'Not logged in!'
+
+    def test_hash_only_over_get(self):
+        PersistedQuery.objects.create(sha256=self.hash, query=GET_SKILL_BY_ID)
+        extensions = json.dumps({'persistedQuery': {'version': 1, 'sha256Hash': self.hash}})
+
+        response = self.client.get(
+            '/graphql/', {'extensions': extensions, 'variables': json.dumps({'idSkill': 1})},
+            HTTP_ACCEPT='application/json',
+        )
+
+        assert json.loads(response.content)['errors'][0]['message'] == 'Not logged in!'
+
+    def test_oldest_queries_evicted_over_the_limit(self):
+        queries = [f'query Q{number} {{ skill {{ id }} }}' for number in range(4)]
+        with mock.patch.object(store, 'max_rows', 3):
+            for query in queries:
+                self.post(query, sha256(query))
+
+        stored = set(PersistedQuery.objects.values_list('sha256', flat=True))
+        assert stored == {sha256(query) for query in queries[1:]}
+        assert store.get(sha256(queries[0])) is None
+
+    def test_get_does_not_register(self):
+        extensions = json.dumps({'persistedQuery': {'version': 1, 'sha256Hash': self.hash}})
+
+        response = self.client.get(
+            '/graphql/', {'query': GET_SKILL_BY_ID, 'extensions': extensions, 'variables': json.dumps({'idSkill': 1})},
+            HTTP_ACCEPT='application/json',
+        )
+
+        assert json.loads(response.content)['errors'][0]['message'] == 'Not logged in!'
+        assert not PersistedQuery.objects.exists()
+
+    def test_malformed_extension(self):
+        bodies = [
+            {'extensions': {'persistedQuery': 'abc'}},
+            {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': 123}}},
+            {'query': ['query { skills { id } }'], 'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': self.hash}}},
+        ]
+        for body in bodies:
+            response = self.client.post(self.GRAPHQL_URL, json.dumps(body), content_type='application/json')
+
+            assert response.status_code == 400
+            assert json.loads(response.content)['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_INVALID'
+        assert not PersistedQuery.objects.exists()
+
+    def test_hash_mismatch(self):
+        content = self.post(GET_SKILL_BY_ID, sha256(GET_SKILLS))
+
+        assert content['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_HASH_MISMATCH'
+        assert not PersistedQuery.objects.exists()
+
+    def test_invalid_query_not_stored(self):
+        query = 'query { skill { unknownField } }'
+
+        content = self.post(query, sha256(query))
+
+        assert 'unknownField' in content['errors'][0]['message']
+        assert not PersistedQuery.objects.exists()
+
+    def test_persisted_only_mode(self):
+        PersistedQuery.objects.create(sha256=self.hash, query=GET_SKILL_BY_ID)
+
+        with mock.patch('graphql_cache.persisted.PERSISTED_ONLY', True):
+            ad_hoc = self.post(GET_SKILLS)
+            unregistered = self.post(GET_SKILLS, sha256(GET_SKILLS))
+            stored = self.post(query_hash=self.hash)
+
+        assert ad_hoc['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_REQUIRED'
+        assert unregistered['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_NOT_FOUND'
+        assert stored['errors'][0]['message'] == 'Not logged in!'
+        assert PersistedQuery.objects.count() == 1
+
+    def test_load_manifest(self):
+        manifest = {'format': 'apollo-persisted-query-manifest', 'version': 1, 'operations': [
+            {'id': self.hash, 'name': 'GetSkillById', 'type': 'query', 'body': GET_SKILL_BY_ID},
+        ]}
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as manifest_file:
+            json.dump(manifest, manifest_file)
+            manifest_file.flush()
+            call_command('load_persisted_queries', manifest_file.name, stdout=StringIO())
+
+        assert PersistedQuery.objects.get(sha256=self.hash).query == GET_SKILL_BY_ID
+
+    def test_load_rejects_invalid_operations(self):
+        query = 'query { skill { unknownField } }'
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as manifest_file:
+            json.dump({sha256(query): query, self.hash: GET_SKILL_BY_ID}, manifest_file)
+            manifest_file.flush()
+            with self.assertRaises(CommandError):
+                call_command('load_persisted_queries', manifest_file.name, stdout=StringIO())
+
+        assert not PersistedQuery.objects.exists()
+
+
+COMPILED_QUERIES = {
+    'fragments': ('''
+query Feed {
+  first: links(orderBy: VOTES_DESC) { ...LinkFields }
+  links { id __typename postedBy { username } }
+}
+fragment LinkFields on LinkType { id url voteCount viewerHasVoted }
+''', None),
+    'connection': ('''
+query ($first: Int, $after: String) {
+  linksConnection(first: $first, after: $after) {
+    edges { cursor node { id description } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+''', {'first': 2}),
+    'errors': ('''
+query ($idSkill: Int!) {
+  links { id }
+  skillById(idSkill: $idSkill) { id skill }
+}
+''', {'idSkill': 1}),
+    'cv': ('''
+query {
+  fullCv {
+    header { name }
+    skills { id skill percent }
+    workExperiences { id archivements { id } }
+  }
+}
+''', None),
+}
+
+
+class CompiledExecutionTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        self.user = mixer.blend(get_user_model())
+        mixer.cycle(3).blend(Skill, posted_by=self.user)
+        links = mixer.cycle(3).blend(Link, posted_by=self.user)
+        mixer.blend(Vote, user=self.user, link=links[0])
+
+    def execute(self, query, variables, user, compiled):
+        request = RequestFactory().post('/graphql/')
+        request.user = user
+        document = parse_and_validate(schema.graphql_schema, query).document
+        options = {'context_value': request, 'variable_values': variables, 'middleware': [JSONWebTokenMiddleware()]}
+        if compiled:
+            result = compile_operation(schema.graphql_schema, document).execute(**options)
+        else:
+            result = execute(schema.graphql_schema, document, **options)
+        return result.data, [error.formatted for error in result.errors or ()]
+
+    def test_same_result_as_standard_executor(self):
+        for user in (self.user, AnonymousUser()):
+            for name, (query, variables) in COMPILED_QUERIES.items():
+                with self.subTest(name, anonymous=user.is_anonymous):
+                    assert self.execute(query, variables, user, True) == self.execute(query, variables, user, False)
+
+    def test_unsupported_operations(self):
+        for query in (
+            'query ($on: Boolean!) { links { id url @include(if: $on) } }',
+            'query { __schema { queryType { name } } }',
+            'mutation { deleteHeader { message } }',
+        ):
+            with self.subTest(query), self.assertRaises(Unsupported):
+                compile_operation(schema.graphql_schema, parse_and_validate(schema.graphql_schema, query).document)
+
+    def view_plans(self, query, variables, extensions=None):
+        for cache in (document_cache, store, response_cache):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        body = {'query': query, 'variables': variables}
+        if extensions is not None:
+            body['extensions'] = extensions
+
+        with mock.patch('graphql_cache.views.COMPILED_EXECUTION', True):
+            response = self.client.post(self.GRAPHQL_URL, json.dumps(body), content_type='application/json')
+
+        self.assertResponseNoErrors(response)
+        assert len(json.loads(response.content)['data']['linksConnection']['edges']) == 2
+        return document_cache.get(schema.graphql_schema, query, None, graphene_settings.MAX_VALIDATION_ERRORS).plans
+
+    def test_view_keeps_plan_of_persisted_query(self):
+        query, variables = COMPILED_QUERIES['connection']
+
+        plans = self.view_plans(query, variables, {'persistedQuery': {'version': 1, 'sha256Hash': sha256(query)}})
+
+        assert isinstance(plans[None], Plan)
+
+    def test_view_runs_ad_hoc_query_without_plan(self):
+        query, variables = COMPILED_QUERIES['connection']
+
+        assert self.view_plans(query, variables) == {}
+
+    def test_other_graphql_core_without_plan(self):
+        query, variables = COMPILED_QUERIES['connection']
+
+        with mock.patch('graphql_cache.compiler.GRAPHQL_CORE_VERSION', (3, 3, 0)):
+            plans = self.view_plans(query, variables, {'persistedQuery': {'version': 1, 'sha256Hash': sha256(query)}})
+
+        assert plans == {}
+
+
+class IntrospectionTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        self.addCleanup(setattr, introspection_cache, 'schema', None)
+        introspection_cache.schema = None
+
+    def test_introspection_executed_once(self):
+        query = get_introspection_query()
+        first = self.query(query)
+
+        with mock.patch('graphql_cache.introspection.execute') as executor:
+            second = self.query(query)
+
+        executor.assert_not_called()
+        assert json.loads(first.content) == json.loads(second.content)
+        assert 'queryType' in json.loads(second.content)['data']['__schema']
+
+    def test_type_query_keyed_by_variables(self):
+        query = 'query ($name: String!) { __type(name: $name) { name } }'
+
+        skill = self.query(query, variables={'name': 'SkillType'})
+        link = self.query(query, variables={'name': 'LinkType'})
+
+        assert json.loads(skill.content)['data']['__type']['name'] == 'SkillType'
+        assert json.loads(link.content)['data']['__type']['name'] == 'LinkType'
+
+    def test_is_introspection(self):
+        def check(query):
+            return is_introspection(parse(query))
+
+        assert check('{ __schema { types { name } } }')
+        assert check('{ __typename __type(name: "Query") { name } }')
+        assert not check('{ __schema { types { name } } links { id } }')
+        assert not check('mutation { __typename }')
+
+    def test_schema_downloads(self):
+        sdl = self.client.get('/graphql/schema.graphql')
+        document = self.client.get('/graphql/schema.json')
+
+        assert sdl.status_code == document.status_code == 200
+        assert 'type Query' in sdl.content.decode()
+        assert '__schema' in json.loads(document.content)['data']
+        assert sdl['ETag'] != document['ETag']
+        assert 'max-age' in sdl['Cache-Control']
+
+        not_modified = self.client.get('/graphql/schema.graphql', HTTP_IF_NONE_MATCH=sdl['ETag'])
+        assert not_modified.status_code == 304
@@ -0,0 +1,176 @@
+"""Data versions the GraphQL response cache validates its entries against.
+
+Every table has a global version, ``owner=0`` (any row changed), and the
+tables whose rows belong to a user also have one per user (rows of that user
+changed). A write changes both. A read filtered by the owner column of the
+requesting user (``posted_by_id = <user>``) depends on that user's version
+only, so other users' writes keep it cached; any other read of the table,
+such as the skills of every user, depends on the global version. Writes
+that don't belong to one user (``invalidate(model)`` from a command, for
+instance) also change an ``owner=-1`` version that every owned read depends
+on.
+
+Writes replace the versions with a random value in the same transaction as
+the write, so a rolled back write leaves them untouched. A cached response
+remembers the versions of the tables it read and is only served while all of
+them are unchanged.
+"""
+import contextvars
+import re
+import secrets
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db import connection
+
+from .models import TableVersion
+
+GLOBAL = 0
+EVERYONE = -1
+
+# SELECT ... FROM "tabla" / JOIN "tabla"; las subconsultas empiezan por "(" y no cuentan
+TABLE_RE = re.compile(r'\b(?:FROM|JOIN)\s+["`]?(\w+)', re.IGNORECASE)
+
+# Modelos que el cache no sigue: se escriben en casi cada peticion y GraphQL no los lee
+IGNORED_MODELS = ('graphql_cache.TableVersion', 'sessions.Session')
+
+# Tablas leidas con SQL propio -> tabla cuyas escrituras las cambian
+TABLE_ALIASES = {
+    'search_searchdocument_fts': 'search_searchdocument',
+}
+
+# tablas que se siguen -> columna o funcion que da el usuario de una fila, o None si la tabla es global
+_tracked = None
+
+# dependencias de la respuesta que se esta calculando; None fuera de una captura
+_dependencies = contextvars.ContextVar('graphql_cache_dependencies', default=None)
+
+
+def _work_owner(archivement):
+    WorkExperience = apps.get_model('workexperience', 'WorkExperience')
+    return WorkExperience.objects.filter(pk=archivement.work_experience_id).values_list('posted_by_id', flat=True).first()
+
+
+# Tablas con dueño -> columna con su id, o funcion que lo busca si la tabla no la tiene
+USER_SCOPED = {
+    'archivements.Archivements': 'posted_by_id',
+    'education.Education': 'posted_by_id',
+    'interest.Interest': 'posted_by_id',
+    'language.Language': 'posted_by_id',
+    'skills.Skill': 'posted_by_id',
+    'workexperience.WorkExperience': 'posted_by_id',
+    'workexperience.Archivement': _work_owner,
+    'search.SearchDocument': 'posted_by_id',
+    'cv.CvSnapshot': 'user_id',
+}
+
+# Filtros que Django escribe con OR: la lectura ya no es solo de un dueño
+OR_RE = re.compile(r'\bOR\b', re.IGNORECASE)
+
+
+def tracked_tables():
+    global _tracked
+    if _tracked is None:
+        ignored = {apps.get_model(label) for label in IGNORED_MODELS}
+        owners = {apps.get_model(label): owner for label, owner in USER_SCOPED.items()}
+        _tracked = {
+            model._meta.db_table: owners.get(model)
+            for model in apps.get_models(include_auto_created=True)
+            if model not in ignored
+        }
+    return _tracked
+
+
+def is_tracked(model):
+    return model._meta.db_table in tracked_tables()
+
+
+def owner_of(instance):
+    owner = tracked_tables().get(instance._meta.db_table)
+    if owner is None:
+        return GLOBAL
+    return owner(instance) if callable(owner) else getattr(instance, owner)
+
+
+def invalidate(model, owner=GLOBAL):
+    """Change the version of ``model``'s table for ``owner`` (``GLOBAL``: for everyone) and the global one."""
+    table = model._meta.db_table
+    # Sin dueño tambien caducan las lecturas filtradas por usuario
+    tags = {GLOBAL, owner} if owner else {GLOBAL, EVERYONE}
+    TableVersion.objects.bulk_create(
+        [TableVersion(table=table, owner=tag, version=secrets.token_hex(8)) for tag in tags],
+        update_conflicts=True, unique_fields=['owner', 'table'], update_fields=['version'],
+    )
+
+
+def table_version(model, owner=GLOBAL):
+    """Current version of ``model``'s table for ``owner``; '' if it never changed."""
+    version = TableVersion.objects.filter(table=model._meta.db_table, owner=owner).values_list('version', flat=True).first()
+    return version or ''
+
+
+def current_versions(user_id):
+    """Versions of every table for ``user_id`` and globally, in one query."""
+    rows = TableVersion.objects.filter(owner__in={user_id, GLOBAL, EVERYONE}).values_list('table', 'owner', 'version')
+    return {(table, owner): version for table, owner, version in rows}
+
+
+def owned_read(sql, params, table, user_id):
+    """Whether ``sql`` only reads rows of ``table`` owned by ``user_id``."""
+    column = tracked_tables().get(table)
+    if not isinstance(column, str) or not user_id or OR_RE.search(sql):
+        return False
+    match = re.search(rf'["`]{table}["`]\.["`]{column}["`] = %s', sql)
+    if match is None:
+        return False
+    # El filtro usa el parametro en la posicion de su %s
+    index = sql.count('%s', 0, match.start())
+    return params is not None and index < len(params) and params[index] == user_id
+
+
+class Dependencies:
+
+    def __init__(self, user_id=GLOBAL):
+        self.user_id = user_id
+        self.tags = set()
+        self.untracked = False
+
+    def read(self, table, owner=GLOBAL):
+        self.tags.add((table, owner))
+
+    def resolve(self):
+        """The ``(table, owner)`` tags of everything read, or None if it can't be tracked."""
+        return None if self.untracked else set(self.tags)
+
+    def _execute(self, execute, sql, params, many, context):
+        tracked = tracked_tables()
+        for table in TABLE_RE.findall(sql):
+            # Leer versiones (ver depends_on) no es leer datos
+            if table == TableVersion._meta.db_table:
+                continue
+            table = TABLE_ALIASES.get(table, table)
+            if table not in tracked:
+                self.untracked = True
+            elif owned_read(sql, params, table, self.user_id):
+                self.tags.update({(table, self.user_id), (table, EVERYONE)})
+            else:
+                self.tags.add((table, GLOBAL))
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def capture_dependencies(user_id=GLOBAL):
+    dependencies = Dependencies(user_id)
+    token = _dependencies.set(dependencies)
+    try:
+        with connection.execute_wrapper(dependencies._execute):
+            yield dependencies
+    finally:
+        _dependencies.reset(token)
+
+
+def depends_on(model, owner=GLOBAL):
+    """Record a read that doesn't go through SQL (a value cached in memory, for instance)."""
+    dependencies = _dependencies.get()
+    if dependencies is not None:
+        dependencies.read(model._meta.db_table, owner)
@@ -0,0 +1,273 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import condition
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast, validate_schema
+
+from hacker_news.auth import authenticate_request, token_cache, user_cache
+from hacker_news.passwords import hash_pool
+
+from . import persisted
+from .compiler import execute_plan
+from .documents import document_cache
+from .introspection import introspection_cache, is_introspection
+from .persisted import (
+    PersistedQueryError, PersistedQueryHashMismatch, PersistedQueryInvalid, PersistedQueryNotFound,
+    PersistedQueryNotSupported, PersistedQueryRequired, persisted_query_extension, sha256, store,
+)
+from .response_cache import cache_key, response_cache
+from .versions import GLOBAL, capture_dependencies, current_versions
+
+CACHE_HEADER = 'X-GraphQL-Cache'
+
+SCHEMA_MAX_AGE = 60 * 60 * 24
+
+# Consultas persistidas con plan compilado (graphql_cache.compiler) en lugar de graphql.execute
+COMPILED_EXECUTION = getattr(settings, 'GRAPHQL_COMPILED_EXECUTION', False)
+
+
+def request_user(request):
+    """The user of the request, authenticating its JWT once (see ``hacker_news.auth``).
+
+    None when the token is not valid: the middleware will report the error.
+    """
+    if authenticate_request(request) is not True:
+        return None
+    return getattr(request, 'user', None)
+
+
+class CachedGraphQLView(GraphQLView):
+    """GraphQLView that serves repeated queries from ``graphql_cache.response_cache``.
+
+    GET queries get an ETag and a matching ``If-None-Match`` gets a 304.
+    Documents are parsed and validated once (see ``graphql_cache.documents``).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+
+        etag = getattr(request, 'graphql_etag', None)
+        if etag is not None and request.method == 'GET' and response.status_code == 200:
+            if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                response = HttpResponseNotModified()
+            response['ETag'] = etag
+            # Cada usuario tiene sus datos: solo el cliente guarda la respuesta y siempre revalida
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+
+        status = getattr(request, 'graphql_cache_status', None)
+        if status is not None:
+            response[CACHE_HEADER] = status
+        return response
+
+    def get_context(self, request):
+        # El token se valida aqui una vez y no en cada campo
+        authenticate_request(request)
+        return super().get_context(request)
+
+    def get_response(self, request, data, show_graphiql=False):
+        try:
+            data = self.resolve_persisted_query(request, data)
+        except PersistedQueryError as error:
+            return self.json_encode(request, {'errors': [error.as_error()]}), error.status
+
+        if self.batch or show_graphiql:
+            return super().get_response(request, data, show_graphiql)
+
+        query, variables, operation_name, _ = self.get_graphql_params(request, data)
+        user = request_user(request)
+        parsed = self.parsed_document(request, query)
+        key = cache_key(parsed, variables, operation_name, user.pk or GLOBAL) if parsed and user else None
+        if key is None:
+            request.graphql_cache_status = 'BYPASS'
+            return super().get_response(request, data, show_graphiql)
+
+        # Las versiones se leen antes de ejecutar: una escritura concurrente deja la entrada caducada
+        versions = current_versions(user.pk or GLOBAL)
+        cached = response_cache.get(key, versions)
+        if cached is not None:
+            request.graphql_cache_status = 'HIT'
+            request.graphql_etag = cached['etag']
+            return cached['response']
+
+        request.graphql_cache_status = 'MISS'
+        with capture_dependencies(user.pk or GLOBAL) as dependencies:
+            response = super().get_response(request, data, show_graphiql)
+        tags = dependencies.resolve()
+        # Sin tablas leidas no hay nada que invalide la entrada
+        if response[1] == 200 and not getattr(request, 'graphql_errors', True) and tags:
+            request.graphql_etag = response_cache.set(key, response, tags, versions)['etag']
+        return response
+
+    def resolve_persisted_query(self, request, data):
+        """``data`` with the text of its persisted query, registering new ones (see ``graphql_cache.persisted``)."""
+        extension = persisted_query_extension(request, data)
+        query = request.GET.get('query') or data.get('query')
+        if extension is None:
+            if persisted.PERSISTED_ONLY and query:
+                raise PersistedQueryRequired()
+            return data
+        if extension.get('version') != 1:
+            raise PersistedQueryNotSupported()
+
+        query_hash = extension.get('sha256Hash')
+        if not isinstance(query_hash, str) or not (query is None or isinstance(query, str)):
+            raise PersistedQueryInvalid()
+        stored = store.get(query_hash) if query_hash else None
+        if not query:
+            if stored is None:
+                raise PersistedQueryNotFound()
+            request.graphql_persisted = True
+            # get_graphql_params lee el texto de data cuando la URL no lo trae
+            data = {key: data.get(key) for key in data}
+            data['query'] = stored
+            return data
+
+        if sha256(query) != query_hash:
+            raise PersistedQueryHashMismatch()
+        if stored is None:
+            if persisted.PERSISTED_ONLY:
+                raise PersistedQueryNotFound()
+            # Solo se guarda lo que ya parsea y valida; queda ademas en el cache de documentos
+            parsed = self.parsed_document(request, query)
+            # Como en APQ, solo un POST registra: un GET ejecuta el texto sin guardarlo
+            if request.method == 'POST' and parsed is not None and not parsed.validation_errors:
+                store.add(query_hash, query)
+                request.graphql_persisted = True
+        else:
+            request.graphql_persisted = True
+        return data
+
+    def parsed_document(self, request, query):
+        """The cached ``ParsedDocument`` of ``query``; None without a query or with syntax errors."""
+        if not query:
+            return None
+        # get_response y la ejecucion piden el mismo documento: una sola consulta al cache
+        if getattr(request, 'graphql_query', None) == query:
+            return request.graphql_parsed
+        try:
+            parsed = document_cache.get(
+                self.schema.graphql_schema, query, self.validation_rules, graphene_settings.MAX_VALIDATION_ERRORS,
+            )
+        except GraphQLError:
+            parsed = None
+        request.graphql_query, request.graphql_parsed = query, parsed
+        return parsed
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        result = self.execute_document(request, query, variables, operation_name, show_graphiql)
+        request.graphql_errors = bool(result is None or result.errors)
+        return result
+
+    def execute_document(self, request, query, variables, operation_name, show_graphiql=False):
+        # Como GraphQLView.execute_graphql_request, pero con el documento ya validado del cache
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest('Must provide query string.'))
+
+        schema = self.schema.graphql_schema
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        parsed = self.parsed_document(request, query)
+        if parsed is None:
+            # Repite el parseo solo para dar el error de sintaxis
+            return super().execute_graphql_request(request, {}, query, variables, operation_name, show_graphiql)
+
+        operation_ast = get_operation_ast(parsed.document, operation_name)
+        if request.method.lower() == 'get' and operation_ast is not None and operation_ast.operation != OperationType.QUERY:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseNotAllowed(
+                ['POST'], f'Can only perform a {operation_ast.operation.value} operation from a POST request.',
+            ))
+
+        if parsed.validation_errors:
+            return ExecutionResult(data=None, errors=parsed.validation_errors)
+
+        try:
+            execute_options = {
+                'root_value': self.get_root_value(request),
+                'context_value': self.get_context(request),
+                'variable_values': variables,
+                'operation_name': operation_name,
+                'middleware': self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options['execution_context_class'] = self.execution_context_class
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get('ATOMIC_MUTATIONS', False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(schema, parsed.document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            if is_introspection(parsed.document, operation_name):
+                return introspection_cache.execute(schema, parsed, operation_name, variables)
+
+            # Solo documentos registrados por APQ: las consultas ad hoc van por graphql.execute
+            if COMPILED_EXECUTION and getattr(request, 'graphql_persisted', False) and not self.execution_context_class:
+                result = execute_plan(
+                    schema, parsed, operation_name,
+                    root_value=execute_options['root_value'], context_value=execute_options['context_value'],
+                    variable_values=variables, middleware=execute_options['middleware'],
+                )
+                if result is not None:
+                    return result
+            return execute(schema, parsed.document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+
+@staff_member_required
+def cache_stats(request):
+    return JsonResponse({
+        'responses': response_cache.stats(),
+        'documents': document_cache.stats(),
+        'introspection': introspection_cache.stats(),
+        'tokens': token_cache.stats(),
+        'users': user_cache.stats(),
+        'passwords': hash_pool.stats(),
+    })
+
+
+def _sdl_etag(request):
+    return introspection_cache.etag(graphene_settings.SCHEMA.graphql_schema)
+
+
+def _json_etag(request):
+    # Otra representacion del mismo esquema: otro ETag
+    return _sdl_etag(request)[:-1] + '-json"'
+
+
+def _schema_download(content, content_type):
+    response = HttpResponse(content, content_type=content_type)
+    # El ETag solo cambia con el esquema: los clientes revalidan una vez al dia
+    patch_cache_control(response, public=True, max_age=SCHEMA_MAX_AGE)
+    return response
+
+
+@condition(etag_func=_sdl_etag)
+def schema_sdl(request):
+    return _schema_download(introspection_cache.sdl(graphene_settings.SCHEMA.graphql_schema), 'text/plain; charset=utf-8')
+
+
+@condition(etag_func=_json_etag)
+def schema_json(request):
+    return _schema_download(introspection_cache.introspection_json(graphene_settings.SCHEMA.graphql_schema), 'application/json')
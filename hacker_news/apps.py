@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class HackerNewsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'hacker_news'
+
+    def ready(self):
+        from . import auth, owners
+        auth.connect()
+        owners.connect()
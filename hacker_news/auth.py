@@ -0,0 +1,237 @@
+"""JWT authentication, once per request.
+
+graphql_jwt's ``JSONWebTokenMiddleware`` runs around every resolved field and
+goes through the token logic each time. Here the view authenticates the
+request once (``authenticate_request``) and leaves the outcome on it, so the
+middleware is down to one attribute check per field. Verified tokens are
+kept in a small LRU until they expire: a client sending the same token again
+skips decoding and the signature check.
+
+The user a token names is then looked up in ``user_cache``, which keeps users
+for ``JWT_USER_CACHE_TTL`` seconds. Saving or deleting a user drops it from
+the cache of this process; other processes see the change when their entry
+expires, so the TTL is kept short.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext as _
+from graphql_jwt import backends, middleware
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.settings import jwt_settings
+from graphql_jwt.utils import get_credentials, get_http_authorization, get_payload
+
+TOKEN_CACHE_SIZE = getattr(settings, 'JWT_TOKEN_CACHE_SIZE', 256)
+USER_CACHE_TTL = getattr(settings, 'JWT_USER_CACHE_TTL', 30)
+USER_CACHE_SIZE = 1000
+
+
+class TokenCache:
+    """Payloads of verified tokens, until their ``exp``."""
+
+    def __init__(self, max_entries=TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.payloads = OrderedDict()
+        self.hits = self.misses = 0
+
+    def payload(self, token, context=None):
+        """The payload of ``token``; raises ``JSONWebTokenError`` like ``graphql_jwt.utils.get_payload``."""
+        with self.lock:
+            cached = self.payloads.get(token)
+            if cached is not None:
+                payload, expires = cached
+                if expires is None or time.time() < expires:
+                    self.payloads.move_to_end(token)
+                    self.hits += 1
+                    return payload
+                del self.payloads[token]
+            self.misses += 1
+
+        # Los tokens invalidos no se guardan: vuelven a fallar al decodificarlos
+        payload = get_payload(token, context)
+        expires = None
+        if jwt_settings.JWT_VERIFY_EXPIRATION and 'exp' in payload:
+            expires = payload['exp'] + _seconds(jwt_settings.JWT_LEEWAY)
+        with self.lock:
+            self.payloads[token] = (payload, expires)
+            while len(self.payloads) > self.max_entries:
+                self.payloads.popitem(last=False)
+        return payload
+
+    def clear(self):
+        with self.lock:
+            self.payloads.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.payloads)}
+
+
+def _seconds(leeway):
+    return leeway.total_seconds() if hasattr(leeway, 'total_seconds') else leeway
+
+
+token_cache = TokenCache()
+
+
+class UserCache:
+    """Users by username and by id, for ``ttl`` seconds.
+
+    Each lookup gets its own copy: ``authenticate`` and the resolvers set
+    attributes on ``request.user`` and requests run in several threads.
+    """
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_entries=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+        # Sube con cada invalidacion: una lectura que empezo antes no se guarda
+        self.generation = 0
+        self.hits = self.misses = 0
+
+    def get_by_username(self, username):
+        return self._get(('username', username), lambda: jwt_settings.JWT_GET_USER_BY_NATURAL_KEY_HANDLER(username))
+
+    def get_by_id(self, user_id):
+        UserModel = get_user_model()
+        # La sesion guarda el id como texto
+        user_id = UserModel._meta.pk.to_python(user_id)
+        return self._get(('id', user_id), lambda: UserModel._default_manager.filter(pk=user_id).first())
+
+    def _get(self, key, load):
+        with self.lock:
+            cached = self.users.get(key)
+            if cached is not None:
+                user, expires = cached
+                if time.monotonic() < expires:
+                    self.users.move_to_end(key)
+                    self.hits += 1
+                    return copy.copy(user)
+                del self.users[key]
+            self.misses += 1
+            generation = self.generation
+
+        user = load()
+        # Los usuarios que no existen no se guardan: CreateUser no tiene nada que invalidar
+        if user is not None:
+            expires = time.monotonic() + self.ttl
+            with self.lock:
+                if generation == self.generation:
+                    self.users[('username', user.get_username())] = (user, expires)
+                    self.users[('id', user.pk)] = (user, expires)
+                    while len(self.users) > self.max_entries:
+                        self.users.popitem(last=False)
+            user = copy.copy(user)
+        return user
+
+    def invalidate(self, user):
+        with self.lock:
+            self.generation += 1
+            # El username puede haber cambiado: se quitan todas las entradas de ese id
+            for key, (cached, expires) in list(self.users.items()):
+                if cached.pk == user.pk:
+                    del self.users[key]
+            self.users.pop(('username', user.get_username()), None)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.users.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.users)}
+
+
+user_cache = UserCache()
+
+
+def user_changed(sender, instance, **kwargs):
+    # Guardar cubre CreateUser, set_password() + save() y el admin
+    user_cache.invalidate(instance)
+
+
+def connect():
+    post_save.connect(user_changed, sender=settings.AUTH_USER_MODEL, dispatch_uid='hacker_news.auth.user_saved')
+    post_delete.connect(user_changed, sender=settings.AUTH_USER_MODEL, dispatch_uid='hacker_news.auth.user_deleted')
+
+
+def get_user_by_payload(payload):
+    """``graphql_jwt.utils.get_user_by_payload`` through ``user_cache``."""
+    username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+    if not username:
+        raise JSONWebTokenError(_('Invalid payload'))
+
+    user = user_cache.get_by_username(username)
+    if user is not None and not getattr(user, 'is_active', True):
+        raise JSONWebTokenError(_('User is disabled'))
+    return user
+
+
+def get_user_by_token(token, context=None):
+    return get_user_by_payload(token_cache.payload(token, context))
+
+
+class JSONWebTokenBackend(backends.JSONWebTokenBackend):
+    """graphql_jwt's backend, verifying tokens through ``token_cache`` and finding users in ``user_cache``."""
+
+    def authenticate(self, request=None, **kwargs):
+        if request is None or getattr(request, '_jwt_token_auth', False):
+            return None
+
+        token = get_credentials(request, **kwargs)
+        if token is not None:
+            return get_user_by_token(token, request)
+        return None
+
+    def get_user(self, user_id):
+        return user_cache.get_by_id(user_id)
+
+
+def authenticate_request(request):
+    """Authenticate the JWT of ``request`` once.
+
+    The outcome stays in ``request.jwt_authentication``: True, or the
+    ``JSONWebTokenError`` of an invalid token, which the middleware raises in
+    the fields that need authentication.
+    """
+    outcome = getattr(request, 'jwt_authentication', None)
+    if outcome is None:
+        outcome = True
+        user = getattr(request, 'user', None)
+        if (user is None or user.is_anonymous) and get_http_authorization(request) is not None:
+            try:
+                user = authenticate(request=request)
+            except JSONWebTokenError as error:
+                outcome = error
+            else:
+                if user is not None:
+                    request.user = user
+        request.jwt_authentication = outcome
+    return outcome
+
+
+class JSONWebTokenMiddleware(middleware.JSONWebTokenMiddleware):
+    """``JSONWebTokenMiddleware`` that relies on ``authenticate_request``."""
+
+    def __init__(self):
+        super().__init__()
+        if jwt_settings.JWT_ALLOW_ARGUMENT:
+            # Cada campo puede traer su propio token: no hay nada que memorizar por peticion
+            self.resolve = super().resolve
+
+    def resolve(self, next, root, info, **kwargs):
+        if getattr(info.context, 'jwt_authentication', None) is not True:
+            outcome = authenticate_request(info.context)
+            if outcome is not True and self.authenticate_context(info, **kwargs):
+                raise outcome
+        return next(root, info, **kwargs)
@@ -0,0 +1,32 @@
+"""Raw SQL for the migrations, which depends on the database in use."""
+from django.db import migrations
+
+
+def run_sql(statements):
+    """``RunPython`` function executing ``statements[vendor]`` on the migration's database.
+
+    A vendor without an entry runs nothing.
+    """
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def trigram_indexes(table, indexes):
+    """Operation building GIN ``gin_trgm_ops`` indexes on ``table`` (PostgreSQL only).
+
+    ``indexes`` maps each index name to the indexed expression. The searches
+    filter with ``LIKE '%term%'``, which a btree can't serve because of the
+    leading wildcard; a trigram index can, as long as it is built on the very
+    expression the filter compares.
+
+    The indexes are built CONCURRENTLY, which PostgreSQL doesn't allow inside
+    a transaction: migrations using this operation declare ``atomic = False``.
+    """
+    forward = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING GIN ({expression} gin_trgm_ops)'
+        for name, expression in indexes.items()
+    ]
+    backward = [f'DROP INDEX CONCURRENTLY IF EXISTS {name}' for name in indexes]
+    return migrations.RunPython(run_sql({'postgresql': forward}), run_sql({'postgresql': backward}))
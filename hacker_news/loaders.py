@@ -0,0 +1,73 @@
+"""Request-scoped batch loaders.
+
+List resolvers get their related objects from the optimizer
+(``hacker_news.optimizer``) through ``select_related``/``prefetch_related``.
+The loaders cover what is left, the objects reached outside an optimized
+queryset, and keep them for the rest of the request.
+
+graphene-django runs resolvers synchronously, so there is no tick in which
+to collect keys: the keys known ahead are queued with ``prime`` (or asked
+together with ``load_many``) and the next ``load`` resolves the whole queue
+with a single ``batch_load`` call.
+"""
+
+
+class DataLoader:
+
+    def __init__(self, context=None):
+        self.context = context
+        self._cache = {}
+        self._pending = {}
+
+    def batch_load(self, keys):
+        """Return a dict mapping each of ``keys`` to its value."""
+        raise NotImplementedError
+
+    def missing(self, key):
+        """Value cached for a key that ``batch_load`` did not return."""
+        return None
+
+    def prime(self, keys):
+        """Queue ``keys`` for the next ``batch_load``."""
+        for key in keys:
+            if key is not None and key not in self._cache:
+                self._pending[key] = None
+
+    def load(self, key):
+        if key is None:
+            return self.missing(key)
+        if key not in self._cache:
+            self._pending[key] = None
+            self.dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        keys = list(keys)
+        self.prime(keys)
+        return [self.load(key) for key in keys]
+
+    def dispatch(self):
+        keys = list(self._pending)
+        self._pending.clear()
+        if not keys:
+            return
+
+        results = self.batch_load(keys)
+        for key in keys:
+            self._cache[key] = results[key] if key in results else self.missing(key)
+
+
+def get_loader(info, loader_class):
+    """Return the ``loader_class`` instance bound to the current request."""
+    context = info.context
+    loaders = getattr(context, 'dataloaders', None)
+
+    if loaders is None:
+        loaders = {}
+        if context is not None:
+            context.dataloaders = loaders
+
+    loader = loaders.get(loader_class)
+    if loader is None:
+        loader = loaders[loader_class] = loader_class(context)
+    return loader
@@ -0,0 +1,27 @@
+"""Accent- and case-insensitive text matching.
+
+Searchable columns get a ``*_normalized`` shadow column filled on save, so
+"educacion" matches "Educación" with a plain ``contains`` instead of wrapping
+every row in a function at query time.
+"""
+from text_unidecode import unidecode
+
+
+def normalize(value):
+    return unidecode(value or '').casefold()
+
+
+class NormalizedFieldsMixin:
+    # columna normalizada -> columna original
+    normalized_fields = {}
+
+    def save(self, *args, **kwargs):
+        for target, source in self.normalized_fields.items():
+            setattr(self, target, normalize(getattr(self, source)))
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                target for target, source in self.normalized_fields.items() if source in update_fields
+            }
+        super().save(*args, **kwargs)
@@ -0,0 +1,144 @@
+"""Trim list querysets to the GraphQL selection set.
+
+``optimize(queryset, info)`` walks ``info.field_nodes`` (fragments included,
+``@include``/``@skip`` honoured) and applies ``select_related`` for forward
+foreign keys, ``prefetch_related`` for reverse relations and ``only`` for the
+selected columns, so unrequested TextFields never leave the database.
+
+Types can expose computed fields through ``optimizer_annotations``, a mapping
+of field name to ``callable(info)`` returning the expression to annotate.
+"""
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_camel_case
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLIncludeDirective,
+    GraphQLSkipDirective,
+    InlineFragmentNode,
+    get_named_type,
+)
+from graphql.execution.values import get_directive_values
+
+
+def optimize(queryset, info):
+    return _optimize(queryset, get_named_type(info.return_type), info.field_nodes, info)
+
+
+def optimize_connection(queryset, info, extra_only=()):
+    """Like ``optimize`` for a Relay connection, reading ``edges { node }``."""
+    connection_type = get_named_type(info.return_type)
+    edge_type = get_named_type(connection_type.fields['edges'].type)
+    node_type = get_named_type(edge_type.fields['node'].type)
+
+    edges = selected_fields(info.field_nodes, info).get('edges', [])
+    nodes = selected_fields(edges, info).get('node', [])
+    return _optimize(queryset, node_type, nodes, info, extra_only)
+
+
+def _optimize(queryset, object_type, field_nodes, info, extra_only=()):
+    graphene_type = getattr(object_type, 'graphene_type', None)
+    model = getattr(getattr(graphene_type, '_meta', None), 'model', None)
+    if model is None or not issubclass(queryset.model, model):
+        return queryset
+
+    only, select, prefetch, annotations = _plan(queryset.model, object_type, field_nodes, info)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset.only(*only, *extra_only)
+
+
+def _plan(model, object_type, field_nodes, info, prefix=''):
+    only = {prefix + model._meta.pk.name}
+    select = []
+    prefetch = []
+    annotations = {}
+
+    graphene_type = object_type.graphene_type
+    names = _python_names(graphene_type)
+    computed = getattr(graphene_type, 'optimizer_annotations', {})
+    model_fields = _model_fields(model)
+
+    for graphql_name, nodes in selected_fields(field_nodes, info).items():
+        name = names.get(graphql_name)
+        field = model_fields.get(name)
+        if field is None:
+            if name in computed and not prefix:
+                annotations[name] = computed[name](info)
+            continue
+
+        if not field.is_relation:
+            only.add(prefix + field.name)
+            continue
+
+        child_type = get_named_type(object_type.fields[graphql_name].type)
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            lookup = prefix + field.name
+            only.add(lookup)
+            select.append(lookup)
+            child_only, child_select, child_prefetch, _ = _plan(
+                field.related_model, child_type, nodes, info, lookup + '__'
+            )
+            only |= child_only
+            select += child_select
+            prefetch += child_prefetch
+        else:
+            # El prefetch agrupa por la llave foranea hacia el padre
+            parent_key = (field.field.name,) if field.one_to_many or field.one_to_one else ()
+            related = _optimize(field.related_model._default_manager.all(), child_type, nodes, info, parent_key)
+            prefetch.append(Prefetch(prefix + name, queryset=related))
+
+    return only, select, prefetch, annotations
+
+
+def selected_fields(field_nodes, info):
+    """Map each selected field name to its (merged) field nodes."""
+    fields = {}
+    for node in field_nodes:
+        if node.selection_set is not None:
+            _collect(node.selection_set, info, fields)
+    return fields
+
+
+def _collect(selection_set, info, fields):
+    for selection in selection_set.selections:
+        if not _included(selection, info.variable_values):
+            continue
+
+        if isinstance(selection, FieldNode):
+            fields.setdefault(selection.name.value, []).append(selection)
+        elif isinstance(selection, InlineFragmentNode):
+            _collect(selection.selection_set, info, fields)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = info.fragments.get(selection.name.value)
+            if fragment is not None:
+                _collect(fragment.selection_set, info, fields)
+
+
+def _included(node, variables):
+    skip = get_directive_values(GraphQLSkipDirective, node, variables)
+    if skip and skip['if']:
+        return False
+    include = get_directive_values(GraphQLIncludeDirective, node, variables)
+    return not include or include['if']
+
+
+def _python_names(graphene_type):
+    return {
+        getattr(field, 'name', None) or to_camel_case(name): name
+        for name, field in graphene_type._meta.fields.items()
+    }
+
+
+def _model_fields(model):
+    fields = {}
+    for field in model._meta.get_fields():
+        if field.auto_created and not field.concrete:
+            fields[field.get_accessor_name()] = field
+        else:
+            fields[field.name] = field
+    return fields
@@ -0,0 +1,29 @@
+"""Previous owner of a row being saved.
+
+Several ``pre_save`` handlers need the ``posted_by_id`` the row had before
+the save (an entry can change hands); the first one reads it and the rest
+reuse it until ``post_save``.
+"""
+from django.db.models.signals import post_save
+
+_MISSING = object()
+
+
+def previous_owner(instance, field='posted_by_id'):
+    """``field`` of ``instance``'s row as stored before this save; None for new rows."""
+    if instance.pk is None:
+        return None
+    owners = instance.__dict__.setdefault('_previous_owners', {})
+    owner = owners.get(field, _MISSING)
+    if owner is _MISSING:
+        owner = owners[field] = type(instance)._default_manager.filter(pk=instance.pk).values_list(field, flat=True).first()
+    return owner
+
+
+def saved(sender, instance, **kwargs):
+    # El siguiente save vuelve a leer la fila
+    instance.__dict__.pop('_previous_owners', None)
+
+
+def connect():
+    post_save.connect(saved, dispatch_uid='hacker_news_previous_owners')
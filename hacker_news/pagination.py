@@ -0,0 +1,168 @@
+"""Keyset (seek) pagination.
+
+Pages are addressed by the ordering values of the last row seen rather than
+an OFFSET, so deep pages cost the same as the first one. ``hasNextPage`` comes
+from fetching one extra row instead of a ``COUNT(*)``.
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+import graphene
+from django.db.models import Count, Q, Subquery, Window
+from graphene.relay import PageInfo
+from graphql import GraphQLError
+
+from hacker_news.optimizer import optimize_connection, selected_fields
+
+DEFAULT_PAGE_SIZE = getattr(settings, 'GRAPHQL_DEFAULT_PAGE_SIZE', 20)
+MAX_PAGE_SIZE = getattr(settings, 'GRAPHQL_MAX_PAGE_SIZE', 100)
+
+
+class CursorEncoder(DjangoJSONEncoder):
+
+    def default(self, o):
+        # DjangoJSONEncoder corta a milisegundos y el cursor tiene que repetir el valor exacto
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    data = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise GraphQLError('Invalid cursor!')
+    if not isinstance(values, list) or len(values) != length:
+        raise GraphQLError('Invalid cursor!')
+    return values
+
+
+def page_size(first):
+    if first is None:
+        return DEFAULT_PAGE_SIZE
+    if first < 0:
+        raise GraphQLError('first must be positive')
+    return min(first, MAX_PAGE_SIZE)
+
+
+def ordering_fields(ordering):
+    return [field.lstrip('-') for field in ordering]
+
+
+def only_fields(queryset, ordering):
+    # Las anotaciones del orden (p. ej. relevance) no son columnas para only()
+    return [field for field in ordering_fields(ordering) if field not in queryset.query.annotations]
+
+
+def cursor_for(row, ordering):
+    return encode_cursor([getattr(row, field) for field in ordering_fields(ordering)])
+
+
+def cursor_values(queryset, ordering, values):
+    """The cursor ``values`` as Python values of their columns (aware datetimes, not strings)."""
+    converted = []
+    for name, value in zip(ordering_fields(ordering), values):
+        try:
+            field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Anotaciones como relevance
+            converted.append(value)
+            continue
+        try:
+            converted.append(field.to_python(value))
+        except ValidationError:
+            raise GraphQLError('Invalid cursor!')
+    return converted
+
+
+def seek(queryset, ordering, after):
+    """Filter ``queryset`` to the rows that follow the ``after`` cursor."""
+    if not after:
+        return queryset
+
+    values = cursor_values(queryset, ordering, decode_cursor(after, len(ordering)))
+    condition = Q()
+    equal = Q()
+    # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return queryset.filter(condition)
+
+
+def keyset_page(queryset, ordering, first=None, after=None):
+    """Return ``(rows, has_next_page)`` for one page of ``queryset``.
+
+    The last ``ordering`` field must be unique (normally ``id``).
+    """
+    size = page_size(first)
+    rows = list(seek(queryset, ordering, after).order_by(*ordering)[:size + 1])
+    return rows[:size], len(rows) > size
+
+
+def build_connection(connection_type, rows, has_next_page, ordering, after=None, **extra):
+    edges = [connection_type.Edge(node=row, cursor=cursor_for(row, ordering)) for row in rows]
+    return connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=bool(after),
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+        **extra,
+    )
+
+
+class CountableConnection(graphene.relay.Connection):
+    total_count = graphene.Int()
+
+    class Meta:
+        abstract = True
+
+
+def connection_arguments(order_by):
+    return {'first': graphene.Int(), 'after': graphene.String(), 'order_by': order_by()}
+
+
+def section_ordering(order_by=None):
+    """Keyset ordering ``(posted_by_id, <sort column>, id)`` for a CV section.
+
+    ``order_by`` is an enum whose values are model columns, ``-`` prefixed
+    for descending order; ``id`` breaks ties in the same direction.
+    """
+    column = order_by.value if order_by else 'id'
+    tiebreak = '-id' if column.startswith('-') else 'id'
+    if column.lstrip('-') == 'id':
+        return ('posted_by_id', tiebreak)
+    return ('posted_by_id', column, tiebreak)
+
+
+def total_count_window(queryset):
+    # COUNT(*) OVER () sobre todo el resultado, dentro del mismo SELECT
+    return Subquery(queryset.order_by().annotate(total=Window(Count('pk'))).values('total')[:1])
+
+
+def section_connection(connection_type, queryset, info, ordering, first=None, after=None):
+    with_total = 'totalCount' in selected_fields(info.field_nodes, info)
+
+    page = optimize_connection(queryset, info, only_fields(queryset, ordering))
+    if with_total:
+        page = page.annotate(total_count=total_count_window(queryset))
+    rows, has_next_page = keyset_page(page, ordering, first, after)
+
+    total_count = None
+    if with_total:
+        total_count = rows[0].total_count if rows else queryset.count()
+    return build_connection(connection_type, rows, has_next_page, ordering, after, total_count=total_count)
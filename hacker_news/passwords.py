@@ -0,0 +1,120 @@
+"""Password hashing on a bounded pool of threads.
+
+Hashing a password (PBKDF2 by default) takes hundreds of milliseconds of
+CPU. ``createUser`` and ``tokenAuth`` hash through ``hash_pool``, which runs
+at most ``PASSWORD_HASH_WORKERS`` hashes at a time, so a burst of logins
+queues up instead of taking every CPU from query traffic. hashlib releases
+the GIL while it hashes, so the pool's threads really run in parallel with
+the threads serving requests. The time each hash waits in the queue is
+recorded and shown in ``/graphql/cache/stats/``.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import backends, get_user_model, hashers
+
+WORKERS = getattr(settings, 'PASSWORD_HASH_WORKERS', 2)
+
+
+class HashPool:
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.lock = threading.Lock()
+        self.waiting = self.operations = 0
+        self.queue_seconds = self.max_queue_seconds = 0.0
+
+    def submit(self, fn, *args):
+        submitted = time.monotonic()
+        with self.lock:
+            self.waiting += 1
+
+        def run():
+            waited = time.monotonic() - submitted
+            with self.lock:
+                self.waiting -= 1
+                self.operations += 1
+                self.queue_seconds += waited
+                self.max_queue_seconds = max(self.max_queue_seconds, waited)
+            return fn(*args)
+        return self.executor.submit(run)
+
+    def run(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    def reset_stats(self):
+        with self.lock:
+            self.operations = 0
+            self.queue_seconds = self.max_queue_seconds = 0.0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'waiting': self.waiting,
+                'operations': self.operations,
+                'queue_seconds': self.queue_seconds,
+                'max_queue_seconds': self.max_queue_seconds,
+                'avg_queue_seconds': self.queue_seconds / self.operations if self.operations else 0.0,
+            }
+
+
+hash_pool = HashPool()
+
+
+def make_password(raw_password):
+    return hash_pool.run(hashers.make_password, raw_password)
+
+
+def _check(raw_password, encoded):
+    # El setter de Django guarda en la base de datos: aqui solo se anota si hace falta
+    must_update = []
+    is_correct = hashers.check_password(raw_password, encoded, must_update.append)
+    return is_correct, bool(must_update)
+
+
+def check_password(raw_password, encoded, setter=None):
+    """``django.contrib.auth.hashers.check_password`` in the pool; ``setter`` runs in the calling thread."""
+    is_correct, must_update = hash_pool.run(_check, raw_password, encoded)
+    if setter is not None and must_update:
+        setter(raw_password)
+    return is_correct
+
+
+def set_password(user, raw_password):
+    """``user.set_password`` hashing in the pool."""
+    user.password = make_password(raw_password)
+    # save() avisa a los validadores de contraseñas, como con set_password
+    user._password = raw_password
+
+
+def check_user_password(user, raw_password):
+    """``user.check_password`` hashing in the pool; an outdated hash is upgraded and saved."""
+    def setter(raw_password):
+        set_password(user, raw_password)
+        user._password = None
+        user.save(update_fields=['password'])
+    return check_password(raw_password, user.password, setter)
+
+
+class ModelBackend(backends.ModelBackend):
+    """Django's ``ModelBackend``, checking passwords in ``hash_pool``."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Se hashea igual: un usuario que no existe no debe responder antes
+            make_password(password)
+        else:
+            if check_user_password(user, password) and self.user_can_authenticate(user):
+                return user
+        return None
@@ -10,8 +10,10 @@ import language.schema
 import skills.schema
 import workexperience.schema
 import header.schema
+import search.schema
+import cv.schema
 
-class Query(header.schema.Query ,workexperience.schema.Query, skills.schema.Query ,language.schema.Query ,interest.schema.Query, archivements.schema.Query, education.schema.Query, users.schema.Query, links.schema.Query, graphene.ObjectType):
+class Query(cv.schema.Query, search.schema.Query, header.schema.Query ,workexperience.schema.Query, skills.schema.Query ,language.schema.Query ,interest.schema.Query, archivements.schema.Query, education.schema.Query, users.schema.Query, links.schema.Query, graphene.ObjectType):
     pass
 
 class Mutation(header.schema.Mutation, workexperience.schema.Mutation, skills.schema.Mutation ,language.schema.Mutation ,interest.schema.Mutation ,archivements.schema.Mutation, education.schema.Mutation, users.schema.Mutation, links.schema.Mutation, graphene.ObjectType):
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'graphene_django',
+    'hacker_news',
     'links',
     'corsheaders',
     'header',
@@ -56,7 +57,10 @@ INSTALLED_APPS = [
     'skills',
     'interest',
     'archivements',
-    'language'
+    'language',
+    'search',
+    'cv',
+    'graphql_cache',
 ]
 
 MIDDLEWARE = [
@@ -156,13 +160,40 @@ if not DEBUG:
 GRAPHENE = {
     'SCHEMA': 'hacker_news.schema.schema',
     'MIDDLEWARE': [
-        'graphql_jwt.middleware.JSONWebTokenMiddleware',
+        'hacker_news.auth.JSONWebTokenMiddleware',
     ],
 }
 
+# Tamaño de pagina para las conexiones paginadas por cursor
+GRAPHQL_DEFAULT_PAGE_SIZE = 20
+GRAPHQL_MAX_PAGE_SIZE = 100
+
+# Cache de respuestas GraphQL (graphql_cache)
+GRAPHQL_RESPONSE_CACHE_TTL = 60
+GRAPHQL_RESPONSE_CACHE_MAX_ENTRIES = 1000
+# Documentos parseados y validados que guarda cada proceso (graphql_cache.documents)
+GRAPHQL_DOCUMENT_CACHE_SIZE = 500
+# Las consultas persistidas (APQ) se ejecutan con planes compilados (graphql_cache.compiler)
+GRAPHQL_COMPILED_EXECUTION = os.environ.get('GRAPHQL_COMPILED_EXECUTION', '') == '1'
+# Solo consultas persistidas (APQ): en produccion se rechazan las consultas ad hoc
+GRAPHQL_PERSISTED_QUERIES_ONLY = os.environ.get('GRAPHQL_PERSISTED_QUERIES_ONLY', '') == '1'
+# Consultas que los clientes pueden registrar; por encima se borran las mas antiguas
+GRAPHQL_PERSISTED_QUERY_MAX_ROWS = 10000
+
+# Cada cuanto se comprueba que el Header en memoria sigue vigente (header.cache)
+HEADER_CACHE_CHECK_SECONDS = 1
+
+# Tokens JWT ya verificados que se recuerdan hasta que caducan (hacker_news.auth)
+JWT_TOKEN_CACHE_SIZE = 256
+# Segundos que un usuario autenticado se guarda en memoria; otros procesos no ven antes sus cambios
+JWT_USER_CACHE_TTL = 30
+
+# Hashes de contraseñas (createUser, tokenAuth) que se calculan a la vez (hacker_news.passwords)
+PASSWORD_HASH_WORKERS = 2
+
 AUTHENTICATION_BACKENDS = [
-    'graphql_jwt.backends.JSONWebTokenBackend',
-    'django.contrib.auth.backends.ModelBackend',
+    'hacker_news.auth.JSONWebTokenBackend',
+    'hacker_news.passwords.ModelBackend',
 ]
 
 CORS_ORIGIN_ALLOW_ALL = True
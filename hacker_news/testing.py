@@ -0,0 +1,75 @@
+"""Helpers shared by the apps' GraphQL tests.
+
+``test`` is always the running ``GraphQLTestCase``: queries go through its
+client and ``assertResponseNoErrors``.
+"""
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from hacker_news.auth import user_cache
+
+CREATE_USER_MUTATION = '''
+ mutation createUserMutation($email: String!, $password: String!, $username: String!) {
+     createUser(email: $email, password: $password, username: $username) {
+         user {
+            username
+         }
+     }
+ }
+'''
+
+LOGIN_USER_MUTATION = '''
+ mutation TokenAuthMutation($username: String!, $password: String!) {
+     tokenAuth(username: $username, password: $password) {
+        token
+     }
+ }
+'''
+
+
+def login(test, username):
+    """Create ``username`` (its password is the username too) and return its JWT."""
+    test.query(
+        CREATE_USER_MUTATION,
+        variables={'email': f'{username}@live.com.mx', 'username': username, 'password': username}
+    )
+    response = test.query(LOGIN_USER_MUTATION, variables={'username': username, 'password': username})
+    return json.loads(response.content)['data']['tokenAuth']['token']
+
+
+def capture_sql(test, query, variables=None, headers=None):
+    """``(sql, content)``: the SQL run by ``query`` and its response."""
+    with CaptureQueriesContext(connection) as context:
+        response = test.query(query, variables=variables, headers=headers)
+    test.assertResponseNoErrors(response)
+    return [captured['sql'] for captured in context.captured_queries], json.loads(response.content)
+
+
+def count_queries(test, query, variables=None, headers=None):
+    """``(number of queries, content)`` of ``query``.
+
+    The user of the token is looked up again, so every measured query pays
+    the same fixed cost.
+    """
+    user_cache.clear()
+    sql, content = capture_sql(test, query, variables, headers)
+    return len(sql), content
+
+
+def connection_pages(test, query, field, headers=None, **variables):
+    """Every page of the connection ``field``, following ``endCursor`` while ``hasNextPage``."""
+    pages, after = [], None
+    while True:
+        response = test.query(query, variables={**variables, 'after': after}, headers=headers)
+        test.assertResponseNoErrors(response)
+        page = json.loads(response.content)['data'][field]
+        pages.append(page)
+        if not page['pageInfo']['hasNextPage']:
+            return pages
+        after = page['pageInfo']['endCursor']
+
+
+def node_ids(pages):
+    return [edge['node']['id'] for page in pages for edge in page['edges']]
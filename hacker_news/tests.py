@@ -0,0 +1,269 @@
+from django.test import TestCase
+from graphene_django.utils.testing import GraphQLTestCase
+from unittest import mock
+from mixer.backend.django import mixer
+import json
+import threading
+import time
+from django.contrib.auth import get_user_model, hashers
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from cv.models import CvSnapshot
+from graphql_cache.response_cache import response_cache
+from graphql_cache.versions import table_version
+from hacker_news import auth
+from hacker_news.auth import JSONWebTokenBackend, UserCache, token_cache, user_cache
+from hacker_news.passwords import HashPool, hash_pool
+from hacker_news.schema import schema
+from hacker_news.testing import CREATE_USER_MUTATION, LOGIN_USER_MUTATION, capture_sql, login
+from skills.models import Skill
+from users.loaders import UserLoader
+
+# Create your tests here.
+
+GET_SKILLS = '''
+query {
+  skill {
+    id
+    skill
+  }
+}
+'''
+
+class PreviousOwnerTestCase(TestCase):
+
+    def setUp(self):
+        self.user = mixer.blend(get_user_model())
+        self.other = mixer.blend(get_user_model())
+        self.skill = mixer.blend(Skill, skill="Python", posted_by=self.user)
+
+    def test_previous_owner_read_once_per_save(self):
+        CvSnapshot.objects.create(user=self.user, document={})
+        version = table_version(Skill, self.user.pk)
+        self.skill.posted_by = self.other
+
+        with CaptureQueriesContext(connection) as context:
+            self.skill.save()
+
+        lookups = [query['sql'] for query in context.captured_queries if query['sql'].startswith('SELECT "skills_skill"')]
+        assert len(lookups) == 1
+        # los dos handlers usan el dueño anterior: su CV y sus respuestas caducan
+        assert not CvSnapshot.objects.filter(user=self.user).exists()
+        assert table_version(Skill, self.user.pk) != version
+
+    def test_next_save_reads_again(self):
+        self.skill.posted_by = self.other
+        self.skill.save()
+        version = table_version(Skill, self.other.pk)
+
+        self.skill.posted_by = self.user
+        self.skill.save()
+
+        assert table_version(Skill, self.other.pk) != version
+
+
+class DataLoaderTestCase(TestCase):
+
+    def setUp(self):
+        self.users = mixer.cycle(5).blend(get_user_model())
+        self.loader = UserLoader()
+
+    def test_primed_keys_load_in_one_query(self):
+        self.loader.prime(user.pk for user in self.users)
+
+        with self.assertNumQueries(1):
+            loaded = [self.loader.load(user.pk) for user in self.users]
+
+        assert loaded == self.users
+
+    def test_load_many_is_one_query(self):
+        with self.assertNumQueries(1):
+            loaded = self.loader.load_many([user.pk for user in self.users] + [0])
+
+        assert loaded == self.users + [None]
+
+    def test_loaded_keys_are_not_queried_again(self):
+        self.loader.load(self.users[0].pk)
+
+        with self.assertNumQueries(1):
+            self.loader.load_many(user.pk for user in self.users)
+        with self.assertNumQueries(0):
+            self.loader.load(self.users[0].pk)
+
+
+class JWTAuthenticationTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+
+        self.token = login(self, 'adsoft')
+        self.headers = {"AUTHORIZATION": f"JWT {self.token}"}
+
+        user = get_user_model().objects.get(username="adsoft")
+        for name in ('Python', 'Django', 'GraphQL', 'SQL'):
+            mixer.blend(Skill, skill=name, posted_by=user)
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+
+    def test_token_authenticated_once_per_request(self):
+        with mock.patch.object(auth, 'authenticate', wraps=auth.authenticate) as authenticate:
+            response = self.query(GET_SKILLS, headers=self.headers)
+
+        self.assertResponseNoErrors(response)
+        assert len(json.loads(response.content)['data']['skill']) == 4
+        assert authenticate.call_count == 1
+
+    def test_verified_token_is_remembered(self):
+        with mock.patch.object(auth, 'get_payload', wraps=auth.get_payload) as get_payload:
+            for _ in range(3):
+                response_cache.clear()
+                self.assertResponseNoErrors(self.query(GET_SKILLS, headers=self.headers))
+
+        assert get_payload.call_count == 1
+        assert token_cache.stats()['hits'] == 2
+
+    def test_invalid_token_reported_once_per_root_field(self):
+        with mock.patch.object(auth, 'authenticate', wraps=auth.authenticate) as authenticate:
+            response = self.query(GET_SKILLS, headers={"AUTHORIZATION": "JWT not-a-token"})
+
+        errors = json.loads(response.content)['errors']
+        assert [error['message'] for error in errors] == ['Error decoding signature']
+        assert authenticate.call_count == 1
+        assert token_cache.stats()['entries'] == 0
+
+    def test_expired_entry_is_verified_again(self):
+        token_cache.payloads[self.token] = ({'username': 'someone-else'}, time.time() - 1)
+
+        payload = token_cache.payload(self.token)
+
+        assert payload['username'] == 'adsoft'
+        assert token_cache.stats()['misses'] == 1
+
+    def user_queries(self):
+        response_cache.clear()
+        sql, _ = capture_sql(self, GET_SKILLS, headers=self.headers)
+        return [query for query in sql if 'FROM "auth_user"' in query]
+
+    def test_user_is_looked_up_once(self):
+        assert len(self.user_queries()) == 1
+        assert self.user_queries() == []
+        assert user_cache.stats()['hits'] == 1
+
+    def test_saving_the_user_invalidates(self):
+        self.user_queries()
+        user = get_user_model().objects.get(username="adsoft")
+        user.set_password('another')
+        user.save()
+
+        assert len(self.user_queries()) == 1
+
+    def test_create_user_invalidates(self):
+        self.user_queries()
+        with mock.patch.object(user_cache, 'invalidate', wraps=user_cache.invalidate) as invalidate:
+            self.query(
+                CREATE_USER_MUTATION,
+                variables={'email': 'other@live.com.mx', 'username': 'other', 'password': 'other'}
+            )
+
+        assert invalidate.call_args.args[0].username == 'other'
+
+    def test_disabled_user_is_rejected(self):
+        self.user_queries()
+        get_user_model().objects.filter(username="adsoft").update(is_active=False)
+        get_user_model().objects.get(username="adsoft").save()
+
+        response = self.query(GET_SKILLS, headers=self.headers)
+        assert json.loads(response.content)['errors'][0]['message'] == 'User is disabled'
+
+    def test_entries_expire(self):
+        cache = UserCache(ttl=0)
+        user = get_user_model().objects.get(username="adsoft")
+
+        with self.assertNumQueries(2):
+            cache.get_by_username('adsoft')
+            cache.get_by_id(str(user.pk))
+
+    def test_lookups_return_copies(self):
+        first = JSONWebTokenBackend().get_user(get_user_model().objects.get(username="adsoft").pk)
+        first.first_name = 'changed'
+
+        with self.assertNumQueries(0):
+            second = user_cache.get_by_username('adsoft')
+        assert second.first_name == ''
+        assert second is not first
+
+
+class PasswordHashingTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        self.query(
+            CREATE_USER_MUTATION,
+            variables={'email': 'adsoft@live.com.mx', 'username': 'adsoft', 'password': 'adsoft'}
+        )
+        hash_pool.reset_stats()
+
+    def token_auth(self, username, password):
+        response = self.query(LOGIN_USER_MUTATION, variables={'username': username, 'password': password})
+        return json.loads(response.content)
+
+    def test_create_user_hashes_in_pool(self):
+        threads = []
+        original = hashers.make_password
+
+        def make_password(raw_password):
+            threads.append(threading.current_thread().name)
+            return original(raw_password)
+
+        with mock.patch.object(hashers, 'make_password', make_password):
+            self.query(
+                CREATE_USER_MUTATION,
+                variables={'email': 'other@live.com.mx', 'username': 'other', 'password': 'secret'}
+            )
+
+        assert len(threads) == 1 and threads[0].startswith('password-hash')
+        assert get_user_model().objects.get(username='other').check_password('secret')
+        assert hash_pool.stats()['operations'] == 1
+
+    def test_token_auth_checks_in_pool(self):
+        assert self.token_auth('adsoft', 'adsoft')['data']['tokenAuth']['token']
+        assert 'errors' in self.token_auth('adsoft', 'wrong')
+        assert 'errors' in self.token_auth('nobody', 'adsoft')
+
+        # El usuario que no existe tambien paga un hash
+        assert hash_pool.stats()['operations'] == 3
+
+    def test_outdated_hash_is_upgraded(self):
+        user = get_user_model().objects.get(username='adsoft')
+        user.password = hashers.make_password('adsoft', hasher='pbkdf2_sha1')
+        user.save()
+
+        assert self.token_auth('adsoft', 'adsoft')['data']['tokenAuth']['token']
+
+        user.refresh_from_db()
+        assert user.password.startswith('pbkdf2_sha256$')
+        assert user.check_password('adsoft')
+
+    def test_concurrent_hashes_are_limited(self):
+        pool = HashPool(workers=1)
+        self.addCleanup(pool.executor.shutdown)
+        release = threading.Event()
+
+        first = pool.submit(release.wait)
+        second = pool.submit(hashers.make_password, 'adsoft')
+        # Con un solo hilo el segundo hash espera a que termine el primero
+        assert not second.done()
+        assert pool.stats()['waiting'] >= 1
+
+        release.set()
+        assert first.result() and second.result()
+        stats = pool.stats()
+        assert stats['operations'] == 2 and stats['waiting'] == 0
+        assert stats['max_queue_seconds'] > 0
@@ -16,10 +16,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
+
+from graphql_cache.views import CachedGraphQLView, cache_stats, schema_json, schema_sdl
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('graphql/', csrf_exempt(CachedGraphQLView.as_view(graphiql=True))),
+    path('graphql/cache/stats/', cache_stats),
+    path('graphql/schema.graphql', schema_sdl),
+    path('graphql/schema.json', schema_json),
 
 ]
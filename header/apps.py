@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class HeaderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'header'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
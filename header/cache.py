@@ -0,0 +1,61 @@
+"""Process-local copy of the Header row (there is at most one).
+
+``getHeader`` is the public landing-page query. Each process keeps the row,
+or the fact that there is none, together with the version of the header
+table (see ``graphql_cache.versions``). Writes in this process drop the
+copy; writes in other processes are noticed by comparing that version with
+the database, at most once every ``HEADER_CACHE_CHECK_SECONDS``.
+
+The copy is the whole row, whatever the query selects: one load serves every
+selection, so ``description`` is read once per process instead of being
+left out of each request.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from graphql_cache.versions import depends_on, table_version
+
+from .models import Header
+
+CHECK_SECONDS = getattr(settings, 'HEADER_CACHE_CHECK_SECONDS', 1)
+
+
+class HeaderCache:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.header = None
+        self.version = None
+        self.checked_at = 0
+
+    def get(self):
+        """The Header, or None if there is none."""
+        with self.lock:
+            now = time.monotonic()
+            if not self.loaded or now - self.checked_at >= CHECK_SECONDS:
+                # La version se lee antes que la fila: si cambia entre medias, la proxima comprobacion recarga
+                version = table_version(Header)
+                if not self.loaded or version != self.version:
+                    self.header = Header.objects.first()
+                    self.version = version
+                    self.loaded = True
+                self.checked_at = now
+            header = self.header
+        # La respuesta cacheada de GraphQL caduca con la tabla aunque aqui no haya SQL
+        depends_on(Header)
+        return header
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded = False
+            self.header = None
+
+
+header_cache = HeaderCache()
+
+
+def get_header():
+    return header_cache.get()
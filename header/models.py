@@ -14,7 +14,8 @@ class Header(models.Model):
     posted_by  = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
 
     def save (self, *args, **kwargs):
-        if Header.objects.exists() and not self.pk:
+        # Solo al crear: actualizar no necesita la consulta
+        if not self.pk and Header.objects.exists():
             raise Exception('Only one header instance is allowed')
         super().save(*args, **kwargs)
 
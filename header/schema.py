@@ -1,18 +1,24 @@
 import graphene
 from graphene_django import DjangoObjectType
+from .cache import get_header
 from .models import Header
 from users.schema import UserType
+from users.loaders import load_related_user
+from cv.snapshots import updates_cv_snapshot
 from django.db.models import Q
 
 class HeaderType(DjangoObjectType):
     class Meta:
         model = Header
 
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
 class Query(graphene.ObjectType):
     get_header = graphene.Field(HeaderType)
     
     def resolve_get_header(self, info):
-        header = Header.objects.first()
+        header = get_header()
         if not header:
             raise Exception("No Header exists.")
         return header
@@ -38,6 +44,7 @@ class CreateHeader(graphene.Mutation):
         location = graphene.String(required=True)
         github = graphene.String(required=True)
 
+    @updates_cv_snapshot
     def mutate(self, info, name, actual_position, description, profile_picture, email, cellphone, location, github):
         user = info.context.user or None
         print(user)
@@ -67,7 +74,7 @@ class CreateHeader(graphene.Mutation):
             cellphone=header.cellphone,
             location=header.location,
             github=header.github,
-            posted_by=header.posted_by
+            posted_by=user
         )
 
 class UpdateHeader(graphene.Mutation):
@@ -90,6 +97,7 @@ class UpdateHeader(graphene.Mutation):
         location = graphene.String()
         github = graphene.String()
 
+    @updates_cv_snapshot
     def mutate(self, info, name=None, actual_position=None, description=None, profile_picture=None, email=None, cellphone=None, location=None, github=None):
         user = info.context.user or None
         if user.is_anonymous:
@@ -135,16 +143,17 @@ class UpdateHeader(graphene.Mutation):
 class DeleteHeader(graphene.Mutation):
     message = graphene.String()
 
+    @updates_cv_snapshot
     def mutate(self, info):
         user = info.context.user or None
         if user.is_anonymous:
             raise Exception('Not logged in!')
         print (user)
 
-        if not Header.objects.exists():
+        header = Header.objects.first()
+        if not header:
             raise Exception('No Header exists to delete.')
 
-        header = Header.objects.first()
         header.delete()
 
         return DeleteHeader(message="Header deleted successfully.")
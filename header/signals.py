@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache import header_cache
+from .models import Header
+
+
+def header_changed(sender, instance, **kwargs):
+    header_cache.invalidate()
+    # Otra peticion puede haber cargado la fila anterior antes del commit
+    transaction.on_commit(header_cache.invalidate)
+
+
+def connect():
+    post_save.connect(header_changed, sender=Header, dispatch_uid='header_cache_saved')
+    post_delete.connect(header_changed, sender=Header, dispatch_uid='header_cache_deleted')
@@ -3,6 +3,12 @@ from graphene_django.utils.testing import GraphQLTestCase
 from mixer.backend.django import mixer
 import json
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from graphql_cache.versions import invalidate
+from hacker_news.testing import capture_sql
+from header.cache import get_header
 from header.models import Header
 from hacker_news.schema import schema
 
@@ -404,6 +410,72 @@ class HeaderTestCase(GraphQLTestCase):
         assert "errors" in content
         assert content["errors"][0]["message"] == "No Header exists."
 
+    def header_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            header = get_header()
+        return header, [q['sql'] for q in context.captured_queries if 'FROM "header_header"' in q['sql']]
+
+    def test_get_header_kept_in_memory(self):
+        header, queries = self.header_queries()
+        assert header.name == "Test User"
+        assert len(queries) == 1
+
+        header, queries = self.header_queries()
+        assert header.name == "Test User"
+        assert queries == []
+
+    def test_get_header_loads_description_once(self):
+        # La copia en memoria es la fila completa: description se lee una vez por proceso, no en cada peticion
+        query = '''
+            query {
+                getHeader {
+                    name
+                    actualPosition
+                }
+            }
+        '''
+        first, _ = capture_sql(self, query, headers=self.headers)
+        second, _ = capture_sql(self, query, headers=self.headers)
+
+        first_queries = [sql for sql in first if 'FROM "header_header"' in sql]
+        second_queries = [sql for sql in second if 'FROM "header_header"' in sql]
+        assert len(first_queries) == 1
+        assert '"header_header"."description"' in first_queries[0]
+        assert second_queries == []
+
+    def test_get_header_caches_missing_header(self):
+        Header.objects.all().delete()
+
+        header, queries = self.header_queries()
+        assert header is None
+        assert len(queries) == 1
+
+        assert self.header_queries() == (None, [])
+
+    def test_get_header_sees_local_update(self):
+        get_header()
+
+        self.header.name = "Renamed"
+        self.header.save()
+
+        assert get_header().name == "Renamed"
+
+    def test_get_header_checks_version_of_other_processes(self):
+        get_header()
+        # Otro proceso: cambia la fila y la version sin pasar por las señales de este
+        Header.objects.filter(pk=self.header.pk).update(name="Elsewhere")
+        invalidate(Header)
+
+        with mock.patch('header.cache.CHECK_SECONDS', 0):
+            assert get_header().name == "Elsewhere"
+
+    def test_update_header_single_save_query(self):
+        with CaptureQueriesContext(connection) as context:
+            self.header.save()
+
+        # Sin el exists() de la creacion
+        assert not any(q['sql'].startswith('SELECT 1 AS "a" FROM "header_header"') for q in context.captured_queries)
+
     def test_update_header_no_header_exists(self):
         # Eliminar todos los Headers existentes
         Header.objects.all().delete()
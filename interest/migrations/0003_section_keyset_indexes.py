@@ -0,0 +1,21 @@
+# Generated by Django 4.2.13 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interest', '0002_rename_interest_name_interest_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interest',
+            index=models.Index(fields=['posted_by', 'id'], name='interest_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interest',
+            index=models.Index(fields=['posted_by', 'name', 'id'], name='interest_owner_name_idx'),
+        ),
+    ]
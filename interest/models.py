@@ -1,7 +1,20 @@
 from django.db import models
 from django.conf import settings
 
+from hacker_news.normalize import NormalizedFieldsMixin
+
 # Create your models here.
-class Interest(models.Model):
+class Interest(NormalizedFieldsMixin, models.Model):
     name = models.TextField(default='')
-    posted_by     = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
\ No newline at end of file
+    posted_by     = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
+
+    name_normalized = models.TextField(default='', editable=False)
+
+    normalized_fields = {'name_normalized': 'name'}
+
+    # Paginacion por cursor (posted_by, columna, id)
+    class Meta:
+        indexes = [
+            models.Index(fields=['posted_by', 'id'], name='interest_owner_id_idx'),
+            models.Index(fields=['posted_by', 'name', 'id'], name='interest_owner_name_idx'),
+        ]
@@ -2,14 +2,34 @@ import graphene
 from graphene_django import DjangoObjectType
 from .models import Interest
 from users.schema import UserType
+from users.loaders import load_related_user
+from hacker_news.normalize import normalize
+from hacker_news.optimizer import optimize
+from cv.snapshots import updates_cv_snapshot
+from hacker_news.pagination import (
+    CountableConnection, connection_arguments, section_connection, section_ordering,
+)
 from django.db.models import Q
 
 class InterestType(DjangoObjectType):
     class Meta:
         model = Interest
+        exclude = ('name_normalized',)
+
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
+class InterestConnection(CountableConnection):
+    class Meta:
+        node = InterestType
+
+class InterestOrderBy(graphene.Enum):
+    ID = 'id'
+    NAME = 'name'
 
 class Query(graphene.ObjectType):
     interest = graphene.List(InterestType, search=graphene.String(required=False))
+    interest_connection = graphene.Field(InterestConnection, search=graphene.String(), **connection_arguments(InterestOrderBy))
     interestById = graphene.Field(InterestType, idInterest=graphene.Int())
 
     def resolve_interest(self, info, search=None, **kwargs):
@@ -25,13 +45,13 @@ class Query(graphene.ObjectType):
 
         # Caso: Si search es None o "*", devuelve los primeros 10 registros
         if not search or search == "*":
-            interests = Interest.objects.filter(filter)[:10]
+            interests = optimize(Interest.objects.filter(filter), info).order_by(*section_ordering())[:10]
             print("Interests returned (no filter or wildcard):", interests)
             return interests
 
         # Caso: Filtrar por interés específico
-        filter &= Q(name__icontains=search)
-        interests = Interest.objects.filter(filter)
+        filter &= Q(name_normalized__contains=normalize(search))
+        interests = optimize(Interest.objects.filter(filter), info).order_by(*section_ordering())
         print("Filtered interests returned:", interests)
         return interests
 
@@ -44,7 +64,19 @@ class Query(graphene.ObjectType):
         filter = (
             Q(posted_by=user) & Q(id = idInterest)
         ) 
-        return Interest.objects.filter(filter).first()
+        return optimize(Interest.objects.filter(filter), info).first()
+
+    def resolve_interest_connection(self, info, search=None, first=None, after=None, order_by=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        filter = Q(posted_by=user)
+        if search and search != "*":
+            filter &= Q(name_normalized__contains=normalize(search))
+        return section_connection(
+            InterestConnection, Interest.objects.filter(filter), info, section_ordering(order_by), first, after
+        )
 
 class CreateInterest(graphene.Mutation):
     idInterest = graphene.Int()
@@ -55,6 +87,7 @@ class CreateInterest(graphene.Mutation):
         idInterest = graphene.Int()
         name = graphene.String()
 
+    @updates_cv_snapshot
     def mutate(self, info, idInterest, name):
         user = info.context.user
         if user.is_anonymous:  # Validar si el usuario no está autenticado
@@ -76,7 +109,7 @@ class CreateInterest(graphene.Mutation):
         return CreateInterest(
             idInterest=interest.id,
             name=interest.name,
-            posted_by=interest.posted_by
+            posted_by=user
         )
     
 class DeleteInterest(graphene.Mutation):
@@ -85,6 +118,7 @@ class DeleteInterest(graphene.Mutation):
     class Arguments:
         idInterest = graphene.Int()
 
+    @updates_cv_snapshot
     def mutate(self, info, idInterest):
         user = info.context.user or None 
 
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.13 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('language', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='language',
+            index=models.Index(fields=['posted_by', 'id'], name='language_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='language',
+            index=models.Index(fields=['posted_by', 'language', 'id'], name='language_owner_language_idx'),
+        ),
+    ]
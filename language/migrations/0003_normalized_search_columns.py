@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+from hacker_news.db import trigram_indexes
+from hacker_news.normalize import normalize
+
+
+def backfill_normalized(apps, schema_editor):
+    Language = apps.get_model('language', 'Language')
+    batch = []
+    for instance in Language.objects.all().iterator(chunk_size=1000):
+        instance.language_normalized = normalize(instance.language)
+        batch.append(instance)
+    Language.objects.bulk_update(batch, ['language_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('language', '0002_section_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='language',
+            name='language_normalized',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_normalized, migrations.RunPython.noop),
+        trigram_indexes('language_language', {'language_normalized_trgm_idx': 'language_normalized'}),
+    ]
@@ -1,7 +1,20 @@
 from django.db import models
 from django.conf import settings
 
+from hacker_news.normalize import NormalizedFieldsMixin
+
 # Create your models here.
-class Language(models.Model):
+class Language(NormalizedFieldsMixin, models.Model):
     language   = models.TextField(default='')
     posted_by  = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
+
+    language_normalized = models.TextField(default='', editable=False)
+
+    normalized_fields = {'language_normalized': 'language'}
+
+    # Paginacion por cursor (posted_by, columna, id)
+    class Meta:
+        indexes = [
+            models.Index(fields=['posted_by', 'id'], name='language_owner_id_idx'),
+            models.Index(fields=['posted_by', 'language', 'id'], name='language_owner_language_idx'),
+        ]
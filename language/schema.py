@@ -2,17 +2,38 @@ import graphene
 from graphene_django import DjangoObjectType
 from .models import Language
 from users.schema import UserType
+from users.loaders import load_related_user
+from hacker_news.normalize import normalize
+from hacker_news.optimizer import optimize
+from cv.snapshots import updates_cv_snapshot
+from hacker_news.pagination import (
+    CountableConnection, connection_arguments, section_connection, section_ordering,
+)
+from search.fuzzy import fuzzy_matches
 from django.db.models import Q
 
 class LanguageType(DjangoObjectType):
     class Meta:
         model = Language
+        exclude = ('language_normalized',)
+
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
+class LanguageConnection(CountableConnection):
+    class Meta:
+        node = LanguageType
+
+class LanguageOrderBy(graphene.Enum):
+    ID = 'id'
+    LANGUAGE = 'language'
 
 class Query(graphene.ObjectType):
-    languages = graphene.List(LanguageType, search=graphene.String(required=False))
+    languages = graphene.List(LanguageType, search=graphene.String(required=False), fuzzy=graphene.Boolean())
+    languages_connection = graphene.Field(LanguageConnection, search=graphene.String(), **connection_arguments(LanguageOrderBy))
     languageById = graphene.Field(LanguageType, idLanguage=graphene.Int())
 
-    def resolve_languages(self, info, search=None, **kwargs):
+    def resolve_languages(self, info, search=None, fuzzy=False, **kwargs):
         user = info.context.user
         if user.is_anonymous:
             raise Exception('Not logged in!')
@@ -25,13 +46,16 @@ class Query(graphene.ObjectType):
 
         # Caso: Si search es None o "*", devuelve los primeros 10 registros
         if not search or search == "*":
-            languages = Language.objects.filter(filter)[:10]
+            languages = optimize(Language.objects.filter(filter), info).order_by(*section_ordering())[:10]
             print("languages returned (no filter or wildcard):", languages)
             return languages
 
         # Caso: Filtrar por interés específico
-        filter &= Q(language__icontains=search)
-        languages = Language.objects.filter(filter)
+        term = Q(language_normalized__contains=normalize(search))
+        if fuzzy:
+            term |= Q(language_normalized__in=fuzzy_matches('language', search))
+        filter &= term
+        languages = optimize(Language.objects.filter(filter), info).order_by(*section_ordering())
         print("Filtered languages returned:", languages)
         return languages
         
@@ -44,8 +68,20 @@ class Query(graphene.ObjectType):
         filter = (
             Q(posted_by=user) & Q(id=idLanguage)
         )
-        return Language.objects.filter(filter).first()
-    
+        return optimize(Language.objects.filter(filter), info).first()
+
+    def resolve_languages_connection(self, info, search=None, first=None, after=None, order_by=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        filter = Q(posted_by=user)
+        if search and search != "*":
+            filter &= Q(language_normalized__contains=normalize(search))
+        return section_connection(
+            LanguageConnection, Language.objects.filter(filter), info, section_ordering(order_by), first, after
+        )
+
 class CreateLanguage(graphene.Mutation):
     idLanguage = graphene.Int()
     language = graphene.String()
@@ -55,6 +91,7 @@ class CreateLanguage(graphene.Mutation):
         idLanguage = graphene.Int()
         language = graphene.String()
 
+    @updates_cv_snapshot
     def mutate(self, info, idLanguage, language):
         user = info.context.user
         if user.is_anonymous:  # Validar si el usuario no está autenticado
@@ -76,7 +113,7 @@ class CreateLanguage(graphene.Mutation):
         return CreateLanguage(
             idLanguage = language.id,
             language = language.language,
-            posted_by = language.posted_by
+            posted_by = user
         )
     
 class DeleteLanguage(graphene.Mutation):
@@ -85,6 +122,7 @@ class DeleteLanguage(graphene.Mutation):
     class Arguments:
         idLanguage= graphene.Int()
 
+    @updates_cv_snapshot
     def mutate(self, info, idLanguage):
         user = info.context.user or None
 
@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 
 from hacker_news.schema import schema
 from language.models import Language
+from search import values
 
 # Create your tests here.
 GET_ALL_LANGUAGES = '''
@@ -36,6 +37,15 @@ query GetFilteredLanguages($search: String!) {
 }
 '''
 
+GET_FUZZY_LANGUAGES = '''
+query GetFuzzyLanguages($search: String!) {
+  languages(search: $search, fuzzy: true) {
+    id
+    language
+  }
+}
+'''
+
 GET_LANGUAGE_BY_ID = '''
 query GetLanguageById($idLanguage: Int!) {
   languageById(idLanguage: $idLanguage) {
@@ -356,7 +366,25 @@ class LanguageTestCase(GraphQLTestCase):
         error_message = content['errors'][0]['message']
         assert error_message == "Not logged in!"
 
+    def test_get_fuzzy_languages_follow_new_languages(self):
+        values.reset()
+        self.addCleanup(values.reset)
 
+        def fuzzy(search):
+            response = self.query(GET_FUZZY_LANGUAGES, variables={"search": search}, headers=self.headers)
+            self.assertResponseNoErrors(response)
+            return [language['language'] for language in json.loads(response.content)['data']['languages']]
 
+        assert fuzzy("Ingels") == []
 
+        # El BK-tree ya esta construido: el idioma nuevo entra por la señal al confirmar
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.query(
+                CREATE_OR_UPDATE_LANGUAGE,
+                variables={"idLanguage": 0, "language": "Inglés"},
+                headers=self.headers
+            )
+            self.assertResponseNoErrors(response)
 
+        assert fuzzy("Ingels") == ["Inglés"]
+        assert fuzzy("ingles") == ["Inglés"]
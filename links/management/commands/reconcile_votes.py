@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from graphql_cache.versions import invalidate
+from links.models import Link, Vote
+
+
+class Command(BaseCommand):
+    help = 'Repair Link.vote_count drift against the Vote table, in batches of links.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        actual = Coalesce(
+            Subquery(
+                Vote.objects.filter(link=OuterRef('pk'))
+                .order_by()
+                .values('link')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0,
+        )
+
+        last_id = 0
+        checked = repaired = 0
+        while True:
+            ids = list(
+                Link.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                repaired += (
+                    Link.objects.filter(id__in=ids)
+                    .exclude(vote_count=actual)
+                    .update(vote_count=actual)
+                )
+                invalidate(Link)
+            checked += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(f'Checked {checked} links, repaired {repaired}.')
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.13 on 2026-10-18 06:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_count(apps, schema_editor):
+    Link = apps.get_model('links', 'Link')
+    Vote = apps.get_model('links', 'Vote')
+    votes = (
+        Vote.objects.filter(link=OuterRef('pk'))
+        .order_by()
+        .values('link')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Link.objects.update(vote_count=Coalesce(Subquery(votes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('links', '0003_vote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['-vote_count', '-id'], name='link_vote_count_idx'),
+        ),
+        migrations.RunPython(backfill_vote_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from hacker_news.db import trigram_indexes
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('links', '0004_link_vote_count'),
+    ]
+
+    operations = [
+        # icontains se compila a UPPER("col"::text) LIKE UPPER(%s): el indice es de esa misma expresion
+        trigram_indexes('links_link', {
+            'link_url_upper_trgm_idx': 'UPPER(url::text)',
+            'link_description_upper_trgm_idx': 'UPPER(description::text)',
+        }),
+    ]
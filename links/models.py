@@ -6,6 +6,12 @@ class Link(models.Model):
     url = models.URLField()
     description = models.TextField(blank=True)
     posted_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
+    vote_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-vote_count', '-id'], name='link_vote_count_idx'),
+        ]
 
 class Vote(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -1,29 +1,122 @@
 import graphene
 from graphene_django import DjangoObjectType
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Value
 
 from links.models import Link, Vote
 from users.schema import UserType
+from users.loaders import load_related_user
+from hacker_news.optimizer import optimize, optimize_connection
+from hacker_news.pagination import build_connection, keyset_page, only_fields
+from search.trigram import relevance
+from graphql_cache.versions import invalidate
 from graphql import GraphQLError
 
 
+def viewer_has_voted_annotation(info):
+    user = info.context.user
+    if user.is_anonymous:
+        return Value(False)
+    return Exists(Vote.objects.filter(link=OuterRef('pk'), user=user))
+
+
 class LinkType(DjangoObjectType):
+    viewer_has_voted = graphene.Boolean()
+
+    optimizer_annotations = {
+        'viewer_has_voted': viewer_has_voted_annotation,
+    }
+
     class Meta:
         model = Link
 
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
+    # Sin anotacion (p. ej. un link anidado) se calcula con su propio query
+    def resolve_viewer_has_voted(self, info):
+        if hasattr(self, 'viewer_has_voted'):
+            return self.viewer_has_voted
+        user = info.context.user
+        return not user.is_anonymous and self.votes.filter(user=user).exists()
+
 # Add after the LinkType
 class VoteType(DjangoObjectType):
     class Meta:
         model = Vote
 
+    def resolve_user(self, info):
+        return load_related_user(info, self, 'user')
+
+class LinkConnection(graphene.relay.Connection):
+    class Meta:
+        node = LinkType
+
+
+class VoteConnection(graphene.relay.Connection):
+    class Meta:
+        node = VoteType
+
+
+class LinkOrderBy(graphene.Enum):
+    NEWEST = 'newest'
+    VOTES_DESC = 'votes_desc'
+    RELEVANCE = 'relevance'
+
+
+# El orden por votos usa el indice (-vote_count, -id)
+LINK_ORDERING = {
+    LinkOrderBy.NEWEST.value: ('-id',),
+    LinkOrderBy.VOTES_DESC.value: ('-vote_count', '-id'),
+    # Similitud de trigramas con el termino buscado
+    LinkOrderBy.RELEVANCE.value: ('-relevance', '-id'),
+}
+
+
 class Query(graphene.ObjectType):
-    links = graphene.List(LinkType)
+    links = graphene.List(LinkType, order_by=LinkOrderBy())
     votes = graphene.List(VoteType)
-
-    def resolve_links(self, info, **kwargs):
-        return Link.objects.all()
+    links_connection = graphene.Field(
+        LinkConnection,
+        first=graphene.Int(),
+        after=graphene.String(),
+        search=graphene.String(),
+        order_by=LinkOrderBy(),
+    )
+    votes_connection = graphene.Field(VoteConnection, first=graphene.Int(), after=graphene.String())
+
+    def resolve_links(self, info, order_by=None, **kwargs):
+        links = optimize(Link.objects.all(), info)
+        if order_by is not None:
+            # La lista no tiene busqueda: RELEVANCE equivale a NEWEST
+            if order_by == LinkOrderBy.RELEVANCE:
+                order_by = LinkOrderBy.NEWEST
+            links = links.order_by(*LINK_ORDERING[order_by.value])
+        return links
 
     def resolve_votes(self, info, **kwargs):
-        return Vote.objects.all()
+        return optimize(Vote.objects.all(), info)
+
+    def resolve_links_connection(self, info, first=None, after=None, search=None, order_by=None, **kwargs):
+        ordering = LINK_ORDERING[order_by.value if order_by else LinkOrderBy.NEWEST.value]
+
+        links = Link.objects.all()
+        if search:
+            links = links.filter(Q(url__icontains=search) | Q(description__icontains=search))
+            if order_by == LinkOrderBy.RELEVANCE:
+                links = links.annotate(relevance=relevance(search, 'url', 'description'))
+        elif order_by == LinkOrderBy.RELEVANCE:
+            ordering = LINK_ORDERING[LinkOrderBy.NEWEST.value]
+
+        links = optimize_connection(links, info, only_fields(links, ordering))
+        rows, has_next_page = keyset_page(links, ordering, first, after)
+        return build_connection(LinkConnection, rows, has_next_page, ordering, after)
+
+    def resolve_votes_connection(self, info, first=None, after=None, **kwargs):
+        ordering = ('id',)
+        votes = optimize_connection(Vote.objects.all(), info)
+        rows, has_next_page = keyset_page(votes, ordering, first, after)
+        return build_connection(VoteConnection, rows, has_next_page, ordering, after)
 
 class CreateLink(graphene.Mutation):
     id = graphene.Int()
@@ -48,7 +141,7 @@ class CreateLink(graphene.Mutation):
             id=link.id,
             url=link.url,
             description=link.description,
-            posted_by=link.posted_by,
+            posted_by=user,
         )
 
 
@@ -71,10 +164,15 @@ class CreateVote(graphene.Mutation):
         if not link:
             raise Exception('Invalid Link!')
 
-        Vote.objects.create(
-            user=user,
-            link=link,
-        )
+        with transaction.atomic():
+            Vote.objects.create(
+                user=user,
+                link=link,
+            )
+            Link.objects.filter(id=link.id).update(vote_count=F('vote_count') + 1)
+            # update() no envia post_save
+            invalidate(Link)
+        link.refresh_from_db(fields=['vote_count'])
 
         return CreateVote(user=user, link=link)
 
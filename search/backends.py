@@ -0,0 +1,60 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from hacker_news.normalize import normalize
+
+TEXT_SEARCH_CONFIG = 'spanish'
+FTS_TABLE = 'search_searchdocument_fts'
+
+
+def fts5_query(query):
+    # Cada palabra como prefijo entre comillas: no se interpreta la sintaxis de FTS5
+    terms = re.findall(r'\w+', query)
+    return ' '.join('"%s"*' % term for term in terms)
+
+
+def prefix_tsquery(query):
+    # Igual que en SQLite: cada palabra como prefijo y todas obligatorias
+    return ' & '.join('%s:*' % term for term in re.findall(r'[^\W_]+', query))
+
+
+def search_documents(queryset, query):
+    """Filter ``queryset`` to the documents matching ``query``, best first.
+
+    Matches come from the full-text index of the active database and carry a
+    ``score`` annotation (higher is better). Bodies are stored normalized, so
+    the query is normalized too and accents don't matter on any database.
+    """
+    query = normalize(query)
+    if connection.vendor == 'postgresql':
+        terms = prefix_tsquery(query)
+        if not terms:
+            return queryset.none()
+        tsquery = f"to_tsquery('{TEXT_SEARCH_CONFIG}', %s)"
+        queryset = queryset.filter(
+            RawSQL(f'search_vector @@ {tsquery}', [terms], output_field=BooleanField())
+        ).annotate(
+            score=RawSQL(f'ts_rank(search_vector, {tsquery})', [terms], output_field=FloatField())
+        )
+    elif connection.vendor == 'sqlite':
+        match = fts5_query(query)
+        if not match:
+            return queryset.none()
+        queryset = queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            # bm25 es negativo: mas pequeño es mejor
+            score=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = search_searchdocument.id',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        queryset = queryset.filter(body__icontains=query).annotate(score=Value(1.0))
+
+    return queryset.order_by(F('score').desc(), 'id')
@@ -0,0 +1,71 @@
+from archivements.models import Archivements
+from hacker_news.normalize import normalize
+from education.models import Education
+from interest.models import Interest
+from language.models import Language
+from skills.models import Skill
+from workexperience.models import WorkExperience
+
+from .models import SearchDocument
+
+
+def _join(*parts):
+    return ' '.join(part for part in parts if part)
+
+
+def _work_experience(work):
+    descriptions = [archivement.description for archivement in work.archivements.all()]
+    return work.position, _join(work.position, work.company, work.location, *descriptions)
+
+
+# modelo -> (seccion, funcion que devuelve (titulo, texto indexado))
+SECTIONS = {
+    Skill: ('skill', lambda skill: (skill.skill, skill.skill)),
+    Language: ('language', lambda language: (language.language, language.language)),
+    Interest: ('interest', lambda interest: (interest.name, interest.name)),
+    Education: ('education', lambda education: (education.degree, _join(education.degree, education.university))),
+    WorkExperience: ('workExperience', _work_experience),
+    Archivements: ('archivement', lambda archivement: (archivement.archivementName, archivement.archivementName)),
+}
+
+
+def build_document(instance):
+    section, extract = SECTIONS[type(instance)]
+    title, body = extract(instance)
+    return SearchDocument(
+        section=section,
+        object_id=instance.pk,
+        title=title,
+        # Sin acentos ni mayusculas, como la consulta (ver search.backends)
+        body=normalize(body),
+        posted_by_id=instance.posted_by_id,
+    )
+
+
+def index_instance(instance):
+    document = build_document(instance)
+    SearchDocument.objects.update_or_create(
+        section=document.section,
+        object_id=document.object_id,
+        defaults={'title': document.title, 'body': document.body, 'posted_by_id': document.posted_by_id},
+    )
+
+
+def remove_instance(instance):
+    section, _ = SECTIONS[type(instance)]
+    SearchDocument.objects.filter(section=section, object_id=instance.pk).delete()
+
+
+def reindex_work_experience(archivement):
+    # Los logros se indexan dentro del documento de su experiencia
+    work = WorkExperience.objects.filter(pk=archivement.work_experience_id).first()
+    if work is not None:
+        index_instance(work)
+
+
+def section_querysets():
+    for model in SECTIONS:
+        queryset = model.objects.order_by('pk')
+        if model is WorkExperience:
+            queryset = queryset.prefetch_related('archivements')
+        yield model, queryset
@@ -0,0 +1,107 @@
+"""Typo-tolerant matching for skill and language names.
+
+Each process keeps a BK-tree per section (see ``search.values``) over the
+distinct normalized values of all users. A lookup only computes the edit
+distance against the nodes the triangle inequality cannot rule out, instead
+of against every row.
+"""
+from hacker_news.normalize import normalize
+from language.models import Language
+from skills.models import Skill
+
+from .values import register
+
+
+def levenshtein(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def max_distance(term):
+    # Como el AUTO de Elasticsearch: 0 errores hasta 2 letras, 1 hasta 5, 2 despues
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+
+class _Node:
+    __slots__ = ('key', 'count', 'children')
+
+    def __init__(self, key, count):
+        self.key = key
+        # filas con este valor; en 0 el nodo se conserva pero no se devuelve
+        self.count = count
+        # distancia -> hijo
+        self.children = {}
+
+
+class BKTree:
+    """BK-tree over normalized values, counting how many rows use each one."""
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, value, delta=1):
+        key = normalize(value)
+        if not key:
+            return
+        if self.root is None:
+            if delta > 0:
+                self.root = _Node(key, delta)
+            return
+
+        node = self.root
+        while True:
+            distance = levenshtein(key, node.key)
+            if distance == 0:
+                node.count = max(node.count + delta, 0)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                if delta > 0:
+                    node.children[distance] = _Node(key, delta)
+                return
+            node = child
+
+    def search(self, term, distance):
+        """Normalized values within ``distance`` edits of ``term``, closest first."""
+        term = normalize(term)
+        matches = []
+        pending = [self.root] if self.root is not None else []
+        while pending:
+            node = pending.pop()
+            found = levenshtein(term, node.key)
+            if found <= distance and node.count:
+                matches.append((found, node.key))
+            # Solo los hijos a distancia [d - distance, d + distance] pueden coincidir
+            low, high = found - distance, found + distance
+            pending.extend(child for edge, child in node.children.items() if low <= edge <= high)
+        return [key for _, key in sorted(matches)]
+
+
+# seccion -> indice sobre la columna del nombre
+INDEXES = {
+    'skill': register(Skill, 'skill', BKTree),
+    'language': register(Language, 'language', BKTree),
+}
+
+
+# Modo tolerante a errores: tambien los valores a pocas ediciones (BK-tree en memoria)
+def fuzzy_matches(section, term):
+    """Normalized values of ``section`` close enough to ``term`` to count as a match."""
+    distance = max_distance(normalize(term))
+    return INDEXES[section].read(lambda tree: tree.search(term, distance))
@@ -0,0 +1,119 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from hacker_news.normalize import normalize
+from hacker_news.pagination import MAX_PAGE_SIZE, section_ordering
+from links.models import Link
+from search.trigram import TRIGRAM_INDEXES, relevance, trigram_supported
+from workexperience.models import WorkExperience
+from workexperience.schema import search_filter
+
+WORDS = [
+    'backend', 'frontend', 'developer', 'engineer', 'manager', 'analyst', 'senior', 'junior',
+    'data', 'cloud', 'platform', 'mobile', 'consulting', 'software', 'systems', 'retail',
+]
+# Termino poco frecuente (1 de cada RARE_EVERY filas), como una busqueda real
+RARE_TERM = 'kubernetes'
+RARE_EVERY = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the substring search of work experiences and links on synthetic tables, '
+        'with and without the pg_trgm indexes. Everything is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, sizes, runs, batch_size, **options):
+        if not trigram_supported():
+            self.stdout.write(f'{connection.vendor} has no pg_trgm: only the unindexed search is timed.')
+
+        self.stdout.write(f'{"table":<32}{"rows":>10}{"index":>8}{"p50 ms":>10}{"p95 ms":>10}{"rel p50":>10}')
+        for size in sizes:
+            for table, populate, searches in (
+                ('workexperience_workexperience', self._populate_work_experiences, self._work_experience_searches),
+                ('links_link', self._populate_links, self._link_searches),
+            ):
+                with transaction.atomic():
+                    owner = get_user_model().objects.create(username=f'benchmark-{size}')
+                    populate(owner, size, batch_size)
+                    if trigram_supported():
+                        with connection.cursor() as cursor:
+                            cursor.execute(f'ANALYZE {table}')
+                        self._report(table, size, 'yes', searches(owner), runs)
+                        with connection.cursor() as cursor:
+                            for index in TRIGRAM_INDEXES[table]:
+                                cursor.execute(f'DROP INDEX IF EXISTS {index}')
+                    self._report(table, size, 'no', searches(owner), runs)
+                    # DROP INDEX tambien se deshace: PostgreSQL tiene DDL transaccional
+                    transaction.set_rollback(True)
+
+    def _report(self, table, size, indexed, searches, runs):
+        plain, ranked = searches
+        p50, p95 = self._time(plain, runs)
+        relevance_p50, _ = self._time(ranked, runs)
+        self.stdout.write(f'{table:<32}{size:>10}{indexed:>8}{p50:>10.2f}{p95:>10.2f}{relevance_p50:>10.2f}')
+
+    def _time(self, queryset, runs):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+    def _text(self, index):
+        words = random.sample(WORDS, 3)
+        if index % RARE_EVERY == 0:
+            words[random.randrange(3)] = RARE_TERM
+        return ' '.join(words)
+
+    def _populate_work_experiences(self, owner, size, batch_size):
+        for start in range(0, size, batch_size):
+            batch = []
+            for index in range(start, min(start + batch_size, size)):
+                position, company = self._text(index), self._text(index + 1)
+                batch.append(WorkExperience(
+                    position=position, company=company, location='CDMX', posted_by=owner,
+                    # bulk_create no pasa por save(): se normaliza aqui
+                    position_normalized=normalize(position), company_normalized=normalize(company),
+                ))
+            WorkExperience.objects.bulk_create(batch)
+
+    def _populate_links(self, owner, size, batch_size):
+        for start in range(0, size, batch_size):
+            Link.objects.bulk_create([
+                Link(url=f'https://example.com/{index}/{self._text(index).replace(" ", "-")}',
+                     description=self._text(index + 1), posted_by=owner)
+                for index in range(start, min(start + batch_size, size))
+            ])
+
+    # Los mismos queries que workExperiences(search:) y linksConnection(search:)
+    def _work_experience_searches(self, owner):
+        work_experiences = WorkExperience.objects.filter(Q(posted_by=owner) & search_filter(RARE_TERM))
+        ranked = work_experiences.annotate(
+            relevance=relevance(RARE_TERM, 'position_normalized', 'company_normalized')
+        )
+        return (
+            work_experiences.order_by(*section_ordering())[:MAX_PAGE_SIZE],
+            ranked.order_by('posted_by_id', '-relevance', '-id')[:MAX_PAGE_SIZE],
+        )
+
+    def _link_searches(self, owner):
+        links = Link.objects.filter(Q(url__icontains=RARE_TERM) | Q(description__icontains=RARE_TERM))
+        ranked = links.annotate(relevance=relevance(RARE_TERM, 'url', 'description'))
+        return (
+            links.order_by('-id')[:MAX_PAGE_SIZE],
+            ranked.order_by('-relevance', '-id')[:MAX_PAGE_SIZE],
+        )
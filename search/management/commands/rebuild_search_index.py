@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from graphql_cache.versions import invalidate
+from search.documents import build_document, section_querysets
+from search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the CV full-text search index, streaming rows in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, chunk_size, **options):
+        total = 0
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+
+            for model, queryset in section_querysets():
+                batch = []
+                for instance in queryset.iterator(chunk_size=chunk_size):
+                    batch.append(build_document(instance))
+                    if len(batch) >= chunk_size:
+                        SearchDocument.objects.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    SearchDocument.objects.bulk_create(batch)
+                    total += len(batch)
+            # bulk_create no envia post_save
+            invalidate(SearchDocument)
+
+        self.stdout.write(f'Indexed {total} documents.')
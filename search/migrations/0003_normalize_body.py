@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from hacker_news.normalize import normalize
+
+
+def normalize_bodies(apps, schema_editor):
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    batch = []
+    for document in SearchDocument.objects.only('body').iterator(chunk_size=1000):
+        document.body = normalize(document.body)
+        batch.append(document)
+    SearchDocument.objects.bulk_update(batch, ['body'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_bodies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import models
+from django.conf import settings
+
+# Una fila por entrada del CV; el indice de texto completo depende del motor
+# (columna tsvector + GIN en Postgres, tabla FTS5 en SQLite), ver migraciones.
+class SearchDocument(models.Model):
+    section   = models.CharField(max_length=32)
+    object_id = models.PositiveBigIntegerField()
+    title     = models.TextField(default='')
+    body      = models.TextField(default='')
+    posted_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['section', 'object_id'], name='search_document_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['posted_by', 'section'], name='search_owner_section_idx'),
+        ]
@@ -0,0 +1,51 @@
+import graphene
+from graphene_django import DjangoObjectType
+from .models import SearchDocument
+from .backends import search_documents
+from .suggest import DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS, suggest
+from hacker_news.pagination import page_size
+
+class SearchResultType(DjangoObjectType):
+    score = graphene.Float()
+
+    class Meta:
+        model = SearchDocument
+        fields = ('section', 'object_id', 'title')
+
+class SuggestSection(graphene.Enum):
+    SKILL = 'skill'
+    LANGUAGE = 'language'
+    INTEREST = 'interest'
+
+class SuggestionType(graphene.ObjectType):
+    value = graphene.String()
+    count = graphene.Int()
+
+class Query(graphene.ObjectType):
+    search_cv = graphene.List(SearchResultType, query=graphene.String(required=True), first=graphene.Int())
+    suggest = graphene.List(
+        SuggestionType,
+        section=SuggestSection(required=True),
+        prefix=graphene.String(required=True),
+        first=graphene.Int(),
+    )
+
+    def resolve_search_cv(self, info, query, first=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        documents = SearchDocument.objects.filter(posted_by=user).only('section', 'object_id', 'title')
+        return search_documents(documents, query)[:page_size(first)]
+
+    # Se responde desde el trie en memoria, sin consultar la base
+    def resolve_suggest(self, info, section, prefix, first=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        first = DEFAULT_SUGGESTIONS if first is None else max(0, min(first, MAX_SUGGESTIONS))
+        return [
+            SuggestionType(value=value, count=count)
+            for value, count in suggest(section.value, prefix, first)
+        ]
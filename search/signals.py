@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from workexperience.models import Archivement
+
+from .documents import SECTIONS, index_instance, reindex_work_experience, remove_instance
+from .values import MODEL_INDEXES
+# Al importarse registran sus indices en MODEL_INDEXES
+from . import fuzzy, suggest
+
+
+def section_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_instance(instance)
+
+
+def section_deleted(sender, instance, **kwargs):
+    remove_instance(instance)
+
+
+def archivement_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reindex_work_experience(instance)
+
+
+# Los indices en memoria solo se actualizan si la escritura llega a confirmarse
+def values_saved(sender, instance, **kwargs):
+    for index in MODEL_INDEXES[sender]:
+        pk, value = instance.pk, getattr(instance, index.field)
+        transaction.on_commit(lambda index=index, pk=pk, value=value: index.update(pk, value))
+
+
+def values_deleted(sender, instance, **kwargs):
+    for index in MODEL_INDEXES[sender]:
+        pk = instance.pk
+        transaction.on_commit(lambda index=index, pk=pk: index.update(pk, None))
+
+
+def connect():
+    for model in SECTIONS:
+        post_save.connect(section_saved, sender=model, dispatch_uid=f'search_saved_{model.__name__}')
+        post_delete.connect(section_deleted, sender=model, dispatch_uid=f'search_deleted_{model.__name__}')
+    post_save.connect(archivement_changed, sender=Archivement, dispatch_uid='search_saved_Archivement')
+    post_delete.connect(archivement_changed, sender=Archivement, dispatch_uid='search_deleted_Archivement')
+    for model in MODEL_INDEXES:
+        post_save.connect(values_saved, sender=model, dispatch_uid=f'values_saved_{model.__name__}')
+        post_delete.connect(values_deleted, sender=model, dispatch_uid=f'values_deleted_{model.__name__}')
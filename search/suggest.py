@@ -0,0 +1,87 @@
+"""As-you-type suggestions for skill, language and interest names.
+
+Each process keeps a prefix trie per section (see ``search.values``) with
+the distinct values of all users and how many rows use each one.
+"""
+import heapq
+
+from hacker_news.normalize import normalize
+from interest.models import Interest
+from language.models import Language
+from skills.models import Skill
+
+from .values import register
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 20
+
+# seccion -> (modelo, columna sugerida)
+SUGGEST_FIELDS = {
+    'skill': (Skill, 'skill'),
+    'language': (Language, 'language'),
+    'interest': (Interest, 'name'),
+}
+
+
+class _Node:
+    __slots__ = ('children', 'spellings', 'top')
+
+    def __init__(self):
+        self.children = {}
+        # escritura original -> filas que la usan (en el nodo donde termina el valor)
+        self.spellings = {}
+        # mejores (-filas, valor) del subarbol; None cuando hay que recalcularlo
+        self.top = None
+
+
+class Trie:
+    """Prefix trie keyed by the normalized value, ranked by row count."""
+
+    def __init__(self):
+        self.root = _Node()
+
+    def add(self, value, delta=1):
+        path = [self.root]
+        for char in normalize(value):
+            child = path[-1].children.get(char)
+            if child is None:
+                if delta < 0:
+                    return
+                child = path[-1].children[char] = _Node()
+            path.append(child)
+
+        spellings = path[-1].spellings
+        count = spellings.get(value, 0) + delta
+        if count > 0:
+            spellings[value] = count
+        else:
+            spellings.pop(value, None)
+        for node in path:
+            node.top = None
+
+    def suggest(self, prefix, first=DEFAULT_SUGGESTIONS):
+        node = self.root
+        for char in normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [(value, -negative_count) for negative_count, value in self._top(node)[:first]]
+
+    def _top(self, node):
+        if node.top is None:
+            candidates = []
+            if node.spellings:
+                # "Python" y "python" son la misma sugerencia: gana la escritura mas usada
+                spelling = min(node.spellings, key=lambda value: (-node.spellings[value], value))
+                candidates.append((-sum(node.spellings.values()), spelling))
+            for child in node.children.values():
+                candidates.extend(self._top(child))
+            node.top = heapq.nsmallest(MAX_SUGGESTIONS, candidates)
+        return node.top
+
+
+INDEXES = {section: register(model, field, Trie) for section, (model, field) in SUGGEST_FIELDS.items()}
+
+
+def suggest(section, prefix, first=DEFAULT_SUGGESTIONS):
+    return INDEXES[section].read(lambda trie: trie.suggest(prefix, first))
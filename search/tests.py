@@ -0,0 +1,264 @@
+from django.test import TestCase
+from graphene_django.utils.testing import GraphQLTestCase
+from mixer.backend.django import mixer
+import json
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from graphql_cache.response_cache import response_cache
+from hacker_news.schema import schema
+from education.models import Education
+from skills.models import Skill
+from workexperience.models import WorkExperience, Archivement
+from language.models import Language
+from search import values
+from search.fuzzy import BKTree, levenshtein
+from search.models import SearchDocument
+
+# Create your tests here.
+
+SEARCH_CV = '''
+query ($query: String!, $first: Int) {
+  searchCv(query: $query, first: $first) {
+    section
+    objectId
+    title
+    score
+  }
+}
+'''
+
+SUGGEST = '''
+query ($section: SuggestSection!, $prefix: String!, $first: Int) {
+  suggest(section: $section, prefix: $prefix, first: $first) {
+    value
+    count
+  }
+}
+'''
+
+CREATE_USER_MUTATION = '''
+ mutation createUserMutation($email: String!, $password: String!, $username: String!) {
+     createUser(email: $email, password: $password, username: $username) {
+         user {
+            username
+            password
+         }
+     }
+ }
+'''
+
+LOGIN_USER_MUTATION = '''
+ mutation TokenAuthMutation($username: String!, $password: String!) {
+     tokenAuth(username: $username, password: $password) {
+        token
+     }
+ }
+'''
+
+class SearchTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        self.query(
+            CREATE_USER_MUTATION,
+            variables={'email': 'adsoft@live.com.mx', 'username': 'adsoft', 'password': 'adsoft'}
+        )
+        response_token = self.query(
+            LOGIN_USER_MUTATION,
+            variables={'username': 'adsoft', 'password': 'adsoft'}
+        )
+        token = json.loads(response_token.content)['data']['tokenAuth']['token']
+        self.headers = {"AUTHORIZATION": f"JWT {token}"}
+
+        self.user = get_user_model().objects.get(username="adsoft")
+        self.skill = mixer.blend(Skill, skill="Python", posted_by=self.user)
+        self.education = mixer.blend(Education, degree="Ingeniería en Software", university="UNAM", posted_by=self.user)
+        self.work = mixer.blend(WorkExperience, position="Backend Developer", company="Acme", location="CDMX", posted_by=self.user)
+
+    def search(self, query, first=None):
+        response = self.query(SEARCH_CV, variables={'query': query, 'first': first}, headers=self.headers)
+        self.assertResponseNoErrors(response)
+        return json.loads(response.content)['data']['searchCv']
+
+    def test_search_across_sections(self):
+        mixer.blend(Skill, skill="Python", posted_by=mixer.blend(get_user_model()))
+
+        results = self.search("python")
+        assert results == [{'section': 'skill', 'objectId': self.skill.id, 'title': 'Python', 'score': results[0]['score']}]
+
+        results = self.search("unam")
+        assert [(r['section'], r['objectId']) for r in results] == [('education', self.education.id)]
+
+    def test_search_nested_archivement_description(self):
+        archivement = mixer.blend(Archivement, description="Migré la plataforma a Kubernetes", work_experience=self.work)
+
+        results = self.search("kubernetes")
+        assert [(r['section'], r['objectId']) for r in results] == [('workExperience', self.work.id)]
+
+        archivement.delete()
+        assert self.search("kubernetes") == []
+
+    def test_search_ignores_accents(self):
+        mixer.blend(Archivement, description="Migré la plataforma a Kubernetes", work_experience=self.work)
+
+        for query in ("ingenieria", "INGENIERÍA", "ingeniería"):
+            assert [r['objectId'] for r in self.search(query)] == [self.education.id]
+        assert [r['objectId'] for r in self.search("migre")] == [self.work.id]
+
+    def test_search_documents_not_exposed_on_users(self):
+        assert 'searchdocumentSet' not in schema.graphql_schema.get_type('UserType').fields
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.skill.skill = "Rust"
+        self.skill.save()
+        assert self.search("python") == []
+        assert [r['objectId'] for r in self.search("rust")] == [self.skill.id]
+
+        self.skill.delete()
+        assert self.search("rust") == []
+        assert not SearchDocument.objects.filter(section='skill').exists()
+
+    def test_search_single_query(self):
+        mixer.cycle(5).blend(Skill, skill="Python", posted_by=self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            results = self.search("pyth", first=3)
+
+        search_queries = [q for q in context.captured_queries if 'search_searchdocument' in q['sql']]
+        assert len(search_queries) == 1
+        assert len(results) == 3
+
+    def test_search_not_logged_in(self):
+        response = self.query(SEARCH_CV, variables={'query': 'python'})
+        content = json.loads(response.content)
+
+        assert content['errors'][0]['message'] == 'Not logged in!'
+
+
+class SuggestTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "http://localhost:8000/graphql/"
+    GRAPHQL_SCHEMA = schema
+
+    def setUp(self):
+        self.query(
+            CREATE_USER_MUTATION,
+            variables={'email': 'adsoft@live.com.mx', 'username': 'adsoft', 'password': 'adsoft'}
+        )
+        response_token = self.query(
+            LOGIN_USER_MUTATION,
+            variables={'username': 'adsoft', 'password': 'adsoft'}
+        )
+        token = json.loads(response_token.content)['data']['tokenAuth']['token']
+        self.headers = {"AUTHORIZATION": f"JWT {token}"}
+
+        # El trie es por proceso: cada prueba lo construye desde su propia base
+        values.reset()
+        self.addCleanup(values.reset)
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+
+        self.user = get_user_model().objects.get(username="adsoft")
+        other = mixer.blend(get_user_model())
+        self.python = mixer.blend(Skill, skill="Python", posted_by=self.user)
+        mixer.blend(Skill, skill="python", posted_by=other)
+        mixer.blend(Skill, skill="Python", posted_by=other)
+        mixer.blend(Skill, skill="PyTorch", posted_by=other)
+        mixer.blend(Skill, skill="Go", posted_by=self.user)
+
+    def suggest(self, section, prefix, first=None):
+        response = self.query(SUGGEST, variables={'section': section, 'prefix': prefix, 'first': first}, headers=self.headers)
+        self.assertResponseNoErrors(response)
+        return [(s['value'], s['count']) for s in json.loads(response.content)['data']['suggest']]
+
+    def skill_queries(self, context):
+        return [q for q in context.captured_queries if 'skills_skill' in q['sql']]
+
+    def test_suggest_ranked_by_frequency(self):
+        assert self.suggest('SKILL', 'py') == [('Python', 3), ('PyTorch', 1)]
+        assert self.suggest('SKILL', 'PY', first=1) == [('Python', 3)]
+        assert self.suggest('SKILL', 'rust') == []
+
+    def test_suggest_ignores_accents(self):
+        mixer.blend(Language, language="Inglés", posted_by=self.user)
+        mixer.blend(Language, language="Italiano", posted_by=self.user)
+
+        assert self.suggest('LANGUAGE', 'ingle') == [('Inglés', 1)]
+        assert self.suggest('LANGUAGE', 'i') == [('Inglés', 1), ('Italiano', 1)]
+
+    def test_suggest_served_from_memory(self):
+        self.suggest('SKILL', 'py')
+
+        with CaptureQueriesContext(connection) as context:
+            assert self.suggest('SKILL', 'g') == [('Go', 1)]
+        assert self.skill_queries(context) == []
+
+    def test_suggest_follows_saves_and_deletes(self):
+        self.suggest('SKILL', 'py')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.skill = "Pandas"
+            self.python.save()
+            mixer.blend(Skill, skill="PyTorch", posted_by=self.user)
+            Skill.objects.get(skill="Go").delete()
+
+        with CaptureQueriesContext(connection) as context:
+            assert self.suggest('SKILL', 'py') == [('PyTorch', 2), ('Python', 2)]
+            assert self.suggest('SKILL', 'pa') == [('Pandas', 1)]
+            assert self.suggest('SKILL', 'go') == []
+        assert self.skill_queries(context) == []
+
+    def test_other_user_write_invalidates_cached_suggestions(self):
+        other = mixer.blend(get_user_model())
+        # Con el trie ya construido la respuesta no lee la base
+        self.suggest('SKILL', 'g')
+        self.suggest('SKILL', 'py')
+        self.suggest('SKILL', 'py')
+        assert response_cache.stats()['hits'] == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mixer.blend(Skill, skill="PyTorch", posted_by=other)
+
+        assert self.suggest('SKILL', 'py') == [('Python', 3), ('PyTorch', 2)]
+
+    def test_suggest_not_logged_in(self):
+        response = self.query(SUGGEST, variables={'section': 'SKILL', 'prefix': 'py'})
+        content = json.loads(response.content)
+
+        assert content['errors'][0]['message'] == 'Not logged in!'
+
+
+class BKTreeTestCase(TestCase):
+
+    def test_bk_tree_matches_brute_force(self):
+        words = ["python", "pyhton", "java", "javascript", "typescript", "go", "rust", "ruby", "rugby", "pytorch"]
+        tree = BKTree()
+        for word in words:
+            tree.add(word)
+        tree.add("ruby", -1)
+
+        for term in ["pythno", "jvascript", "rusty", "ruby", "g"]:
+            for distance in range(3):
+                expected = {word for word in words if word != "ruby" and levenshtein(term, word) <= distance}
+                assert set(tree.search(term, distance)) == expected
+
+
+class RebuildSearchIndexTestCase(TestCase):
+
+    def test_rebuild_search_index(self):
+        user = mixer.blend(get_user_model())
+        mixer.cycle(3).blend(Skill, posted_by=user)
+        work = mixer.blend(WorkExperience, posted_by=user)
+        mixer.blend(Archivement, description="Reduje la latencia", work_experience=work)
+        SearchDocument.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_search_index', chunk_size=2, stdout=out)
+
+        assert SearchDocument.objects.count() == 4
+        assert 'latencia' in SearchDocument.objects.get(section='workExperience').body
+        assert 'Indexed 4 documents.' in out.getvalue()
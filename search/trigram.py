@@ -0,0 +1,38 @@
+"""Trigram (pg_trgm) support for substring search.
+
+On PostgreSQL the searched columns carry GIN ``gin_trgm_ops`` indexes, which
+serve the ``LIKE '%term%'`` filters, and ``relevance`` ranks the matches by
+trigram similarity. Other databases keep the plain substring filter and rank
+every match the same, so ``RELEVANCE`` falls back to the id tiebreak.
+"""
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.functions import Cast, Greatest
+
+# tabla -> indices GIN creados por las migraciones (solo PostgreSQL)
+TRIGRAM_INDEXES = {
+    'workexperience_workexperience': ('workexp_position_trgm_idx', 'workexp_company_trgm_idx'),
+    'links_link': ('link_url_upper_trgm_idx', 'link_description_upper_trgm_idx'),
+    'skills_skill': ('skill_normalized_trgm_idx',),
+    'education_education': ('education_normalized_trgm_idx',),
+    'archivements_archivements': ('archiv_normalized_trgm_idx',),
+    'interest_interest': ('interest_normalized_trgm_idx',),
+    'language_language': ('language_normalized_trgm_idx',),
+}
+
+
+def trigram_supported():
+    return connection.vendor == 'postgresql'
+
+
+def relevance(search, *fields):
+    """Similarity of ``search`` to the best matching of ``fields`` (0..1)."""
+    if not trigram_supported():
+        return Value(0.0, output_field=FloatField())
+
+    # similarity() es real: en double el valor del cursor se compara igual que la columna
+    similarities = [Cast(TrigramSimilarity(field, search), FloatField()) for field in fields]
+    if len(similarities) == 1:
+        return similarities[0]
+    return Greatest(*similarities)
@@ -0,0 +1,80 @@
+"""Per-process in-memory indexes over the values of a model column.
+
+An index wraps a structure (a trie, a BK-tree...) with ``add(value, delta)``.
+It is loaded from the database on first use, kept up to date by the
+save/delete signals once the write commits (see ``search.signals``) and
+reloaded every ``SUGGEST_REBUILD_SECONDS`` to pick up writes made by other
+processes.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from graphql_cache.versions import GLOBAL, depends_on
+
+REBUILD_SECONDS = getattr(settings, 'SUGGEST_REBUILD_SECONDS', 300)
+
+# modelo -> indices en memoria de sus columnas
+MODEL_INDEXES = defaultdict(list)
+
+
+class ValueIndex:
+
+    def __init__(self, model, field, structure):
+        self.model = model
+        self.field = field
+        self.structure_class = structure
+        self.lock = threading.Lock()
+        self.structure = None
+        # pk -> valor indexado, para descontar el valor anterior al editar
+        self.values = {}
+        self.built_at = 0
+
+    def read(self, query):
+        """Run ``query(structure)`` on an up to date structure."""
+        # Los valores son de todos los usuarios: cualquier escritura caduca la respuesta
+        depends_on(self.model, GLOBAL)
+        with self.lock:
+            if self.structure is None or time.monotonic() - self.built_at > REBUILD_SECONDS:
+                self._build()
+            return query(self.structure)
+
+    def _build(self):
+        self.structure = self.structure_class()
+        self.values = {}
+        rows = self.model.objects.exclude(**{self.field: ''}).values_list('pk', self.field)
+        for pk, value in rows.iterator(chunk_size=2000):
+            self.structure.add(value)
+            self.values[pk] = value
+        self.built_at = time.monotonic()
+
+    def update(self, pk, value):
+        with self.lock:
+            # Sin construir todavia: la primera consulta leera el valor de la base
+            if self.structure is None:
+                return
+            old = self.values.pop(pk, None)
+            if old:
+                self.structure.add(old, -1)
+            if value:
+                self.structure.add(value)
+                self.values[pk] = value
+
+    def reset(self):
+        with self.lock:
+            self.structure = None
+            self.values = {}
+
+
+def register(model, field, structure):
+    index = ValueIndex(model, field, structure)
+    MODEL_INDEXES[model].append(index)
+    return index
+
+
+def reset():
+    for indexes in MODEL_INDEXES.values():
+        for index in indexes:
+            index.reset()
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.13 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['posted_by', 'id'], name='skill_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['posted_by', 'skill', 'id'], name='skill_owner_skill_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['posted_by', 'percent', 'id'], name='skill_owner_percent_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+from hacker_news.db import trigram_indexes
+from hacker_news.normalize import normalize
+
+
+def backfill_normalized(apps, schema_editor):
+    Skill = apps.get_model('skills', 'Skill')
+    batch = []
+    for instance in Skill.objects.all().iterator(chunk_size=1000):
+        instance.skill_normalized = normalize(instance.skill)
+        batch.append(instance)
+    Skill.objects.bulk_update(batch, ['skill_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('skills', '0002_section_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='skill_normalized',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_normalized, migrations.RunPython.noop),
+        trigram_indexes('skills_skill', {'skill_normalized_trgm_idx': 'skill_normalized'}),
+    ]
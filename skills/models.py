@@ -1,8 +1,22 @@
 from django.db import models
 from django.conf import settings
 
+from hacker_news.normalize import NormalizedFieldsMixin
+
 # Create your models here.
-class Skill(models.Model):
+class Skill(NormalizedFieldsMixin, models.Model):
     skill = models.TextField(default='')
     percent = models.PositiveIntegerField(default=0)
     posted_by  = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
+
+    skill_normalized = models.TextField(default='', editable=False)
+
+    normalized_fields = {'skill_normalized': 'skill'}
+
+    # Paginacion por cursor (posted_by, columna, id)
+    class Meta:
+        indexes = [
+            models.Index(fields=['posted_by', 'id'], name='skill_owner_id_idx'),
+            models.Index(fields=['posted_by', 'skill', 'id'], name='skill_owner_skill_idx'),
+            models.Index(fields=['posted_by', 'percent', 'id'], name='skill_owner_percent_idx'),
+        ]
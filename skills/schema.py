@@ -2,17 +2,39 @@ import graphene
 from graphene_django import DjangoObjectType
 from .models import Skill
 from users.schema import UserType
+from users.loaders import load_related_user
+from hacker_news.normalize import normalize
+from hacker_news.optimizer import optimize
+from cv.snapshots import updates_cv_snapshot
+from hacker_news.pagination import (
+    CountableConnection, connection_arguments, section_connection, section_ordering,
+)
+from search.fuzzy import fuzzy_matches
 from django.db.models import Q
 
 class SkillType(DjangoObjectType):
     class Meta:
         model = Skill
+        exclude = ('skill_normalized',)
+
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
+class SkillConnection(CountableConnection):
+    class Meta:
+        node = SkillType
+
+class SkillOrderBy(graphene.Enum):
+    ID = 'id'
+    SKILL = 'skill'
+    PERCENT_DESC = '-percent'
 
 class Query(graphene.ObjectType):
-    skill = graphene.List(SkillType, search=graphene.String(required=False))
+    skill = graphene.List(SkillType, search=graphene.String(required=False), fuzzy=graphene.Boolean())
+    skill_connection = graphene.Field(SkillConnection, search=graphene.String(), **connection_arguments(SkillOrderBy))
     skillById = graphene.Field(SkillType, idSkill=graphene.Int())
 
-    def resolve_skill(self, info, search=None, **kwargs):
+    def resolve_skill(self, info, search=None, fuzzy=False, **kwargs):
         user = info.context.user
         if user.is_anonymous:
             raise Exception('Not logged in!')
@@ -25,13 +47,16 @@ class Query(graphene.ObjectType):
 
         # Caso: Si search es None o "*", devuelve los primeros 10 registros
         if not search or search == "*":
-            skills = Skill.objects.filter(filter)[:10]
+            skills = optimize(Skill.objects.filter(filter), info).order_by(*section_ordering())[:10]
             print("skills returned (no filter or wildcard):", skills)
             return skills
 
         # Caso: Filtrar por interés específico
-        filter &= Q(skill__icontains=search)
-        skills = Skill.objects.filter(filter)
+        term = Q(skill_normalized__contains=normalize(search))
+        if fuzzy:
+            term |= Q(skill_normalized__in=fuzzy_matches('skill', search))
+        filter &= term
+        skills = optimize(Skill.objects.filter(filter), info).order_by(*section_ordering())
         print("Filtered skills returned:", skills)
         return skills
 
@@ -45,7 +70,19 @@ class Query(graphene.ObjectType):
         filter = (
             Q(posted_by=user) & Q(id=idSkill)
         )
-        return Skill.objects.filter(filter).first()
+        return optimize(Skill.objects.filter(filter), info).first()
+
+    def resolve_skill_connection(self, info, search=None, first=None, after=None, order_by=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        filter = Q(posted_by=user)
+        if search and search != "*":
+            filter &= Q(skill_normalized__contains=normalize(search))
+        return section_connection(
+            SkillConnection, Skill.objects.filter(filter), info, section_ordering(order_by), first, after
+        )
 
 class CreateSkill(graphene.Mutation):
     idSkill = graphene.Int()
@@ -58,6 +95,7 @@ class CreateSkill(graphene.Mutation):
         skill = graphene.String()
         percent = graphene.Int()
 
+    @updates_cv_snapshot
     def mutate(self, info, idSkill, skill, percent):
         if percent < 0 or percent > 100:
             raise Exception('Invalid range for percent')
@@ -84,7 +122,7 @@ class CreateSkill(graphene.Mutation):
             idSkill=skill.id,
             skill=skill.skill,
             percent=skill.percent,
-            posted_by=skill.posted_by
+            posted_by=user
         )
     
 class DeleteSkill(graphene.Mutation):
@@ -93,6 +131,7 @@ class DeleteSkill(graphene.Mutation):
     class Arguments:
         idSkill = graphene.Int()
 
+    @updates_cv_snapshot
     def mutate(self, info, idSkill):
         user = info.context.user or None
         if user.is_anonymous:
@@ -4,9 +4,14 @@ from mixer.backend.django import mixer
 import graphene
 import json
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from graphql_cache.response_cache import response_cache
 from hacker_news.schema import schema
+from hacker_news.testing import connection_pages, count_queries
 from skills.models import Skill
+from search import values
 
 # Create your tests here.
 
@@ -28,6 +33,36 @@ query {
 }
 '''
 
+GET_SKILLS_WITH_POSTED_BY = '''
+query {
+  skill(search: "*") {
+    id
+    postedBy {
+      username
+    }
+  }
+}
+'''
+
+SKILL_CONNECTION = '''
+query ($first: Int, $after: String, $orderBy: SkillOrderBy, $search: String) {
+  skillConnection(first: $first, after: $after, orderBy: $orderBy, search: $search) {
+    totalCount
+    edges {
+      node {
+        id
+        skill
+        percent
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+'''
+
 GET_FILTERED_SKILLS = '''
 query GetFilteredSkills($search: String!) {
   skill(search: $search) {
@@ -37,6 +72,15 @@ query GetFilteredSkills($search: String!) {
 }
 '''
 
+GET_FUZZY_SKILLS = '''
+query GetFuzzySkills($search: String!) {
+  skill(search: $search, fuzzy: true) {
+    id
+    skill
+  }
+}
+'''
+
 GET_SKILL_BY_ID = '''
 query GetSkillById($idSkill: Int!) {
   skillById(idSkill: $idSkill) {
@@ -387,3 +431,116 @@ class InterestTestCase(GraphQLTestCase):
         assert 'errors' in content
         error_message = content['errors'][0]['message']
         assert error_message == "Not logged in!"
+
+    def test_get_skills_posted_by_uses_authenticated_user(self):
+        without_posted_by, _ = count_queries(self, GET_SKILLS_WITH_WILDCARD, headers=self.headers)
+        with_posted_by, content = count_queries(self, GET_SKILLS_WITH_POSTED_BY, headers=self.headers)
+
+        skills = content['data']['skill']
+        assert len(skills) == 2
+        assert all(skill['postedBy']['username'] == self.user.username for skill in skills)
+        assert with_posted_by == without_posted_by
+
+    def _skill_pages(self, first, **variables):
+        return connection_pages(self, SKILL_CONNECTION, 'skillConnection', headers=self.headers, first=first, **variables)
+
+    def test_skill_connection_ordered_pages(self):
+        for skill, percent in [("Python", 90), ("Django", 80), ("Go", 80), ("Rust", 40)]:
+            mixer.blend(Skill, skill=skill, percent=percent, posted_by=self.user)
+        mixer.blend(Skill, skill="Other user", posted_by=mixer.blend(get_user_model()))
+
+        pages = self._skill_pages(2, orderBy="PERCENT_DESC")
+        nodes = [edge['node'] for page in pages for edge in page['edges']]
+
+        expected = Skill.objects.filter(posted_by=self.user).order_by('-percent', '-id')
+        assert [node['id'] for node in nodes] == [str(skill.id) for skill in expected]
+        assert len(pages) == 3
+        assert all(page['totalCount'] == 6 for page in pages)
+
+    def test_skill_connection_total_count_same_query(self):
+        for skill in ("GraphQL", "GraphQL Relay", "SQL"):
+            mixer.blend(Skill, skill=skill, posted_by=self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            pages = self._skill_pages(1, search="graphql")
+
+        skill_queries = [q['sql'] for q in context.captured_queries if 'FROM "skills_skill"' in q['sql']]
+        assert len(skill_queries) == len(pages)
+        assert all('OVER ()' in sql for sql in skill_queries)
+        assert [page['totalCount'] for page in pages] == [2, 2]
+
+    def test_filtered_skills_not_paginated(self):
+        mixer.cycle(120).blend(Skill, skill="Python", posted_by=self.user)
+
+        response = self.query(GET_FILTERED_SKILLS, variables={"search": "python"}, headers=self.headers)
+        self.assertResponseNoErrors(response)
+
+        expected = Skill.objects.filter(posted_by=self.user, skill__icontains="python").count()
+        assert len(json.loads(response.content)['data']['skill']) == expected > 100
+
+    def test_skill_connection_not_logged_in(self):
+        response = self.query(SKILL_CONNECTION, variables={'first': 2})
+        content = json.loads(response.content)
+
+        assert content['errors'][0]['message'] == 'Not logged in!'
+
+    def test_get_filtered_skills_ignores_accents_and_case(self):
+        self.skill1.skill = "Diseño Gráfico"
+        self.skill1.save()
+        self.skill2.skill = "Redacción"
+        self.skill2.save()
+
+        assert Skill.objects.get(id=self.skill1.id).skill_normalized == "diseno grafico"
+
+        for search in ("diseno grafico", "DISEÑO", "gráfico"):
+            response = self.query(
+                GET_FILTERED_SKILLS,
+                variables={"search": search},
+                headers=self.headers
+            )
+            self.assertResponseNoErrors(response)
+            skills = json.loads(response.content)['data']['skill']
+            assert [skill['id'] for skill in skills] == [str(self.skill1.id)]
+
+    def test_get_fuzzy_skills(self):
+        values.reset()
+        self.addCleanup(values.reset)
+        self.skill1.skill = "Python"
+        self.skill1.save()
+        self.skill2.skill = "JavaScript"
+        self.skill2.save()
+        mixer.blend(Skill, skill="Pyhton", posted_by=mixer.blend(get_user_model()))
+
+        for search, expected in [("Pyhton", self.skill1), ("javscript", self.skill2), ("PYTHON", self.skill1)]:
+            response = self.query(GET_FUZZY_SKILLS, variables={"search": search}, headers=self.headers)
+            self.assertResponseNoErrors(response)
+            skills = json.loads(response.content)['data']['skill']
+            assert [skill['id'] for skill in skills] == [str(expected.id)]
+
+        # Sin fuzzy sigue siendo una busqueda exacta
+        response = self.query(GET_FILTERED_SKILLS, variables={"search": "Pyhton"}, headers=self.headers)
+        assert json.loads(response.content)['data']['skill'] == []
+
+        # Terminos cortos no admiten errores
+        response = self.query(GET_FUZZY_SKILLS, variables={"search": "Go"}, headers=self.headers)
+        assert json.loads(response.content)['data']['skill'] == []
+
+    def test_fuzzy_skills_expire_on_other_users_writes(self):
+        values.reset()
+        self.addCleanup(values.reset)
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+        other = mixer.blend(get_user_model())
+
+        def status():
+            response = self.query(GET_FUZZY_SKILLS, variables={"search": "Pyhton"}, headers=self.headers)
+            self.assertResponseNoErrors(response)
+            return response['X-GraphQL-Cache']
+
+        assert [status(), status()] == ['MISS', 'HIT']
+
+        # Las coincidencias salen de los valores de todos los usuarios
+        with self.captureOnCommitCallbacks(execute=True):
+            mixer.blend(Skill, skill="Pyhton", posted_by=other)
+
+        assert status() == 'MISS'
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+
+from hacker_news.loaders import DataLoader, get_loader
+
+
+class UserLoader(DataLoader):
+
+    def authenticated_user(self):
+        user = getattr(self.context, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user
+        return None
+
+    def batch_load(self, keys):
+        return get_user_model().objects.in_bulk(keys)
+
+    def load(self, key):
+        # El usuario autenticado ya esta en memoria, no hace falta consultarlo
+        user = self.authenticated_user()
+        if user is not None and key == user.pk:
+            return user
+        return super().load(key)
+
+
+def load_user(info, user_id):
+    return get_loader(info, UserLoader).load(user_id)
+
+
+def load_related_user(info, instance, field_name='posted_by'):
+    # Reutiliza el usuario si el queryset ya lo trajo con select_related
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        return getattr(instance, field_name)
+    return load_user(info, getattr(instance, field.attname))
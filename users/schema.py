@@ -3,9 +3,14 @@ from django.contrib.auth import get_user_model
 import graphene
 from graphene_django import DjangoObjectType
 
+from hacker_news.optimizer import optimize
+from hacker_news.passwords import set_password
+
 class UserType(DjangoObjectType):
     class Meta:
         model = get_user_model()
+        # Los documentos de busqueda son un indice interno, no parte del usuario
+        exclude = ('searchdocument_set',)
 
 class CreateUser(graphene.Mutation):
     user = graphene.Field(UserType)
@@ -20,7 +25,7 @@ class CreateUser(graphene.Mutation):
             username=username,
             email=email,
         )
-        user.set_password(password)
+        set_password(user, password)
         user.save()
 
         return CreateUser(user=user)
@@ -33,4 +38,4 @@ class Query(graphene.ObjectType):
     users = graphene.List(UserType)
 
     def resolve_users(self, info):
-        return get_user_model().objects.all()
+        return optimize(get_user_model().objects.all(), info)
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+from hacker_news.db import trigram_indexes
+from hacker_news.normalize import normalize
+
+
+def backfill_normalized(apps, schema_editor):
+    WorkExperience = apps.get_model('workexperience', 'WorkExperience')
+    batch = []
+    for instance in WorkExperience.objects.all().iterator(chunk_size=1000):
+        instance.position_normalized = normalize(instance.position)
+        instance.company_normalized = normalize(instance.company)
+        batch.append(instance)
+    WorkExperience.objects.bulk_update(batch, ['position_normalized', 'company_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('workexperience', '0002_section_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workexperience',
+            name='company_normalized',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='workexperience',
+            name='position_normalized',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_normalized, migrations.RunPython.noop),
+        trigram_indexes('workexperience_workexperience', {
+            'workexp_position_trgm_idx': 'position_normalized',
+            'workexp_company_trgm_idx': 'company_normalized',
+        }),
+    ]
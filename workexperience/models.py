@@ -1,9 +1,11 @@
 from django.db import models
 from django.conf import settings
+
+from hacker_news.normalize import NormalizedFieldsMixin
 from django.utils.timezone import now
 
 # Create your models here.
-class WorkExperience(models.Model):
+class WorkExperience(NormalizedFieldsMixin, models.Model):
     position = models.TextField(default='')
     company = models.TextField(default='')
     start_date = models.DateTimeField(default=now, blank=True)
@@ -11,6 +13,19 @@ class WorkExperience(models.Model):
     location = models.TextField(default='')
     posted_by  = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE)
 
+    position_normalized = models.TextField(default='', editable=False)
+    company_normalized = models.TextField(default='', editable=False)
+
+    normalized_fields = {'position_normalized': 'position', 'company_normalized': 'company'}
+
+    # Paginacion por cursor (posted_by, columna, id)
+    class Meta:
+        indexes = [
+            models.Index(fields=['posted_by', 'id'], name='workexp_owner_id_idx'),
+            models.Index(fields=['posted_by', 'position', 'id'], name='workexp_owner_position_idx'),
+            models.Index(fields=['posted_by', 'start_date', 'id'], name='workexp_owner_start_idx'),
+        ]
+
 class Archivement(models.Model):
     description = models.TextField()
     work_experience = models.ForeignKey(WorkExperience, related_name='archivements', on_delete=models.CASCADE)
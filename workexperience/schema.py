@@ -2,6 +2,14 @@ import graphene
 from graphene_django import DjangoObjectType
 from .models import WorkExperience, Archivement
 from users.schema import UserType
+from users.loaders import load_related_user
+from hacker_news.normalize import normalize
+from hacker_news.optimizer import optimize
+from cv.snapshots import updates_cv_snapshot
+from hacker_news.pagination import (
+    CountableConnection, connection_arguments, section_connection, section_ordering,
+)
+from search.trigram import relevance
 from django.db.models import Q
 
 class ArchivementType(DjangoObjectType):
@@ -13,15 +21,45 @@ class WorkExperienceType(DjangoObjectType):
 
     class Meta:
         model = WorkExperience
+        exclude = ('position_normalized', 'company_normalized')
 
+    # El optimizador ya hizo prefetch_related de los logros
     def resolve_archivements(self, info):
         return self.archivements.all()
 
+    def resolve_posted_by(self, info):
+        return load_related_user(info, self)
+
+class WorkExperienceConnection(CountableConnection):
+    class Meta:
+        node = WorkExperienceType
+
+class WorkExperienceOrderBy(graphene.Enum):
+    ID = 'id'
+    POSITION = 'position'
+    START_DATE_DESC = '-start_date'
+    RELEVANCE = '-relevance'
+
+
+def search_filter(search):
+    term = normalize(search)
+    return Q(position_normalized__contains=term) | Q(company_normalized__contains=term)
+
+
+# RELEVANCE necesita un termino de busqueda; sin el se usa el orden por defecto
+def relevance_order(queryset, search, order_by):
+    if order_by != WorkExperienceOrderBy.RELEVANCE:
+        return queryset, order_by
+    if not search or search == "*":
+        return queryset, None
+    return queryset.annotate(relevance=relevance(normalize(search), 'position_normalized', 'company_normalized')), order_by
+
 class Query(graphene.ObjectType):
-    work_experiences = graphene.List(WorkExperienceType, search=graphene.String())
+    work_experiences = graphene.List(WorkExperienceType, search=graphene.String(), order_by=WorkExperienceOrderBy())
+    work_experiences_connection = graphene.Field(WorkExperienceConnection, search=graphene.String(), **connection_arguments(WorkExperienceOrderBy))
     work_experienceById = graphene.Field(WorkExperienceType, idWork=graphene.Int())
 
-    def resolve_work_experiences(self,info, search=None, **kwargs):
+    def resolve_work_experiences(self,info, search=None, order_by=None, **kwargs):
         user = info.context.user  
         if user.is_anonymous:
             raise Exception('Not logged in!')
@@ -29,10 +67,11 @@ class Query(graphene.ObjectType):
 
         if search == "*":
             filter = Q(posted_by=user)
-            return WorkExperience.objects.filter(filter)[:10]
+            return optimize(WorkExperience.objects.filter(filter), info).order_by(*section_ordering())[:10]
         else:
-            filter = Q(posted_by=user) & (Q(position__icontains=search) | Q(company__icontains=search))
-            return WorkExperience.objects.filter(filter)
+            filter = Q(posted_by=user) & search_filter(search)
+            work_experiences, order_by = relevance_order(WorkExperience.objects.filter(filter), search, order_by)
+            return optimize(work_experiences, info).order_by(*section_ordering(order_by))
  
     def resolve_work_experienceById(self, info, idWork, **kwargs):
         user = info.context.user  
@@ -41,8 +80,21 @@ class Query(graphene.ObjectType):
         print(user)
 
         filter = Q(posted_by=user) & Q(id=idWork)
-        return WorkExperience.objects.filter(filter).first()
-    
+        return optimize(WorkExperience.objects.filter(filter), info).first()
+
+    def resolve_work_experiences_connection(self, info, search=None, first=None, after=None, order_by=None, **kwargs):
+        user = info.context.user
+        if user.is_anonymous:
+            raise Exception('Not logged in!')
+
+        filter = Q(posted_by=user)
+        if search and search != "*":
+            filter &= search_filter(search)
+        work_experiences, order_by = relevance_order(WorkExperience.objects.filter(filter), search, order_by)
+        return section_connection(
+            WorkExperienceConnection, work_experiences, info, section_ordering(order_by), first, after
+        )
+
 class CreateWorkExperience(graphene.Mutation):
     idWork = graphene.Int()
     position = graphene.String()
@@ -62,6 +114,7 @@ class CreateWorkExperience(graphene.Mutation):
         location = graphene.String()
         archivements = graphene.List(graphene.String)
 
+    @updates_cv_snapshot
     def mutate(self, info, idWork, position, company, start_date, end_date, location, archivements=None):
         user = info.context.user
         if user.is_anonymous:
@@ -105,7 +158,7 @@ class CreateWorkExperience(graphene.Mutation):
             end_date=work_experience.end_date,
             location=work_experience.location,
             archivements=work_experience.archivements.all(),
-            posted_by=work_experience.posted_by
+            posted_by=user
         )
 
 class DeleteWorkExperience(graphene.Mutation):
@@ -114,6 +167,7 @@ class DeleteWorkExperience(graphene.Mutation):
     class Arguments:
         idWork = graphene.Int()
 
+    @updates_cv_snapshot
     def mutate(self, info, idWork):
         user = info.context.user or None
 
@@ -4,9 +4,13 @@ from mixer.backend.django import mixer
 import graphene
 import json
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+from datetime import timedelta
 
 from hacker_news.schema import schema
-from workexperience.models import WorkExperience
+from hacker_news.testing import connection_pages, count_queries, node_ids
+from workexperience.models import WorkExperience, Archivement
 
 # Create your tests here.
 
@@ -44,6 +48,23 @@ query ($search: String!) {
 }
 '''
 
+WORK_EXPERIENCES_CONNECTION = '''
+query ($first: Int, $after: String, $search: String, $orderBy: WorkExperienceOrderBy) {
+  workExperiencesConnection(first: $first, after: $after, search: $search, orderBy: $orderBy) {
+    totalCount
+    edges {
+      node {
+        id
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+'''
+
 GET_WORK_EXPERIENCE_BY_ID = '''
 query ($idWork: Int!) {
   workExperiencebyid(idWork: $idWork) {
@@ -357,4 +378,76 @@ class WorkExperienceTestCase(GraphQLTestCase):
         error_message = content['errors'][0]['message']
         assert error_message == "Not logged in!"
 
-    
\ No newline at end of file
+    def _count_queries(self, query, variables=None):
+        return count_queries(self, query, variables, self.headers)
+
+    def test_get_all_work_experiences_archivements_batched(self):
+        for work in (self.workExperience1, self.workExperience2):
+            mixer.cycle(3).blend(Archivement, work_experience=work)
+        queries_two, content = self._count_queries(GET_ALL_WORK_EXPERIENCES)
+
+        for work in mixer.cycle(8).blend(WorkExperience, posted_by=self.user):
+            mixer.cycle(3).blend(Archivement, work_experience=work)
+        queries_ten, content = self._count_queries(GET_ALL_WORK_EXPERIENCES)
+
+        workExperiences = content['data']['workExperiences']
+        assert len(workExperiences) == 10
+        assert all(len(workExperience['archivements']) == 3 for workExperience in workExperiences)
+        assert queries_two == queries_ten
+
+    def test_get_filtered_work_experiences_archivements_batched(self):
+        mixer.cycle(2).blend(WorkExperience, posted_by=self.user, position="Programador")
+        queries_two, content = self._count_queries(GET_FILTERED_WORK_EXPERIENCES, {"search": "Programador"})
+        assert len(content['data']['workExperiences']) == 2
+
+        for work in mixer.cycle(30).blend(WorkExperience, posted_by=self.user, position="Programador"):
+            mixer.cycle(2).blend(Archivement, work_experience=work)
+        queries_many, content = self._count_queries(GET_FILTERED_WORK_EXPERIENCES, {"search": "Programador"})
+        assert len(content['data']['workExperiences']) == 32
+        assert queries_two == queries_many
+
+    def test_get_work_experience_by_id_archivements(self):
+        archivement = mixer.blend(Archivement, work_experience=self.workExperience1)
+        mixer.blend(Archivement, work_experience=self.workExperience2)
+
+        _, content = self._count_queries(GET_WORK_EXPERIENCE_BY_ID, {"idWork": self.workExperience1.id})
+
+        archivements = content['data']['workExperiencebyid']['archivements']
+        assert archivements == [{'id': str(archivement.id), 'description': archivement.description}]
+
+    def test_work_experiences_connection_sub_millisecond_start_dates(self):
+        start = timezone.now().replace(microsecond=0)
+        for offset in range(6):
+            mixer.blend(WorkExperience, posted_by=self.user, start_date=start + timedelta(microseconds=100 * offset))
+
+        pages = connection_pages(
+            self, WORK_EXPERIENCES_CONNECTION, 'workExperiencesConnection', headers=self.headers,
+            first=2, orderBy="START_DATE_DESC",
+        )
+
+        expected = WorkExperience.objects.filter(posted_by=self.user).order_by('-start_date', '-id')
+        assert node_ids(pages) == [str(work.id) for work in expected]
+        assert len(expected) == 8
+
+    def test_work_experiences_connection_relevance(self):
+        self.workExperience1.position = "Gerente"
+        self.workExperience1.company = "Compañía de Software"
+        self.workExperience1.save()
+        self.workExperience2.position = "Ingeniero de software"
+        self.workExperience2.company = "Banco"
+        self.workExperience2.save()
+        mixer.blend(WorkExperience, posted_by=self.user, position="Chef", company="Restaurante")
+
+        pages = connection_pages(
+            self, WORK_EXPERIENCES_CONNECTION, 'workExperiencesConnection', headers=self.headers,
+            first=1, search="SOFTWARE", orderBy="RELEVANCE",
+        )
+        ids = node_ids(pages)
+        assert all(page['totalCount'] == 2 for page in pages)
+
+        if connection.vendor == 'postgresql':
+            # similarity: "compania de software" 0.43, "ingeniero de software" 0.41
+            assert ids == [str(self.workExperience1.id), str(self.workExperience2.id)]
+        else:
+            # Sin pg_trgm (SQLite) las coincidencias empatan y decide el id descendente
+            assert ids == [str(self.workExperience2.id), str(self.workExperience1.id)]